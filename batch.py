@@ -0,0 +1,355 @@
+# -*- coding: utf-8 -*-
+"""
+PKL Pipeline - Batch
+Ejecuta las herramientas del pipeline sobre muchas escenas sin UI (mayapy)
+
+Cada escena se abre en Maya standalone, se corren las operaciones en orden
+con los dialogos suprimidos y se escribe un JSON con el resultado.
+
+Uso:
+    mayapy batch.py export_all --scenes "P:/PKL/scenes/S01/**/*_anim_*.ma"
+    mayapy batch.py export --scenes "P:/PKL/scenes/S01/**/*_anim_*.ma"
+    mayapy batch.py organize check export camera --scenes "scenes/**/*_anim_*.ma" --save
+    mayapy batch.py model_check --scenes "assets/CH/**/*_model_*.ma" --report-dir reports
+
+Operaciones:
+    organize     animation_organizer.organize_animation
+    check        check_anm_scn.check_animation_scene (Auto-Fix salvo --no-fix)
+    export       scene_exporter.export_scene (incremental salvo --force)
+    camera       camera_exporter.export_ue_camera
+    export_all   scene_exporter.export_all (skeletons + camara con un solo bake)
+    model_check  model_checker.model_check_cleanup
+"""
+import argparse
+import fnmatch
+import glob
+import json
+import os
+import sys
+import time
+import traceback
+from collections import OrderedDict
+
+PIPELINE_DIR = os.path.dirname(os.path.abspath(__file__))
+for sub_dir in ('utils', 'config', 'core'):
+    path = os.path.join(PIPELINE_DIR, sub_dir)
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+
+# operacion -> (modulo, funcion)
+OPERATIONS = OrderedDict([
+    ('organize', ('animation_organizer', 'organize_animation')),
+    ('check', ('check_anm_scn', 'check_animation_scene')),
+    ('export', ('scene_exporter', 'export_scene')),
+    ('camera', ('camera_exporter', 'export_ue_camera')),
+    ('export_all', ('scene_exporter', 'export_all')),
+    ('model_check', ('model_checker', 'model_check_cleanup')),
+])
+
+# Operaciones que exportan FBX (necesitan el plugin fbxmaya)
+FBX_OPERATIONS = ('export', 'camera', 'export_all')
+
+# Operaciones que pueden escribir caches Alembic (plugin AbcExport)
+ABC_OPERATIONS = ('export', 'export_all')
+
+# Dialogos que significan "no hay nada que hacer" (skip, no es un fallo)
+SKIP_DIALOGS = ('No Groups Found', 'No Camera Found')
+
+
+# ====== ESCENAS ======
+
+def expand_scenes(patterns):
+    """
+    Expande los patrones de --scenes a una lista de archivos
+
+    Soporta '**' (cualquier numero de carpetas) tambien en Python 2.
+    """
+    scenes = []
+    for pattern in patterns:
+        pattern = pattern.replace('\\', '/')
+
+        if '**' not in pattern:
+            matches = glob.glob(pattern)
+        else:
+            root = pattern.split('**', 1)[0].rstrip('/') or '.'
+            flat_pattern = pattern.replace('**/', '')
+            matches = []
+            for dir_path, dir_names, file_names in os.walk(root):
+                dir_names.sort()
+                for file_name in file_names:
+                    path = os.path.join(dir_path, file_name).replace('\\', '/')
+                    if fnmatch.fnmatch(path, pattern) or fnmatch.fnmatch(path, flat_pattern):
+                        matches.append(path)
+
+        for path in sorted(matches):
+            path = os.path.abspath(path).replace('\\', '/')
+            if os.path.isfile(path) and path not in scenes:
+                scenes.append(path)
+
+    return scenes
+
+
+def find_workspace(scene_path):
+    """Busca hacia arriba la carpeta con workspace.mel (root del proyecto)"""
+    dir_path = os.path.dirname(scene_path)
+    while True:
+        if os.path.isfile(os.path.join(dir_path, 'workspace.mel')):
+            return dir_path
+        parent = os.path.dirname(dir_path)
+        if parent == dir_path:
+            return None
+        dir_path = parent
+
+
+# ====== MAYA ======
+
+def initialize_maya(operations):
+    """Inicializa Maya standalone (si no estamos ya dentro de Maya)"""
+    try:
+        import maya.standalone
+        maya.standalone.initialize(name='python')
+    except RuntimeError:
+        # Ya inicializado (maya -batch o sesion con UI)
+        pass
+
+    import maya.cmds as cmds
+
+    if any(op in FBX_OPERATIONS for op in operations):
+        if not cmds.pluginInfo('fbxmaya', query=True, loaded=True):
+            cmds.loadPlugin('fbxmaya', quiet=True)
+
+    if any(op in ABC_OPERATIONS for op in operations):
+        if not cmds.pluginInfo('AbcExport', query=True, loaded=True):
+            cmds.loadPlugin('AbcExport', quiet=True)
+
+    return cmds
+
+
+def load_operations(operations):
+    """Importa los modulos del pipeline y devuelve {operacion: funcion}"""
+    import importlib
+
+    functions = OrderedDict()
+    for op in operations:
+        module_name, func_name = OPERATIONS[op]
+        module = importlib.import_module(module_name)
+        functions[op] = getattr(module, func_name)
+    return functions
+
+
+def operation_skipped(op_report):
+    """True si la operacion no hizo nada porque no habia nada que hacer"""
+    if op_report['success'] or op_report['error']:
+        return False
+    return any(d['title'] in SKIP_DIALOGS for d in op_report['dialogs'])
+
+
+def scene_status(op_reports):
+    """'ok', 'skipped' (todas las operaciones sin nada que hacer) o 'failed'"""
+    if any(not op['success'] and not op['skipped'] for op in op_reports):
+        return 'failed'
+    if op_reports and all(op['skipped'] for op in op_reports):
+        return 'skipped'
+    return 'ok'
+
+
+def operation_succeeded(op, result):
+    """Interpreta el valor de retorno de cada herramienta"""
+    if op == 'check':
+        if not result:
+            return False
+        if not result.get('invalid_references'):
+            return True
+        auto_fix = result.get('auto_fix')
+        return bool(auto_fix) and not auto_fix['failed']
+    if op in ('export', 'export_all') and isinstance(result, dict):
+        # Plan del dry-run
+        return result['ok']
+    if op == 'model_check':
+        # None = no hay geometria, {} = geometria limpia
+        return result is not None and not result
+    return bool(result)
+
+
+# ====== EJECUCION ======
+
+def run_scene(cmds, scene_path, functions, args):
+    """
+    Abre una escena y corre las operaciones
+
+    Returns:
+        dict: Resultado de la escena (se guarda como JSON)
+    """
+    import helpers
+    import security
+
+    report = OrderedDict([
+        ('scene', scene_path),
+        ('status', 'ok'),
+        ('workspace', None),
+        ('operations', []),
+        ('saved', False),
+        ('error', None),
+        ('started', time.strftime('%Y-%m-%d %H:%M:%S')),
+        ('duration', 0.0),
+    ])
+    start = time.time()
+
+    try:
+        workspace = args.project or find_workspace(scene_path)
+        if workspace:
+            cmds.workspace(workspace, openWorkspace=True)
+        report['workspace'] = cmds.workspace(query=True, rootDirectory=True)
+
+        try:
+            cmds.file(scene_path, open=True, force=True, prompt=False)
+        except RuntimeError as e:
+            # Referencias o plugins faltantes: Maya avisa pero la escena se abre
+            print("Warning: {}".format(e))
+
+        opened = (cmds.file(query=True, sceneName=True) or '').replace('\\', '/')
+        if opened.lower() != scene_path.lower():
+            raise RuntimeError("Could not open scene")
+
+        helpers.invalidate_scene_context()
+        helpers.set_batch_answers(args.answers)
+        helpers.pop_batch_dialogs()
+
+        if not security.validate_pinkooland_project():
+            raise RuntimeError("Security validation failed (project not set)")
+
+        for op, func in functions.items():
+            op_start = time.time()
+            op_report = OrderedDict([('operation', op), ('success', False),
+                                     ('result', None), ('error', None)])
+            kwargs = {}
+            if op in ('export', 'export_all') and args.force:
+                kwargs['incremental'] = False
+            if op in ('export', 'export_all') and args.dry_run:
+                kwargs['dry_run'] = True
+            try:
+                op_report['result'] = func(**kwargs)
+                op_report['success'] = operation_succeeded(op, op_report['result'])
+            except Exception:
+                op_report['error'] = traceback.format_exc()
+            op_report['dialogs'] = helpers.pop_batch_dialogs()
+            op_report['skipped'] = operation_skipped(op_report)
+            op_report['duration'] = round(time.time() - op_start, 3)
+            report['operations'].append(op_report)
+
+            report['status'] = scene_status(report['operations'])
+            if report['status'] == 'failed' and args.stop_on_failure:
+                break
+
+        if args.save and report['status'] == 'ok':
+            cmds.file(save=True, force=True)
+            report['saved'] = True
+
+    except Exception:
+        report['status'] = 'error'
+        report['error'] = traceback.format_exc()
+
+    report['duration'] = round(time.time() - start, 3)
+    return report
+
+
+def report_name(scene_path):
+    """Nombre del JSON de resultado de una escena"""
+    return os.path.splitext(os.path.basename(scene_path))[0] + '.json'
+
+
+def write_report(report, report_dir):
+    """Escribe <report_dir>/<escena>.json"""
+    if not os.path.exists(report_dir):
+        os.makedirs(report_dir)
+
+    report_path = os.path.join(report_dir, report_name(report['scene']))
+    with open(report_path, 'w') as f:
+        json.dump(report, f, indent=2, default=str)
+    return report_path
+
+
+def parse_answers(values):
+    """'Title=Button' -> {'Title': 'Button'}"""
+    answers = {}
+    for value in values or []:
+        title, _, button = value.partition('=')
+        if not button:
+            raise ValueError("Invalid --answer '{}' (expected Title=Button)".format(value))
+        answers[title] = button
+    return answers
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description='Run PKL Pipeline tools on many scenes without UI (mayapy)'
+    )
+    parser.add_argument('operations', nargs='+', choices=list(OPERATIONS),
+                        help='Operations to run on each scene, in order')
+    parser.add_argument('--scenes', nargs='+', required=True,
+                        help='Scene files or glob patterns (supports **)')
+    parser.add_argument('--project', default=None,
+                        help='Maya project root (default: nearest workspace.mel)')
+    parser.add_argument('--report-dir', default='batch_reports',
+                        help='Folder for the per-scene JSON results')
+    parser.add_argument('--save', action='store_true',
+                        help='Save each scene if every operation succeeded')
+    parser.add_argument('--no-fix', action='store_true',
+                        help='Do not auto-fix invalid references in "check"')
+    parser.add_argument('--answer', action='append', default=[], metavar='TITLE=BUTTON',
+                        help='Answer for a dialog, by title (repeatable)')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Only plan and validate the export (nothing is baked or written)')
+    parser.add_argument('--force', action='store_true',
+                        help='Re-export every group even if nothing changed (export)')
+    parser.add_argument('--stop-on-failure', action='store_true',
+                        help='Skip the remaining operations of a scene after a failure')
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    try:
+        args.answers = parse_answers(args.answer)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.no_fix:
+        args.answers.setdefault('Validation Failed', 'Cancel')
+
+    scenes = expand_scenes(args.scenes)
+    if not scenes:
+        print("No scenes match {}".format(args.scenes))
+        return 1
+
+    print("=" * 60)
+    print("PKL PIPELINE - BATCH")
+    print("  Operations: {}".format(', '.join(args.operations)))
+    print("  Scenes: {}".format(len(scenes)))
+    print("=" * 60)
+
+    cmds = initialize_maya(args.operations)
+    functions = load_operations(args.operations)
+
+    summary = OrderedDict((status, 0) for status in ('ok', 'skipped', 'failed', 'error'))
+    for i, scene_path in enumerate(scenes):
+        print("\n[{}/{}] {}".format(i + 1, len(scenes), scene_path))
+        report = run_scene(cmds, scene_path, functions, args)
+        report_path = write_report(report, args.report_dir)
+        summary[report['status']] += 1
+        print("[{}] {} ({:.1f}s) -> {}".format(
+            report['status'].upper(), os.path.basename(scene_path),
+            report['duration'], report_path))
+
+    print("\n" + "=" * 60)
+    print("BATCH SUMMARY: {}".format(
+        ', '.join('{} {}'.format(count, status) for status, count in summary.items())))
+    print("=" * 60)
+
+    return 1 if summary['failed'] or summary['error'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
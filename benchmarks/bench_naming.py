@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""
+PKL Pipeline - Benchmark Naming
+Mide cuantos nombres de archivo por segundo parsea naming.parse_many().
+
+Uso (no necesita Maya):
+    python benchmarks/bench_naming.py [--count 500000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(BENCH_DIR), 'utils'))
+
+import naming
+
+
+ASSETS = ['KASSY', 'BOB', 'TRUCK', 'TREE', 'LAMP', 'DOG', 'CHAIR', 'SWORD']
+
+
+def random_asset_path(rng):
+    category = rng.choice(['CH', 'PRP'])
+    asset = rng.choice(ASSETS) + str(rng.randint(0, 40))
+    dept = rng.choice(['01_model', '03_rig', '02_textures'])
+    if rng.random() < 0.5:
+        name = '{}_{}_{}_v{:03d}.ma'.format(category, asset, dept, rng.randint(1, 60))
+        return 'P:/PKL/assets/{}/{}/{}/versions/{}'.format(category, asset, dept, name)
+    name = '{}_{}_{}_MASTER.ma'.format(category, asset, dept)
+    return 'P:/PKL/assets/{}/{}/{}/{}'.format(category, asset, dept, name)
+
+
+def random_scene_path(rng):
+    sq, sh = rng.randint(1, 20), rng.randint(1, 80) * 10
+    name = 'PKL_S{:02d}_SH{:03d}_anim_v{:03d}.ma'.format(sq, sh, rng.randint(1, 30))
+    return 'P:/PKL/scenes/S{:02d}/{}'.format(sq, name)
+
+
+def measure(label, names):
+    start = time.time()
+    parsed = naming.parse_many(names)
+    elapsed = time.time() - start
+    print("{:<34} {:>9,} names  {:>10,.0f} names/s".format(label, len(parsed), len(names) / elapsed))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--count', type=int, default=500000)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+
+    unique = list(set(random_asset_path(rng) for _ in range(args.count // 2)))
+    unique += [random_scene_path(rng) for _ in range(args.count - len(unique))]
+    measure('Mostly unique names', unique)
+
+    # Auditoria de referencias: los mismos rigs en cientos de escenas
+    pool = [random_asset_path(rng) for _ in range(2000)]
+    references = [rng.choice(pool) for _ in range(args.count)]
+    measure('Reference audit (repeated rigs)', references)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
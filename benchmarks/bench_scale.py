@@ -0,0 +1,277 @@
+# -*- coding: utf-8 -*-
+"""
+PKL Pipeline - Benchmark de escala
+Mide los hot paths del pipeline en escenas sinteticas de distinto tamano
+(1k/10k/50k transforms, 500 referencias, rigs con jerarquias profundas)
+y guarda los resultados en JSON para seguir la curva de escala.
+
+Operaciones medidas (cada una con su propio SceneIndex, como en la UI):
+    organize_animation      animation_organizer.organize_animation()
+    find_exportable_groups  export_engine.find_exportable_groups()
+    find_exportable_joint   un grupo tras otro con el index del export
+    select_targets          export_engine.SelectionTargets (CH + PR seleccionados)
+    check_animation_scene   check_anm_scn.check_animation_scene()
+
+Uso (no necesita Maya):
+    python benchmarks/bench_scale.py [--sizes 1000 10000 50000]
+        [--references 500] [--depth 40] [--output benchmarks/results/bench_scale.json]
+
+Cada corrida se agrega a la lista 'runs' del JSON (no se pisa el historial).
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, 'utils'))
+sys.path.insert(0, os.path.join(ROOT_DIR, 'core'))
+
+# Los spans de profiling van a un log temporal, no al log del usuario
+os.environ['PKL_PROFILE_DIR'] = os.path.join(tempfile.gettempdir(), 'pkl_bench_profile')
+
+import fake_maya
+
+scene = fake_maya.install()
+
+import helpers
+import animation_organizer
+import check_anm_scn
+import export_engine
+
+SCENE_PATH = 'P:/PKL/scenes/S01/PKL_S01_SH010_anim_v001.ma'
+
+# Transforms minimos por rig (cadena de controles + cadena de joints)
+MIN_RIG_SIZE = 20
+
+# 1 de cada N referencias apunta a una version en vez del _MASTER
+INVALID_EVERY = 10
+
+OPERATIONS = ('organize_animation', 'find_exportable_groups', 'find_exportable_joint',
+              'select_targets', 'check_animation_scene')
+
+
+def asset_name(i):
+    """Nombre de asset solo con letras (la gramatica de naming no acepta digitos)"""
+    letters = ''
+    i += 26 * 26
+    while i:
+        i, rest = divmod(i, 26)
+        letters = chr(ord('A') + rest) + letters
+    return letters
+
+
+def reference_path(name, category, valid):
+    prefix = 'CH' if category == 'CH' else 'PRP'
+    folder = 'P:/PKL/assets/{}/{}/03_rig'.format(prefix, name)
+    if valid:
+        return '{}/{}_{}_03_rig_MASTER.ma'.format(folder, prefix, name)
+    return '{}/versions/{}_{}_03_rig_v007.ma'.format(folder, prefix, name)
+
+
+def add_chain(root, prefix, length, node_type='transform', first_attrs=None):
+    """Cadena anidada de length nodos debajo de root; devuelve el ultimo"""
+    parent = root
+    for i in range(length):
+        parent = '{}|{}{:03d}'.format(parent, prefix, i)
+        scene.add(parent, node_type=node_type,
+                  attrs=first_attrs if i == 0 else None,
+                  reference=scene.lookup(root).reference)
+    return parent
+
+
+def build_scene(transforms, references, depth):
+    """
+    Escena de animacion sin organizar: rigs referenciados (namespace por
+    asset) con su MASTER_GRP template, controles y skeleton en cadenas de
+    profundidad depth. Las referencias que no entran en el tamano pedido
+    quedan descargadas (solo el reference node).
+
+    Returns:
+        int: Transforms de la escena
+    """
+    scene.clear(scene_path=SCENE_PATH)
+    helpers.invalidate_scene_context()
+
+    rig_size = max(transforms // max(references, 1), MIN_RIG_SIZE, 2 * depth + 2)
+    chain = max(1, min(depth, (rig_size - 2) // 2))
+    assets = max(1, min(references, transforms // rig_size))
+
+    scene.add('|UE_CAM', attrs={'Hierarchy': 'CAMERA', 'UnrealCamera': True})
+
+    for i in range(references):
+        name = asset_name(i)
+        category = 'CH' if i % 3 == 0 else 'PR'
+        ref_node = '{}RN'.format(name)
+        scene.add_reference(ref_node, reference_path(name, category, i % INVALID_EVERY != 0))
+        if i >= assets:
+            continue
+
+        master = '|{}:MASTER_GRP'.format(name)
+        scene.add(master, reference=ref_node, attrs={
+            'Hierarchy': '{Name}_#', 'Category': category, 'Name': name})
+
+        root_joint = master + '|{}:root_jnt'.format(name)
+        scene.add(root_joint, node_type='joint', attrs={'FBX_exportable': True},
+                  reference=ref_node)
+        add_chain(root_joint, '{}:jnt'.format(name), chain - 1, node_type='joint')
+
+        # Controles: cadenas de profundidad chain hasta llenar el rig
+        remaining = rig_size - 2 - (chain - 1)
+        block = 0
+        while remaining > 0:
+            length = min(chain, remaining)
+            add_chain(master, '{}:ctrl{:02d}_'.format(name, block), length)
+            remaining -= length
+            block += 1
+
+    return len([node for node in scene.nodes.values()
+                if node.node_type in fake_maya.TRANSFORM_TYPES])
+
+
+class _Null(object):
+    def write(self, text):
+        pass
+
+    def flush(self):
+        pass
+
+
+def measure(func):
+    """(resultado, {seconds, cmds_calls, api_calls, top_calls}) sin imprimir la salida"""
+    scene.reset_counters()
+    stdout = sys.stdout
+    sys.stdout = _Null()
+    try:
+        start = time.time()
+        result = func()
+        elapsed = time.time() - start
+    finally:
+        sys.stdout = stdout
+
+    top = sorted(scene.calls.items(), key=lambda item: item[1], reverse=True)[:5]
+    return result, {
+        'seconds': round(elapsed, 4),
+        'cmds_calls': scene.total_calls(),
+        'api_calls': sum(scene.api_calls.values()),
+        'top_calls': dict(top),
+    }
+
+
+def run_size(transforms, references, depth):
+    """Construye la escena y mide todas las operaciones en orden"""
+    count = build_scene(transforms, references, depth)
+    results = {}
+
+    helpers.set_batch_answers({'Validation Failed': 'Cancel'})
+
+    organized, results['organize_animation'] = measure(animation_organizer.organize_animation)
+    if not organized:
+        raise RuntimeError('organize_animation failed on the synthetic scene')
+
+    groups, results['find_exportable_groups'] = measure(export_engine.find_exportable_groups)
+
+    index = helpers.SceneIndex.build()
+    joints, results['find_exportable_joint'] = measure(
+        lambda: [export_engine.find_exportable_joint(g['group'], index) for g in groups])
+
+    scene.selection = ['|ANIMATION|CH', '|ANIMATION|PR']
+    selected, results['select_targets'] = measure(
+        lambda: export_engine.SelectionTargets().select(helpers.SceneIndex.build()))
+
+    check, results['check_animation_scene'] = measure(check_anm_scn.check_animation_scene)
+    helpers.pop_batch_dialogs()
+
+    return {
+        'target_transforms': transforms,
+        'transforms': count,
+        'references': references,
+        'depth': depth,
+        'groups': len(groups),
+        'joints_found': len([j for j in joints if j]),
+        'selected_groups': len(selected),
+        'invalid_references': len(check['invalid_references']),
+        'operations': results,
+    }
+
+
+def scaling_exponent(small, large):
+    """k en t ~ n^k entre dos tamanos (1 = lineal)"""
+    if small['seconds'] <= 0 or large['seconds'] <= 0:
+        return None
+    return math.log(large['seconds'] / small['seconds']) / math.log(
+        float(large['n']) / small['n'])
+
+
+def print_table(sizes):
+    print("\n{:<24}".format('Operation') + ''.join(
+        '{:>20}'.format('{:,} tr'.format(size['transforms'])) for size in sizes) + '   Scaling')
+    for name in OPERATIONS:
+        cells = ''
+        for size in sizes:
+            op = size['operations'][name]
+            cells += '{:>20}'.format('{:.3f}s /{:>7,}'.format(op['seconds'], op['cmds_calls']))
+        exponent = None
+        if len(sizes) > 1:
+            exponent = scaling_exponent(
+                {'seconds': sizes[0]['operations'][name]['seconds'], 'n': sizes[0]['transforms']},
+                {'seconds': sizes[-1]['operations'][name]['seconds'], 'n': sizes[-1]['transforms']})
+        print('{:<24}{}   {}'.format(name, cells,
+                                     'n^{:.2f}'.format(exponent) if exponent is not None else '-'))
+    print("\n(seconds / cmds calls; scaling = exponent between the smallest and largest scene)")
+
+
+def save_run(path, run):
+    """Agrega la corrida al historial del JSON"""
+    data = {'runs': []}
+    if os.path.exists(path):
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except ValueError:
+            print("Warning: {} is not valid JSON - starting a new history".format(path))
+    data.setdefault('runs', []).append(run)
+
+    folder = os.path.dirname(path)
+    if folder and not os.path.isdir(folder):
+        os.makedirs(folder)
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 50000])
+    parser.add_argument('--references', type=int, default=500)
+    parser.add_argument('--depth', type=int, default=40,
+                        help='Depth of the control and joint chains of each rig')
+    parser.add_argument('--output', default=os.path.join(BENCH_DIR, 'results', 'bench_scale.json'))
+    parser.add_argument('--label', default='', help='Tag stored with the run (branch, change...)')
+    args = parser.parse_args()
+
+    sizes = []
+    for transforms in sorted(args.sizes):
+        print("Scene {:,} transforms, {} references, depth {}...".format(
+            transforms, args.references, args.depth))
+        sizes.append(run_size(transforms, args.references, args.depth))
+
+    print_table(sizes)
+
+    save_run(args.output, {
+        'label': args.label,
+        'date': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'python': platform.python_version(),
+        'sizes': sizes,
+    })
+    print("Results appended to {}".format(args.output))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+"""
+PKL Pipeline - Benchmark SceneIndex
+Compara el numero de llamadas a maya.cmds del escaneo por nodo (codigo
+anterior) contra SceneIndex.build() en una escena sintetica de ~20k transforms.
+
+Uso (no necesita Maya):
+    python benchmarks/bench_scene_index.py [--transforms 20000]
+"""
+import argparse
+import os
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.join(os.path.dirname(BENCH_DIR), 'utils'))
+
+import fake_maya
+
+scene = fake_maya.install()
+
+import maya.cmds as cmds
+import helpers
+
+
+def build_scene(total_transforms):
+    """
+    Escena tipo shot: ANIMATION/CH/PR/CAMERA, personajes con rig y props.
+    Cada asset aporta ~200 transforms (controles + joints).
+    """
+    scene.add('|ANIMATION', attrs={'Hierarchy': 'ANIMATION', 'SQ': 'S01', 'SH': 'SH010'})
+    for group in ('CH', 'PR', 'CAMERA'):
+        scene.add('|ANIMATION|' + group, attrs={'Hierarchy': group})
+
+    nodes_per_asset = 200
+    asset_count = max(1, total_transforms // nodes_per_asset)
+
+    for i in range(asset_count):
+        category = 'CH' if i % 3 == 0 else 'PR'
+        name = 'ASSET{:03d}'.format(i)
+        group = '|ANIMATION|{}|{}_1'.format(category, name)
+        scene.add(group, attrs={
+            'Hierarchy': category,
+            'ExportedName': '{}_{}_1_S01_SH010'.format(category, name),
+            'Path': '<workspace_root>/Unreal/animation/PKL_S01/SH010/' + category,
+            'Exportable': True,
+        })
+        master = group + '|{}_MASTER_GRP'.format(name)
+        scene.add(master, attrs={'Hierarchy': '{Name}_#', 'Category': category, 'Name': name})
+
+        # Controles del rig
+        ctrl_parent = master
+        for c in range(nodes_per_asset // 2 - 2):
+            ctrl_parent = ctrl_parent + '|{}_ctrl{:03d}'.format(name, c)
+            scene.add(ctrl_parent)
+            if c % 10 == 9:
+                ctrl_parent = master
+
+        # Skeleton con root exportable
+        joint = master + '|{}_root_jnt'.format(name)
+        scene.add(joint, node_type='joint', attrs={'FBX_exportable': True})
+        for j in range(nodes_per_asset // 2 - 1):
+            joint = joint + '|{}_jnt{:03d}'.format(name, j)
+            scene.add(joint, node_type='joint')
+
+    return len(cmds.ls(type='transform'))
+
+
+# ====== CODIGO ANTERIOR (escaneo por nodo) ======
+
+def legacy_find_exportable_groups():
+    groups = []
+    for obj in cmds.ls(type='transform'):
+        if (helpers.has_attribute(obj, 'ExportedName') and
+                helpers.has_attribute(obj, 'Path') and
+                helpers.has_attribute(obj, 'Exportable')):
+            if helpers.get_attribute_value(obj, 'Exportable', False):
+                exported_name = helpers.get_attribute_value(obj, 'ExportedName', '')
+                path = helpers.get_attribute_value(obj, 'Path', '')
+                if exported_name and path:
+                    groups.append(obj)
+    return groups
+
+
+def legacy_find_exportable_joint(group):
+    descendants = cmds.listRelatives(group, allDescendents=True, type='joint', fullPath=True) or []
+    for joint in descendants:
+        if helpers.has_attribute(joint, 'FBX_exportable'):
+            if helpers.get_attribute_value(joint, 'FBX_exportable', False):
+                return joint
+    return None
+
+
+def legacy_find_hierarchy(value):
+    found = []
+    for obj in cmds.ls(type='transform'):
+        if cmds.attributeQuery('Hierarchy', node=obj, exists=True):
+            if cmds.getAttr(obj + '.Hierarchy') == value:
+                found.append(obj)
+    return found
+
+
+def legacy_template_scan():
+    found = []
+    for obj in cmds.ls(type='transform'):
+        has_category = cmds.attributeQuery('Category', node=obj, exists=True)
+        has_hierarchy = cmds.attributeQuery('Hierarchy', node=obj, exists=True)
+        has_name = cmds.attributeQuery('Name', node=obj, exists=True)
+        if has_category and has_hierarchy and has_name:
+            found.append((cmds.getAttr(obj + '.Category'),
+                          cmds.getAttr(obj + '.Hierarchy'),
+                          cmds.getAttr(obj + '.Name')))
+    return found
+
+
+def run_legacy():
+    groups = legacy_find_exportable_groups()
+    joints = [legacy_find_exportable_joint(g) for g in groups]
+    legacy_template_scan()
+    for value in ('ANIMATION', 'CH', 'PR', 'CAMERA'):
+        legacy_find_hierarchy(value)
+    return groups, joints
+
+
+def run_index():
+    index = helpers.SceneIndex.build()
+    groups = index.exportable_groups()
+    joints = [index.find_exportable_joint(g['group']) for g in groups]
+    index.carriers('Category')
+    for value in ('ANIMATION', 'CH', 'PR', 'CAMERA'):
+        index.find('Hierarchy', value)
+    return [g['group'] for g in groups], joints
+
+
+def measure(label, func):
+    scene.reset_counters()
+    start = time.time()
+    result = func()
+    elapsed = time.time() - start
+    calls = scene.total_calls()
+    print("{:<28} cmds calls: {:>9,}   api calls: {:>7,}   time: {:.3f}s".format(
+        label, calls, sum(scene.api_calls.values()), elapsed))
+    return result, calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--transforms', type=int, default=20000)
+    args = parser.parse_args()
+
+    count = build_scene(args.transforms)
+    print("Synthetic scene: {:,} transforms\n".format(count))
+
+    legacy_result, legacy_calls = measure('Per-node scan (legacy)', run_legacy)
+    index_result, index_calls = measure('SceneIndex', run_index)
+
+    if sorted(legacy_result[0]) != sorted(index_result[0]):
+        print("\n[ERROR] Exportable groups differ between implementations")
+        return 1
+    if sorted(legacy_result[1]) != sorted(index_result[1]):
+        print("\n[ERROR] Exportable joints differ between implementations")
+        return 1
+
+    print("\nCall reduction: {:.0f}x ({:,} -> {:,})".format(
+        float(legacy_calls) / max(index_calls, 1), legacy_calls, index_calls))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,484 @@
+# -*- coding: utf-8 -*-
+"""
+PKL Pipeline - Fake Maya
+Escena en memoria que imita los comandos de maya.cmds que usa el pipeline.
+Sirve para medir los hot paths (conteo de llamadas y tiempo) sin Maya.
+
+Uso:
+    import fake_maya
+    scene = fake_maya.install()      # registra maya, maya.cmds, maya.api...
+    scene.add('|ANIMATION', attrs={'Hierarchy': 'ANIMATION'})
+    scene.add_reference('KASSY_RN', 'P:/PKL/assets/CH/KASSY/03_rig/CH_KASSY_03_rig_MASTER.ma')
+    scene.add('|KASSY:MASTER_GRP', reference='KASSY_RN')
+"""
+import fnmatch
+import os
+import re
+import sys
+import types
+from collections import defaultdict
+
+
+class FakeNode(object):
+    __slots__ = ('long_name', 'node_type', 'attrs', 'children', 'parent', 'reference')
+
+    def __init__(self, long_name, node_type, attrs=None, reference=None):
+        self.long_name = long_name
+        self.node_type = node_type
+        self.attrs = dict(attrs or {})
+        self.children = []
+        self.parent = None
+        self.reference = reference
+
+    @property
+    def name(self):
+        return self.long_name.rsplit('|', 1)[-1]
+
+
+# Tipos que cuentan como 'transform' en cmds.ls(type='transform')
+TRANSFORM_TYPES = ('transform', 'joint')
+
+
+class FakeScene(object):
+    """Grafo DAG minimo + contador de llamadas por comando"""
+
+    def __init__(self):
+        self.calls = defaultdict(int)
+        self.api_calls = defaultdict(int)
+        self.callbacks = {}    # mensaje de MSceneMessage -> funciones
+        self.callback_ids = {}  # id de callback -> (mensaje, funcion)
+        self.clear()
+
+    # --- Construccion ---
+
+    def clear(self, scene_path='', workspace_root='P:/PKL/', frame_range=(1001, 1100)):
+        """Escena vacia (los modulos instalados siguen apuntando a esta escena)"""
+        self.emit('kAfterNew')
+        self.nodes = {}        # long_name -> FakeNode (DAG y nodos DG sin '|')
+        self.by_name = {}      # name corto -> FakeNode
+        self.references = {}   # reference node -> archivo
+        self.selection = []
+        self.scene_path = scene_path
+        self.workspace_root = workspace_root
+        self.frame_range = frame_range
+
+    def add(self, long_name, node_type='transform', attrs=None, reference=None):
+        node = FakeNode(long_name, node_type, attrs, reference)
+        parent_name = long_name.rsplit('|', 1)[0] if '|' in long_name else ''
+        if parent_name:
+            parent = self.nodes[parent_name]
+            parent.children.append(node)
+            node.parent = parent
+        self.nodes[long_name] = node
+        self.by_name[node.name] = node
+        return node
+
+    def add_reference(self, ref_node, file_path):
+        """Reference node (DG) que apunta a file_path"""
+        self.references[ref_node] = file_path
+        return self.add(ref_node, node_type='reference')
+
+    def emit(self, message):
+        """Llama los callbacks de MSceneMessage registrados para message"""
+        for func in self.callbacks.get(message, []):
+            func(None)
+
+    def reset_counters(self):
+        self.calls.clear()
+        self.api_calls.clear()
+
+    def total_calls(self):
+        return sum(self.calls.values())
+
+    # --- Resolucion de nombres ---
+
+    def lookup(self, name):
+        if name in self.nodes:
+            return self.nodes[name]
+        if '|' in name:
+            for node in self.nodes.values():
+                if node.long_name.endswith('|' + name.lstrip('|')):
+                    return node
+            return None
+        return self.by_name.get(name)
+
+    def split_plug(self, plug):
+        node_name, attr = plug.split('.', 1)
+        return self.lookup(node_name), attr
+
+    def iter_descendants(self, node):
+        for child in node.children:
+            yield child
+            for sub in self.iter_descendants(child):
+                yield sub
+
+    def _rename_subtree(self, node, new_long_name):
+        old_long_name = node.long_name
+        for sub in [node] + list(self.iter_descendants(node)):
+            del self.nodes[sub.long_name]
+            sub.long_name = new_long_name + sub.long_name[len(old_long_name):]
+            self.nodes[sub.long_name] = sub
+
+
+def _counted(scene, name, func):
+    def wrapper(*args, **kwargs):
+        scene.calls[name] += 1
+        return func(*args, **kwargs)
+    wrapper.__name__ = name
+    return wrapper
+
+
+def _matches_type(node, node_type):
+    if node_type is None:
+        return True
+    types_ = node_type if isinstance(node_type, (list, tuple)) else [node_type]
+    for t in types_:
+        if t == 'transform' and node.node_type in TRANSFORM_TYPES:
+            return True
+        if node.node_type == t:
+            return True
+    return False
+
+
+def build_cmds(scene):
+    """Crea el modulo maya.cmds falso ligado a scene"""
+    cmds = types.ModuleType('maya.cmds')
+
+    def ls(*patterns, **kwargs):
+        node_type = kwargs.get('type')
+        long_names = kwargs.get('long', False)
+        objects_only = kwargs.get('objectsOnly', False)
+        if kwargs.get('selection'):
+            candidates = [scene.lookup(n) for n in scene.selection]
+            patterns = ()
+        else:
+            candidates = list(scene.nodes.values())
+        results = []
+        if patterns:
+            # Patrones agrupados por atributo: los nombres exactos se buscan
+            # directo y los comodines van en una sola regex (NameAllocator
+            # pide cientos de patrones en una llamada)
+            by_attr = defaultdict(list)
+            for pattern in patterns:
+                names = pattern if isinstance(pattern, (list, tuple)) else [pattern]
+                for pat in names:
+                    node_pat, _, attr = pat.partition('.')
+                    by_attr[attr].append(node_pat)
+
+            for attr, node_pats in by_attr.items():
+                matched = []
+                wildcards = [pat.lstrip('|') for pat in node_pats if any(c in pat for c in '*?[')]
+                for pat in node_pats:
+                    if pat.lstrip('|') not in wildcards:
+                        node = scene.lookup(pat)
+                        if node is not None:
+                            matched.append(node)
+                if wildcards:
+                    regex = re.compile('|'.join('(?:{})'.format(fnmatch.translate(pat))
+                                                for pat in wildcards))
+                    matched += [node for node in candidates if regex.match(node.name)]
+
+                for node in matched:
+                    if not _matches_type(node, node_type):
+                        continue
+                    if attr and attr not in node.attrs:
+                        continue
+                    label = node.long_name if long_names else node.name
+                    if attr and not objects_only:
+                        label += '.' + attr
+                    results.append(label)
+        else:
+            for node in candidates:
+                if node is not None and _matches_type(node, node_type):
+                    results.append(node.long_name if long_names else node.name)
+        return results
+
+    def objExists(name):
+        if '.' in name:
+            node, attr = scene.split_plug(name)
+            return node is not None and attr in node.attrs
+        return scene.lookup(name) is not None
+
+    def attributeQuery(attr, node=None, exists=False, **kwargs):
+        target = scene.lookup(node)
+        return target is not None and attr in target.attrs
+
+    def getAttr(plug, **kwargs):
+        node, attr = scene.split_plug(plug)
+        if kwargs.get('lock'):
+            return False
+        return node.attrs[attr]
+
+    def setAttr(plug, *args, **kwargs):
+        node, attr = scene.split_plug(plug)
+        if args:
+            node.attrs[attr] = args[0]
+
+    def addAttr(node_name, longName=None, **kwargs):
+        node = scene.lookup(node_name)
+        node.attrs.setdefault(longName, kwargs.get('defaultValue', ''))
+
+    def listRelatives(node_name, parent=False, children=False, allDescendents=False,
+                      shapes=False, type=None, fullPath=False, **kwargs):
+        node = scene.lookup(node_name)
+        if node is None:
+            return None
+        if parent:
+            related = [node.parent] if node.parent else []
+        elif allDescendents:
+            related = list(scene.iter_descendants(node))
+            related.reverse()
+        else:
+            related = list(node.children)
+            if shapes:
+                related = [n for n in related if n.node_type not in TRANSFORM_TYPES]
+        related = [n for n in related if _matches_type(n, type)]
+        if not related:
+            return None
+        return [n.long_name if fullPath else n.name for n in related]
+
+    def parent(child_names, parent_name, **kwargs):
+        if not isinstance(child_names, (list, tuple)):
+            child_names = [child_names]
+        new_parent = scene.lookup(parent_name)
+        result = []
+        for child_name in child_names:
+            child = scene.lookup(child_name)
+            if child.parent:
+                child.parent.children.remove(child)
+            new_parent.children.append(child)
+            child.parent = new_parent
+            scene._rename_subtree(child, new_parent.long_name + '|' + child.name)
+            result.append(child.name)
+        return result
+
+    def group(empty=False, name='group1', **kwargs):
+        scene.add('|' + name)
+        return name
+
+    def objectType(name):
+        return scene.lookup(name).node_type
+
+    def warning(message):
+        pass
+
+    def select(*args, **kwargs):
+        pass
+
+    def referenceQuery(target, filename=False, isNodeReferenced=False,
+                       referenceNode=False, **kwargs):
+        node = scene.lookup(target)
+        if node is None:
+            raise RuntimeError('No object matches name: {}'.format(target))
+        ref_node = node.name if node.node_type == 'reference' else node.reference
+        if isNodeReferenced:
+            return node.node_type != 'reference' and ref_node is not None
+        if ref_node is None:
+            raise RuntimeError('{} is not from a referenced file'.format(target))
+        if referenceNode:
+            return ref_node
+        return scene.references[ref_node]
+
+    def file(*args, **kwargs):
+        if kwargs.get('query') or kwargs.get('q'):
+            if kwargs.get('shortName'):
+                return os.path.basename(scene.scene_path)
+            return scene.scene_path
+        return None
+
+    def workspace(*args, **kwargs):
+        return scene.workspace_root
+
+    def playbackOptions(*args, **kwargs):
+        if kwargs.get('minTime'):
+            return float(scene.frame_range[0])
+        return float(scene.frame_range[1])
+
+    # Sin UI: helpers.is_batch_mode() es True y confirm_dialog no bloquea
+    def about(*args, **kwargs):
+        return True
+
+    def scriptJob(*args, **kwargs):
+        if kwargs.get('listJobs'):
+            return []
+        scene.jobs = getattr(scene, 'jobs', 0) + 1
+        return scene.jobs
+
+    def undoInfo(*args, **kwargs):
+        return True if kwargs.get('query') else None
+
+    def refresh(*args, **kwargs):
+        return False if kwargs.get('query') else None
+
+    def autoSave(*args, **kwargs):
+        return False if kwargs.get('query') else None
+
+    def evaluationManager(*args, **kwargs):
+        return ['parallel'] if kwargs.get('query') else None
+
+    def progressWindow(*args, **kwargs):
+        return False if kwargs.get('query') else None
+
+    def confirmDialog(*args, **kwargs):
+        return kwargs.get('defaultButton', 'OK')
+
+    for func in (ls, objExists, attributeQuery, getAttr, setAttr, addAttr,
+                 listRelatives, parent, group, objectType, warning, select,
+                 referenceQuery, file, workspace, playbackOptions, about, scriptJob,
+                 undoInfo, refresh, autoSave, evaluationManager, progressWindow,
+                 confirmDialog):
+        setattr(cmds, func.__name__, _counted(scene, func.__name__, func))
+
+    return cmds
+
+
+def build_open_maya(scene):
+    """Crea maya.api.OpenMaya con lo minimo para leer plugs en bloque"""
+    om = types.ModuleType('maya.api.OpenMaya')
+
+    class MFn(object):
+        kTransform = 'kTransform'
+        kReference = 'kReference'
+
+    class MObject(object):
+        def __init__(self, node):
+            self._node = node
+
+        def hasFn(self, fn):
+            if fn == MFn.kReference:
+                return self._node.node_type == 'reference'
+            return fn == MFn.kTransform and self._node.node_type in TRANSFORM_TYPES
+
+    class MDagPath(object):
+        def __init__(self, node):
+            self._node = node
+
+        def fullPathName(self):
+            return self._node.long_name
+
+        def partialPathName(self):
+            return self._node.name
+
+    class MPlug(object):
+        def __init__(self, node, attr):
+            self._node = node
+            self._attr = attr
+
+        def asString(self):
+            return self._node.attrs[self._attr]
+
+        def asBool(self):
+            return bool(self._node.attrs[self._attr])
+
+        def name(self):
+            return '{}.{}'.format(self._node.name, self._attr)
+
+    class MSelectionList(object):
+        def __init__(self):
+            self._items = []
+
+        def add(self, item):
+            scene.api_calls['MSelectionList.add'] += 1
+            self._items.append(scene.split_plug(item))
+            return self
+
+        def length(self):
+            return len(self._items)
+
+        def getDependNode(self, i):
+            return MObject(self._items[i][0])
+
+        def getDagPath(self, i):
+            return MDagPath(self._items[i][0])
+
+        def getPlug(self, i):
+            node, attr = self._items[i]
+            return MPlug(node, attr)
+
+    class MItDependencyNodes(object):
+        def __init__(self, fn):
+            scene.api_calls['MItDependencyNodes'] += 1
+            self._nodes = [node for node in scene.nodes.values() if MObject(node).hasFn(fn)]
+            self._i = 0
+
+        def isDone(self):
+            return self._i >= len(self._nodes)
+
+        def thisNode(self):
+            return MObject(self._nodes[self._i])
+
+        def next(self):
+            self._i += 1
+
+    class MFnReference(object):
+        def __init__(self, obj):
+            scene.api_calls['MFnReference'] += 1
+            self._node = obj._node
+
+        def name(self):
+            return self._node.name
+
+        def fileName(self, resolved, include_path, include_copy_number):
+            path = scene.references[self._node.name]
+            return path if include_path else os.path.basename(path)
+
+        def isLoaded(self):
+            return True
+
+        def associatedNamespace(self, short_name):
+            return self._node.name[:-2] if short_name else ':' + self._node.name[:-2]
+
+    class MSceneMessage(object):
+        kAfterCreateReference = 'kAfterCreateReference'
+        kAfterRemoveReference = 'kAfterRemoveReference'
+        kAfterLoadReference = 'kAfterLoadReference'
+        kAfterUnloadReference = 'kAfterUnloadReference'
+        kAfterImportReference = 'kAfterImportReference'
+        kAfterOpen = 'kAfterOpen'
+        kAfterNew = 'kAfterNew'
+
+        @staticmethod
+        def addCallback(message, func):
+            scene.callbacks.setdefault(message, []).append(func)
+            callback_id = len(scene.callback_ids) + 1
+            scene.callback_ids[callback_id] = (message, func)
+            return callback_id
+
+    class MMessage(object):
+        @staticmethod
+        def removeCallbacks(callback_ids):
+            for callback_id in callback_ids:
+                message, func = scene.callback_ids.pop(callback_id)
+                scene.callbacks[message].remove(func)
+
+    om.MFn = MFn
+    om.MSelectionList = MSelectionList
+    om.MItDependencyNodes = MItDependencyNodes
+    om.MFnReference = MFnReference
+    om.MSceneMessage = MSceneMessage
+    om.MMessage = MMessage
+    return om
+
+
+def install(scene=None):
+    """Registra los modulos maya falsos en sys.modules y devuelve la escena"""
+    scene = scene or FakeScene()
+
+    maya = types.ModuleType('maya')
+    maya_api = types.ModuleType('maya.api')
+    cmds = build_cmds(scene)
+    om = build_open_maya(scene)
+    mel = types.ModuleType('maya.mel')
+    mel.eval = _counted(scene, 'mel.eval', lambda command: None)
+
+    maya.cmds = cmds
+    maya.mel = mel
+    maya.api = maya_api
+    maya_api.OpenMaya = om
+
+    sys.modules['maya'] = maya
+    sys.modules['maya.cmds'] = cmds
+    sys.modules['maya.mel'] = mel
+    sys.modules['maya.api'] = maya_api
+    sys.modules['maya.api.OpenMaya'] = om
+    return scene
@@ -1,7 +1,16 @@
 import maya.cmds as cmds
 import os
+import sys
 import json
 
+try:
+    utils_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'utils')
+    if utils_dir not in sys.path:
+        sys.path.insert(0, utils_dir)
+    from helpers import confirm_dialog
+except ImportError:
+    confirm_dialog = cmds.confirmDialog
+
 def validate_pinkooland_project():
 
     
@@ -35,7 +44,7 @@ def validate_pinkooland_project():
         print("Security Check: Project validation successful.")
         return True
     else:
-        cmds.confirmDialog(
+        confirm_dialog(
             title='Security validation failed', 
             message='You are not working in Pinkooland Project.\nPlease set your project correctly.', 
             button=['OK'], 
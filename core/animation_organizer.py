@@ -6,6 +6,7 @@ Script completo para organizar escenas de animacion
 import maya.cmds as cmds
 import sys
 import os
+from collections import deque
 
 # Importar helpers
 try:
@@ -26,81 +27,173 @@ try:
     get_export_path = helpers.get_export_path
     get_scene_data = helpers.get_scene_data
     ensure_attribute_exists = helpers.ensure_attribute_exists
+    SceneIndex = helpers.SceneIndex
+    get_scene_context = helpers.get_scene_context
+    SceneSuspend = helpers.SceneSuspend
+    confirm_dialog = helpers.confirm_dialog
+    
+    import profiling
+    span = profiling.span
+    timed = profiling.timed
     
 except ImportError as e:
-    print("Warning: Could not import helpers - {}".format(e))
-    # Fallback: definir funciones basicas
-    import re
-    
-    def get_sq_from_scene():
-        return 'PKL_SQ01'
-    
-    def get_sh_from_scene():
-        return 'SH010'
-    
-    def get_export_path():
-        return '<workspace_root>/Unreal/animation/PKL_SQ01/SH010'
-    
-    def get_scene_data():
-        return {'sq': 'PKL_SQ01', 'sh': 'SH010', 'export_path': get_export_path()}
-    
-    def ensure_attribute_exists(obj, attr_name, attr_type='string', default_value='', lock=False):
-        attr_full_name = obj + '.' + attr_name
-        if not cmds.attributeQuery(attr_name, node=obj, exists=True):
-            if attr_type == 'string':
-                cmds.addAttr(obj, longName=attr_name, dataType='string')
-                cmds.setAttr(attr_full_name, default_value, type='string')
-            elif attr_type == 'bool':
-                cmds.addAttr(obj, longName=attr_name, attributeType='bool', defaultValue=default_value)
-        if lock:
-            cmds.setAttr(attr_full_name, lock=True)
+    # Sin helpers/profiling no hay SceneIndex/SceneContext/SceneSuspend: el
+    # modulo no puede funcionar, el error llega a quien lo importa (la UI avisa)
+    print("Error: Could not import helpers - {}".format(e))
+    raise
 
 
 # ====== FUNCIONES ESPECIFICAS DE ORGANIZACION ======
 
-def find_objects_with_hierarchy_attribute(hierarchy_value):
+# Grupos desde donde se organiza la jerarquia
+HIERARCHY_ROOTS = ('ANIMATION', 'CH', 'PR', 'CAMERA')
+
+def find_objects_with_hierarchy_attribute(hierarchy_value, index=None):
     """Busca objetos con atributo Hierarchy = valor especifico"""
-    objects_with_hierarchy = []
-    all_transforms = cmds.ls(type='transform')
-    
-    for obj in all_transforms:
-        if cmds.attributeQuery('Hierarchy', node=obj, exists=True):
-            current_value = cmds.getAttr(obj + '.Hierarchy')
-            if current_value == hierarchy_value:
-                objects_with_hierarchy.append(obj)
+    if index is None:
+        index = SceneIndex.build()
     
-    return objects_with_hierarchy
+    return [node.name for node in index.find('Hierarchy', hierarchy_value)]
 
-def get_next_available_number(base_name):
-    """Encuentra el siguiente numero disponible para un nombre"""
-    number = 1
-    while cmds.objExists('{}_{}'.format(base_name, number)):
-        number += 1
-    return number
+class NameAllocator(object):
+    """
+    Reparte numeros libres para nombres <Name>_<n> durante una operacion
+    
+    Lee los sufijos que ya existen con un solo cmds.ls (un patron por
+    nombre base) y despues entrega cada numero en O(1): el menor n >= 1
+    para el que <Name>_<n> no existe en la escena.
+    Los numeros entregados se marcan como usados, asi que varios templates
+    con el mismo Name en la misma pasada reciben numeros distintos.
+    """
+    
+    def __init__(self, base_names):
+        self._used = {}
+        self._cursor = {}
+        self._load(base_names)
+    
+    def _load(self, base_names):
+        bases = sorted(set(base_names) - set(self._used))
+        if not bases:
+            return
+        
+        for base in bases:
+            self._used[base] = set()
+            self._cursor[base] = 1
+        
+        existing = cmds.ls(['{}_*'.format(base) for base in bases]) or []
+        for name in existing:
+            base, _, suffix = name.rsplit('|', 1)[-1].rpartition('_')
+            # Solo sufijos canonicos: NAME_01 no ocupa el 1
+            if base in self._used and suffix.isdigit() and str(int(suffix)) == suffix:
+                self._used[base].add(int(suffix))
+    
+    def next_number(self, base_name):
+        """Devuelve y reserva el siguiente numero libre para base_name"""
+        if base_name not in self._used:
+            self._load([base_name])
+        
+        used = self._used[base_name]
+        number = self._cursor[base_name]
+        while number in used:
+            number += 1
+        
+        used.add(number)
+        self._cursor[base_name] = number + 1
+        return number
 
-def organize_hierarchy_recursive(parent_name):
-    """Organiza jerarquia recursivamente"""
-    if not cmds.objExists(parent_name):
-        return
+def build_hierarchy_plan(index, roots=HIERARCHY_ROOTS):
+    """
+    Calcula en una sola pasada que nodo va debajo de que grupo
     
-    objects_to_parent = find_objects_with_hierarchy_attribute(parent_name)
+    Un nodo con Hierarchy = X va debajo del nodo llamado X. Solo se
+    organizan los grupos alcanzables desde roots (ANIMATION, CH, PR, CAMERA).
+    Las camaras con IsInGroup = True no se mueven del grupo donde estan.
     
-    for obj in objects_to_parent:
-        if obj != parent_name:
+    Args:
+        index: SceneIndex de la escena
+        roots: Grupos desde donde se recorre la jerarquia
+        
+    Returns:
+        dict: {
+            'moves': [(destino, [nodos a parentear]), ...] en orden padre -> hijo,
+            'in_place': [nodos que ya estan bajo su destino],
+            'in_group': [camaras saltadas por IsInGroup]
+        }
+    """
+    # Una pasada: valor de Hierarchy -> nodos que lo tienen
+    children_by_value = {}
+    for node in index.carriers('Hierarchy'):
+        children_by_value.setdefault(node.hierarchy, []).append(node)
+    
+    plan = {'moves': [], 'in_place': [], 'in_group': []}
+    visited = set()
+    queue = deque(index.get(root) for root in roots)
+    
+    while queue:
+        destination = queue.popleft()
+        if destination is None or destination.long_name in visited:
+            continue
+        visited.add(destination.long_name)
+        
+        to_parent = []
+        for node in children_by_value.get(destination.name, []):
+            if node is destination:
+                continue
+            
             # Condicion especial para camaras: verificar IsInGroup
-            if parent_name == 'CAMERA':
-                if cmds.attributeQuery('IsInGroup', node=obj, exists=True):
-                    is_in_group = cmds.getAttr(obj + '.IsInGroup')
-                    if is_in_group:
-                        print('  "{}" skipped (IsInGroup = True)'.format(obj))
-                        continue
+            if destination.name == 'CAMERA' and node.get('IsInGroup'):
+                plan['in_group'].append(node.name)
+                continue
             
-            current_parent = cmds.listRelatives(obj, parent=True)
-            if not current_parent or current_parent[0] != parent_name:
-                cmds.parent(obj, parent_name)
-                print('  "{}" parenteado a "{}"'.format(obj, parent_name))
+            if node.long_name.rsplit('|', 1)[0] == destination.long_name:
+                plan['in_place'].append(node.name)
+            else:
+                to_parent.append(node.name)
             
-            organize_hierarchy_recursive(obj)
+            queue.append(node)
+        
+        if to_parent:
+            plan['moves'].append((destination.name, to_parent))
+    
+    return plan
+
+def apply_hierarchy_plan(plan, index):
+    """
+    Aplica el plan con un solo cmds.parent por grupo destino
+    
+    Returns:
+        int: Numero de nodos reparenteados
+    """
+    reparented = 0
+    
+    for destination, nodes in plan['moves']:
+        cmds.parent(nodes, destination)
+        index.reparent(nodes, destination)
+        reparented += len(nodes)
+        
+        for obj in nodes:
+            print('  "{}" parenteado a "{}"'.format(obj, destination))
+    
+    for obj in plan['in_group']:
+        print('  "{}" skipped (IsInGroup = True)'.format(obj))
+    
+    return reparented
+
+def organize_hierarchy(index, roots=HIERARCHY_ROOTS):
+    """
+    Organiza toda la jerarquia segun los atributos Hierarchy
+    
+    Returns:
+        dict: {'reparented': int, 'in_place': int, 'in_group': int}
+    """
+    plan = build_hierarchy_plan(index, roots)
+    reparented = apply_hierarchy_plan(plan, index)
+    
+    return {
+        'reparented': reparented,
+        'in_place': len(plan['in_place']),
+        'in_group': len(plan['in_group'])
+    }
 
 def create_child_group(parent, group_name, hierarchy_value='ANIMATION'):
     """Crea un grupo hijo con Hierarchy"""
@@ -125,8 +218,7 @@ def setup_camera_group(scene_data):
         return False
     
     # Obtener frame range del timeline
-    start = cmds.playbackOptions(query=True, minTime=True)
-    end = cmds.playbackOptions(query=True, maxTime=True)
+    start, end = get_scene_context().frame_range
     
     # Construir ExportedName: CAM_PKL_S1_SH010_001_100
     exported_name = "CAM_{}_{}_{}_{}" .format(
@@ -177,88 +269,105 @@ def setup_camera_group(scene_data):
     
     return True
 
-def update_dynamic_groups():
+def update_dynamic_groups(index=None):
     """Actualiza grupos dinamicos existentes"""
     scene_data = get_scene_data()
-    all_transforms = cmds.ls(type='transform')
+    if index is None:
+        index = SceneIndex.build()
     
-    for obj in all_transforms:
+    for node in index.carriers('ExportedName'):
+        obj = node.name
+        
         # Saltar el grupo CAMERA - tiene su propia logica
         if obj == 'CAMERA':
             continue
             
-        if cmds.attributeQuery('ExportedName', node=obj, exists=True):
-            if cmds.attributeQuery('Hierarchy', node=obj, exists=True):
-                category = cmds.getAttr(obj + '.Hierarchy')
-                
-                exported_name = '{}_{}_{}_{}' .format(
-                    category, obj, 
-                    scene_data['sq'], scene_data['sh']
-                )
-                ensure_attribute_exists(obj, 'ExportedName', 'string', exported_name, lock=True)
-                
-                path_value = '{}/{}'.format(scene_data['export_path'], category)
-                ensure_attribute_exists(obj, 'Path', 'string', path_value, lock=True)
-                
-                ensure_attribute_exists(obj, 'Exportable', 'bool', True, lock=False)
+        if node.has('Hierarchy'):
+            category = node.hierarchy
+            
+            exported_name = '{}_{}_{}_{}' .format(
+                category, obj, 
+                scene_data['sq'], scene_data['sh']
+            )
+            ensure_attribute_exists(obj, 'ExportedName', 'string', exported_name, lock=True)
+            
+            path_value = '{}/{}'.format(scene_data['export_path'], category)
+            ensure_attribute_exists(obj, 'Path', 'string', path_value, lock=True)
+            
+            ensure_attribute_exists(obj, 'Exportable', 'bool', True, lock=False)
+            
+            index.set_value(obj, 'ExportedName', exported_name)
+            index.set_value(obj, 'Path', path_value)
+            index.set_value(obj, 'Exportable', True)
 
-def process_template_groups():
+def process_template_groups(index=None):
     """Procesa grupos template y crea grupos dinamicos"""
     scene_data = get_scene_data()
-    all_transforms = cmds.ls(type='transform')
+    if index is None:
+        index = SceneIndex.build()
     processed = []
     
-    for obj in all_transforms:
-        has_category = cmds.attributeQuery('Category', node=obj, exists=True)
-        has_hierarchy = cmds.attributeQuery('Hierarchy', node=obj, exists=True)
-        has_name = cmds.attributeQuery('Name', node=obj, exists=True)
+    templates = [
+        node for node in index.carriers('Category')
+        if node.has('Hierarchy') and node.has('Name')
+    ]
+    allocator = NameAllocator([node.get('Name') for node in templates])
+    
+    for node in templates:
+        obj = node.name
+        
+        category = node.get('Category')
+        hierarchy_pattern = node.hierarchy
+        name_value = node.get('Name')
         
-        if has_category and has_hierarchy and has_name:
-            category = cmds.getAttr(obj + '.Category')
-            hierarchy_pattern = cmds.getAttr(obj + '.Hierarchy')
-            name_value = cmds.getAttr(obj + '.Name')
+        if '{Name}_#' in hierarchy_pattern:
+            current_parent = cmds.listRelatives(obj, parent=True)
             
-            if '{Name}_#' in hierarchy_pattern:
-                current_parent = cmds.listRelatives(obj, parent=True)
+            skip = False
+            if current_parent:
+                parent_name = current_parent[0]
+                if parent_name.startswith(name_value + '_'):
+                    suffix = parent_name.replace(name_value + '_', '')
+                    if suffix.isdigit():
+                        if index.value(parent_name, 'Hierarchy') == category:
+                            skip = True
+            
+            if not skip:
+                next_number = allocator.next_number(name_value)
+                new_group_name = '{}_{}'.format(name_value, next_number)
+                new_group = cmds.group(empty=True, name=new_group_name)
                 
-                skip = False
-                if current_parent:
-                    parent_name = current_parent[0]
-                    if parent_name.startswith(name_value + '_'):
-                        suffix = parent_name.replace(name_value + '_', '')
-                        if suffix.isdigit():
-                            if cmds.attributeQuery('Hierarchy', node=parent_name, exists=True):
-                                parent_hierarchy = cmds.getAttr(parent_name + '.Hierarchy')
-                                if parent_hierarchy == category:
-                                    skip = True
+                ensure_attribute_exists(new_group, 'Hierarchy', 'string', category, lock=True)
                 
-                if not skip:
-                    next_number = get_next_available_number(name_value)
-                    new_group_name = '{}_{}'.format(name_value, next_number)
-                    new_group = cmds.group(empty=True, name=new_group_name)
-                    
-                    ensure_attribute_exists(new_group, 'Hierarchy', 'string', category, lock=True)
-                    
-                    exported_name = '{}_{}_{}_{}' .format(
-                        category, new_group_name, 
-                        scene_data['sq'], scene_data['sh']
-                    )
-                    ensure_attribute_exists(new_group, 'ExportedName', 'string', exported_name, lock=True)
-                    
-                    path_value = '{}/{}'.format(scene_data['export_path'], category)
-                    ensure_attribute_exists(new_group, 'Path', 'string', path_value, lock=True)
-                    ensure_attribute_exists(new_group, 'Exportable', 'bool', True, lock=False)
-                    
-                    cmds.parent(obj, new_group)
-                    processed.append(new_group_name)
-                    
-                    print('  Grupo "{}" creado desde template "{}"'.format(new_group_name, obj))
-    
+                exported_name = '{}_{}_{}_{}' .format(
+                    category, new_group_name, 
+                    scene_data['sq'], scene_data['sh']
+                )
+                ensure_attribute_exists(new_group, 'ExportedName', 'string', exported_name, lock=True)
+                
+                path_value = '{}/{}'.format(scene_data['export_path'], category)
+                ensure_attribute_exists(new_group, 'Path', 'string', path_value, lock=True)
+                ensure_attribute_exists(new_group, 'Exportable', 'bool', True, lock=False)
+                
+                cmds.parent(obj, new_group)
+                processed.append(new_group_name)
+                
+                index.add_node('|' + new_group, new_group, {
+                    'Hierarchy': category,
+                    'ExportedName': exported_name,
+                    'Path': path_value,
+                    'Exportable': True
+                })
+                index.reparent([obj], new_group)
+                
+                print('  Grupo "{}" creado desde template "{}"'.format(new_group_name, obj))
+
     return processed
 
 
 # ====== FUNCION PRINCIPAL ======
 
+@timed('organize_animation')
 def organize_animation():
     """
     FUNCION PRINCIPAL - Organiza toda la escena de animacion
@@ -269,11 +378,11 @@ def organize_animation():
     print("=" * 60)
     
     # Validar que estamos en una escena de animacion
-    scene_name = cmds.file(query=True, sceneName=True, shortName=True)
+    scene_name = get_scene_context().scene_name
     
     if not scene_name:
         cmds.warning("Scene must be saved before organizing")
-        cmds.confirmDialog(
+        confirm_dialog(
             title='Scene Not Saved',
             message='Please save the scene before organizing.',
             button=['OK'],
@@ -283,7 +392,7 @@ def organize_animation():
     
     if '_anim_' not in scene_name.lower():
         cmds.warning("This is not an animation scene")
-        cmds.confirmDialog(
+        confirm_dialog(
             title='Not an Animation Scene',
             message='Currently this is not an Animation Scene \n or is not in the pipeline workflow.',
             button=['OK'],
@@ -291,54 +400,64 @@ def organize_animation():
         )
         return False
     
-    # Obtener datos de la escena (usando helpers)
-    scene_data = get_scene_data()
-    
-    print("\nDatos de la escena:")
-    print("  SQ: {}".format(scene_data['sq']))
-    print("  SH: {}".format(scene_data['sh']))
-    print("  Export Path: {}".format(scene_data['export_path']))
-    
-    # Crear o actualizar grupo ANIMATION
-    print("\n1. Configurando grupo ANIMATION...")
-    if cmds.objExists('ANIMATION'):
-        print("  Grupo ANIMATION ya existe, actualizando...")
-        animation_group = 'ANIMATION'
-    else:
-        animation_group = cmds.group(empty=True, name='ANIMATION')
-        print("  Grupo ANIMATION creado")
-    
-    ensure_attribute_exists(animation_group, 'ExportedPath', 'string', scene_data['export_path'], lock=True)
-    ensure_attribute_exists(animation_group, 'SQ', 'string', scene_data['sq'], lock=True)
-    ensure_attribute_exists(animation_group, 'SH', 'string', scene_data['sh'], lock=True)
-    
-    # Crear grupos hijos
-    print("\n2. Creando grupos hijos...")
-    create_child_group(animation_group, 'CH', 'CH')
-    create_child_group(animation_group, 'PR', 'PR')
-    create_child_group(animation_group, 'CAMERA', 'CAMERA')
-    print("  Grupos CH, PR y CAMERA verificados")
-    
-    # Configurar grupo CAMERA con sus atributos especiales
-    print("\n3. Configurando atributos de CAMERA...")
-    setup_camera_group(scene_data)
-    
-    # Actualizar grupos dinamicos
-    print("\n4. Actualizando grupos dinamicos...")
-    update_dynamic_groups()
-    
-    # Procesar templates
-    print("\n5. Procesando grupos template...")
-    templates = process_template_groups()
-    if templates:
-        print("  {} grupos dinamicos creados".format(len(templates)))
-    
-    # Organizar jerarquia
-    print("\n6. Organizando jerarquia...")
-    organize_hierarchy_recursive('ANIMATION')
-    organize_hierarchy_recursive('CH')
-    organize_hierarchy_recursive('PR')
-    organize_hierarchy_recursive('CAMERA')
+    # Todo el organize es un solo paso de undo, sin refresh del viewport
+    with SceneSuspend('pkl_organize_animation'):
+        # Obtener datos de la escena (usando helpers)
+        scene_data = get_scene_data()
+        
+        print("\nDatos de la escena:")
+        print("  SQ: {}".format(scene_data['sq']))
+        print("  SH: {}".format(scene_data['sh']))
+        print("  Export Path: {}".format(scene_data['export_path']))
+        
+        # Crear o actualizar grupo ANIMATION
+        print("\n1. Configurando grupo ANIMATION...")
+        with span('animation_group'):
+            if cmds.objExists('ANIMATION'):
+                print("  Grupo ANIMATION ya existe, actualizando...")
+                animation_group = 'ANIMATION'
+            else:
+                animation_group = cmds.group(empty=True, name='ANIMATION')
+                print("  Grupo ANIMATION creado")
+            
+            ensure_attribute_exists(animation_group, 'ExportedPath', 'string', scene_data['export_path'], lock=True)
+            ensure_attribute_exists(animation_group, 'SQ', 'string', scene_data['sq'], lock=True)
+            ensure_attribute_exists(animation_group, 'SH', 'string', scene_data['sh'], lock=True)
+        
+        # Crear grupos hijos
+        print("\n2. Creando grupos hijos...")
+        with span('child_groups'):
+            create_child_group(animation_group, 'CH', 'CH')
+            create_child_group(animation_group, 'PR', 'PR')
+            create_child_group(animation_group, 'CAMERA', 'CAMERA')
+        print("  Grupos CH, PR y CAMERA verificados")
+        
+        # Configurar grupo CAMERA con sus atributos especiales
+        print("\n3. Configurando atributos de CAMERA...")
+        with span('camera_attributes'):
+            setup_camera_group(scene_data)
+        
+        # Actualizar grupos dinamicos
+        print("\n4. Actualizando grupos dinamicos...")
+        with span('discovery'):
+            index = SceneIndex.build()
+        with span('dynamic_groups'):
+            update_dynamic_groups(index)
+        
+        # Procesar templates
+        print("\n5. Procesando grupos template...")
+        with span('templates'):
+            templates = process_template_groups(index)
+        if templates:
+            print("  {} grupos dinamicos creados".format(len(templates)))
+        
+        # Organizar jerarquia
+        print("\n6. Organizando jerarquia...")
+        with span('hierarchy', nodes=len(index)):
+            stats = organize_hierarchy(index)
+        print("  {} reparenteados, {} ya estaban en su grupo (skipped), {} camaras IsInGroup".format(
+            stats['reparented'], stats['in_place'], stats['in_group']
+        ))
     
     print("\n" + "=" * 60)
     print("ORGANIZACION COMPLETADA CON EXITO")
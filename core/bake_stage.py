@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+PKL Pipeline - Bake Stage
+Hornea en un solo recorrido del timeline todos los skeletons exportables
+y la camara UE, antes de escribir los FBX
+
+Sin esto cada FBXExport hace su propio bake complejo y la camara su
+propio bakeResults: la escena se evalua N+1 veces. Con BakeStage se
+evalua una vez y los FBX se escriben con el bake complejo desactivado.
+
+El bake modifica la escena (keys en los joints), asi que todo el stage
+corre dentro de un undo chunk que se deshace al salir.
+
+Uso:
+    with BakeStage() as stage:
+        stage.add_skeleton(root_joint)
+        stage.add_camera(ue_camera, constraint)
+        stage.bake(start, end)
+        ...FBXExport con prebaked=True...
+    # la escena vuelve al estado anterior
+"""
+import maya.cmds as cmds
+
+
+# Canales que se hornean en los joints (lo mismo que exporta el FBX)
+SKELETON_ATTRIBUTES = ['tx', 'ty', 'tz', 'rx', 'ry', 'rz', 'sx', 'sy', 'sz']
+
+# Canales de la camara UE (igual que camera_exporter.bake_ue_camera)
+CAMERA_ATTRIBUTES = ['tx', 'ty', 'tz', 'rx', 'ry', 'rz']
+
+UNDO_CHUNK_NAME = 'pkl_bake_stage'
+
+
+def skeleton_joints(root):
+    """Root joint + todos sus joints descendientes (paths completos)"""
+    root_long = (cmds.ls(root, long=True) or [root])[0]
+    return [root_long] + (cmds.listRelatives(root_long, allDescendents=True,
+                                             type='joint', fullPath=True) or [])
+
+
+class BakeStage(object):
+    """
+    Bake unico de skeletons + camara dentro de un undo chunk
+
+    Al salir del with se cierra el chunk y se deshace: se borran las keys
+    horneadas, la camara UE y cualquier seleccion hecha para exportar.
+    """
+
+    def __init__(self):
+        self.joints = []
+        self.cameras = []
+        self.constraints = []
+        self._undo_state = None
+        self._chunk_open = False
+
+    def __enter__(self):
+        # mayapy suele correr con el undo desactivado
+        self._undo_state = cmds.undoInfo(query=True, state=True)
+        if not self._undo_state:
+            cmds.undoInfo(state=True)
+        cmds.undoInfo(openChunk=True, chunkName=UNDO_CHUNK_NAME)
+        self._chunk_open = True
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.restore()
+        return False
+
+    def add_skeleton(self, root):
+        """Agrega un skeleton (root joint) al bake"""
+        for joint in skeleton_joints(root):
+            if joint not in self.joints:
+                self.joints.append(joint)
+
+    def add_camera(self, transform, constraint=None):
+        """Agrega la camara UE (y el constraint que se borra despues del bake)"""
+        self.cameras.append(transform)
+        if constraint:
+            self.constraints.append(constraint)
+
+    def bake(self, start_frame, end_frame):
+        """
+        Un solo bakeResults para todos los nodos (una evaluacion del timeline)
+
+        Returns:
+            int: Cantidad de nodos horneados
+        """
+        nodes = self.joints + self.cameras
+        if not nodes:
+            return 0
+
+        print("\nBaking {} joint(s) and {} camera(s) in one pass ({} - {})...".format(
+            len(self.joints), len(self.cameras), start_frame, end_frame))
+
+        # Con skeletons se hornea tambien la escala (en la camara queda constante)
+        attributes = SKELETON_ATTRIBUTES if self.joints else CAMERA_ATTRIBUTES
+        cmds.bakeResults(
+            nodes,
+            simulation=True,
+            t=(start_frame, end_frame),
+            sampleBy=1,
+            at=attributes,
+            disableImplicitControl=True,
+            preserveOutsideKeys=True,
+            sparseAnimCurveBake=False
+        )
+
+        if self.constraints:
+            cmds.delete(self.constraints)
+            self.constraints = []
+
+        return len(nodes)
+
+    def restore(self):
+        """Cierra el undo chunk y lo deshace (vuelve la escena a como estaba)"""
+        if not self._chunk_open:
+            return
+
+        cmds.undoInfo(closeChunk=True)
+        self._chunk_open = False
+
+        try:
+            if UNDO_CHUNK_NAME in (cmds.undoInfo(query=True, undoName=True) or ''):
+                cmds.undo()
+            else:
+                cmds.warning("Bake stage could not be undone - scene contains baked keys")
+        finally:
+            if not self._undo_state:
+                cmds.undoInfo(state=False)
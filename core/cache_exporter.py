@@ -0,0 +1,255 @@
+# -*- coding: utf-8 -*-
+"""
+PKL Pipeline - Cache Exporter
+Exporta a Alembic los grupos exportables sin skeleton (props que deforman,
+cloth...)
+
+Usa los mismos atributos que el export FBX (ExportedName, Path) y las
+mismas convenciones: scratch local + publish al share, manifest sidecar
+para la exportacion incremental y entradas en el manifest del shot.
+
+Todos los grupos se escriben con un solo AbcExport (un job -j por grupo):
+el timeline se evalua una vez para todos los caches.
+"""
+import maya.cmds as cmds
+import os
+import sys
+
+# Importar helpers
+try:
+    current_file = os.path.abspath(__file__)
+    core_dir = os.path.dirname(current_file)
+    parent_dir = os.path.dirname(core_dir)
+    utils_dir = os.path.join(parent_dir, 'utils')
+
+    if utils_dir not in sys.path:
+        sys.path.insert(0, utils_dir)
+
+    import helpers
+    import export_manifest
+    import export_publisher
+    import fs_probe
+    get_scene_context = helpers.get_scene_context
+
+except ImportError as e:
+    # Sin helpers/manifests no se puede exportar: export_engine (que importa
+    # este modulo) tampoco carga y la UI avisa
+    print("Error: Could not import helpers - {}".format(e))
+    raise
+
+
+# Opciones de cada job de AbcExport (el rango, los roots y el archivo se
+# agregan por grupo)
+ABC_OPTIONS = (
+    '-uvWrite',
+    '-writeUVSets',
+    '-writeVisibility',
+    '-worldSpace',
+    '-eulerFilter',
+    '-dataFormat ogawa',
+)
+
+CACHE_EXTENSION = '.abc'
+
+
+def abc_settings_hash():
+    """Hash de las opciones de AbcExport (para los manifests)"""
+    return export_manifest.digest(ABC_OPTIONS)
+
+
+def ensure_abc_plugin():
+    """Carga el plugin AbcExport si hace falta"""
+    if not cmds.pluginInfo('AbcExport', query=True, loaded=True):
+        cmds.loadPlugin('AbcExport', quiet=True)
+
+
+def find_cache_roots(group):
+    """
+    Transforms con mesh dentro del grupo (sin anidar: AbcExport no acepta
+    un root dentro de otro)
+
+    Returns:
+        list: Paths completos de los roots del cache
+    """
+    meshes = cmds.listRelatives(group, allDescendents=True, type='mesh', fullPath=True) or []
+    meshes = cmds.ls(meshes, noIntermediate=True, long=True) or []
+    transforms = sorted(set(cmds.listRelatives(meshes, parent=True, fullPath=True) or []))
+
+    roots = []
+    for transform in transforms:
+        if not any(transform.startswith(root + '|') for root in roots):
+            roots.append(transform)
+    return roots
+
+
+def compute_cache_fingerprint(roots, start_frame, end_frame):
+    """
+    Partes del fingerprint de un cache (ver export_engine.compute_export_fingerprint)
+
+    - curves: keys de las animCurves en la historia de las mallas
+      (deformers, skinClusters, controles del rig)
+    - pose: matrices de los roots en el primer frame
+    - rig: archivos referenciados de los roots y su mtime
+    """
+    history = cmds.listHistory(roots) or []
+    curves = sorted(set(cmds.ls(history, type='animCurve') or []))
+
+    curve_data = []
+    for curve in curves:
+        curve_data.append(curve)
+        curve_data.append(cmds.keyframe(curve, query=True, timeChange=True, valueChange=True))
+
+    pose = []
+    for root in roots:
+        matrix = cmds.getAttr(root + '.worldMatrix', time=start_frame)
+        pose.append([round(v, 5) for v in matrix])
+
+    rigs = []
+    for root in roots:
+        try:
+            if not cmds.referenceQuery(root, isNodeReferenced=True):
+                continue
+            rig_file = cmds.referenceQuery(root, filename=True, withoutCopyNumber=True)
+        except RuntimeError:
+            continue
+        rig_path = os.path.expandvars(rig_file)
+        rig_mtime = fs_probe.mtime(rig_path)
+        rig_mtime = int(rig_mtime) if rig_mtime is not None else None
+        if [rig_file, rig_mtime] not in rigs:
+            rigs.append([rig_file, rig_mtime])
+
+    return {
+        'roots': [root.split('|')[-1].split(':')[-1] for root in roots],
+        'curves': export_manifest.digest(curve_data),
+        'curve_count': len(curves),
+        'pose': export_manifest.digest(pose),
+        'rig': sorted(rigs),
+        'frame_range': [start_frame, end_frame],
+        'abc_settings': abc_settings_hash(),
+    }
+
+
+def prepare_cache_export(group_data, start_frame, end_frame, incremental=False):
+    """
+    Etapa collect de un grupo sin skeleton
+
+    Args:
+        group_data: Dict con info del grupo {group, exported_name, path, exportable}
+        start_frame: Frame inicial
+        end_frame: Frame final
+        incremental: Marcar como UP_TO_DATE si el fingerprint no cambio
+
+    Returns:
+        dict: {success, message, path, group, exported_name, roots, parts}.
+              success=False si el grupo no tiene geometria
+    """
+    group = group_data['group']
+    exported_name = group_data['exported_name']
+
+    roots = find_cache_roots(group)
+    if not roots:
+        print("  [SKIP] No geometry to cache in group")
+        return {
+            'success': False,
+            'message': 'No exportable skeleton or geometry found',
+            'path': None
+        }
+
+    export_dir = get_scene_context().resolve_path(group_data['path'])
+    cache_path = os.path.join(export_dir, exported_name + CACHE_EXTENSION).replace('\\', '/')
+
+    print("  [CACHE] No skeleton - {} mesh root(s) as Alembic".format(len(roots)))
+    print("  Export Path: {}".format(cache_path))
+
+    parts = compute_cache_fingerprint(roots, start_frame, end_frame)
+    target = {
+        'success': True,
+        'message': 'Ready to export',
+        'path': cache_path,
+        'group': group,
+        'exported_name': exported_name,
+        'roots': roots,
+        'parts': parts
+    }
+
+    if incremental:
+        up_to_date, changed = export_manifest.check(cache_path, parts)
+        if up_to_date:
+            print("  [UP TO DATE] Nothing changed since last export")
+            target['message'] = export_manifest.UP_TO_DATE
+            return target
+        print("  Changed: {}".format(', '.join(changed)))
+
+    return target
+
+
+def build_job(roots, local_path, start_frame, end_frame):
+    """String de un job (-j) de AbcExport"""
+    args = ['-frameRange {} {}'.format(start_frame, end_frame)]
+    args += list(ABC_OPTIONS)
+    args += ['-root {}'.format(root) for root in roots]
+    args.append('-file "{}"'.format(local_path))
+    return ' '.join(args)
+
+
+def export_caches(targets, start_frame, end_frame):
+    """
+    Escribe todos los caches con un solo AbcExport y los publica
+
+    Args:
+        targets: Resultados de prepare_cache_export() a exportar
+        start_frame: Frame inicial
+        end_frame: Frame final
+
+    Returns:
+        list: Un dict por target {success, message, path[, publish]}
+    """
+    if not targets:
+        return []
+
+    print("\nWriting {} Alembic cache(s) in one AbcExport...".format(len(targets)))
+
+    local_paths = [export_publisher.scratch_path(target['path']) for target in targets]
+    jobs = [build_job(target['roots'], local_path, start_frame, end_frame)
+            for target, local_path in zip(targets, local_paths)]
+
+    try:
+        ensure_abc_plugin()
+        cmds.AbcExport(jobArg=jobs)
+    except Exception as e:
+        print("  [ERROR] AbcExport failed: {}".format(e))
+        return [{
+            'success': False,
+            'message': 'AbcExport failed: {}'.format(e),
+            'path': None
+        } for target in targets]
+
+    scene_path = get_scene_context().scene_path
+    results = []
+    for target, local_path in zip(targets, local_paths):
+        if not export_publisher.verify_local(local_path):
+            print("  [ERROR] Cache not created: {}".format(target['path']))
+            results.append({
+                'success': False,
+                'message': 'Alembic file not created',
+                'path': None
+            })
+            continue
+
+        manifest_info = {
+            'scene': scene_path,
+            'group': target['group'].split('|')[-1]
+        }
+        job = export_publisher.get_publisher().publish(
+            local_path, target['path'],
+            on_success=lambda result, parts=target['parts'], info=manifest_info: export_manifest.record(
+                result.dest_path, parts, checksum=result.checksum, size=result.size, **info)
+        )
+        results.append({
+            'success': True,
+            'message': 'Exported successfully',
+            'path': target['path'],
+            'publish': job
+        })
+
+    return results
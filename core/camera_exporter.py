@@ -5,14 +5,69 @@ Exporta camaras para Unreal Engine
 """
 import maya.cmds as cmds
 import maya.mel as mel
+import maya.api.OpenMaya as om
 import os
-import re
+import sys
+import time
 
+# Importar helpers
+try:
+    current_file = os.path.abspath(__file__)
+    core_dir = os.path.dirname(current_file)
+    parent_dir = os.path.dirname(core_dir)
+    utils_dir = os.path.join(parent_dir, 'utils')
+    
+    if utils_dir not in sys.path:
+        sys.path.insert(0, utils_dir)
+    if core_dir not in sys.path:
+        sys.path.insert(0, core_dir)
+    
+    import helpers
+    import naming
+    import bake_stage
+    import fbx_presets
+    import export_manifest
+    import export_publisher
+    SceneIndex = helpers.SceneIndex
+    get_scene_context = helpers.get_scene_context
+    SceneSuspend = helpers.SceneSuspend
+    confirm_dialog = helpers.confirm_dialog
+    
+    import profiling
+    span = profiling.span
+    timed = profiling.timed
+    
+except ImportError as e:
+    # Sin helpers/profiling no hay SceneIndex/SceneContext/SceneSuspend: el
+    # modulo no puede funcionar, el error llega a quien lo importa (la UI avisa)
+    print("Error: Could not import helpers - {}".format(e))
+    raise
 
-def find_unreal_camera():
+
+# Bake de la camara UE_:
+#   fast    muestrea la matriz de la camara por frame (getAttr time=) y
+#           escribe una curva por canal de una vez (sin constraint ni
+#           bakeResults)
+#   legacy  parentConstraint + bakeResults(simulation=True)
+# $PKL_CAMERA_BAKE=legacy fuerza el camino anterior
+BAKE_FAST = 'fast'
+BAKE_LEGACY = 'legacy'
+CAMERA_BAKE_MODE = os.environ.get('PKL_CAMERA_BAKE', BAKE_FAST)
+
+CAMERA_CHANNELS = ['translateX', 'translateY', 'translateZ',
+                   'rotateX', 'rotateY', 'rotateZ']
+
+# Atributos del lente que se copian de la camara original
+LENS_ATTRIBUTES = ['focalLength']
+
+
+def find_unreal_camera(index=None):
     """
     Busca la camara con atributo UnrealCamera = True dentro del grupo CAMERA
     
+    Args:
+        index: SceneIndex ya construido (opcional, se construye si no se pasa)
+    
     Returns:
         str: Nombre de la camara encontrada, o None si no existe
     """
@@ -21,28 +76,33 @@ def find_unreal_camera():
         cmds.warning("CAMERA group not found in scene")
         return None
     
-    # Obtener todos los hijos del grupo CAMERA
-    children = cmds.listRelatives('CAMERA', allDescendents=True, type='transform') or []
+    if index is None:
+        index = SceneIndex.build()
+    
+    camera_group = index.resolve('CAMERA')
     
-    # Buscar camaras con UnrealCamera = True
-    for obj in children:
+    # Buscar camaras con UnrealCamera = True debajo del grupo CAMERA
+    for node in index.carriers('UnrealCamera'):
+        if not node.get('UnrealCamera') or not node.is_descendant_of(camera_group):
+            continue
+        
         # Verificar que es una camara
-        shapes = cmds.listRelatives(obj, shapes=True, fullPath=True) or []
+        shapes = cmds.listRelatives(node.long_name, shapes=True, fullPath=True) or []
         if not shapes or cmds.objectType(shapes[0]) != 'camera':
             continue
         
-        # Verificar atributo UnrealCamera
-        if cmds.attributeQuery('UnrealCamera', node=obj, exists=True):
-            if cmds.getAttr(obj + '.UnrealCamera'):
-                return obj
+        return node.name
     
     return None
 
 
-def get_camera_export_info():
+def get_camera_export_info(index=None):
     """
     Lee los atributos del grupo CAMERA para obtener info de exportacion
     
+    Args:
+        index: SceneIndex ya construido (opcional, se construye si no se pasa)
+    
     Returns:
         dict: {'exported_name': str, 'path': str, 'exportable': bool}
         None si no existe el grupo o faltan atributos
@@ -50,19 +110,13 @@ def get_camera_export_info():
     if not cmds.objExists('CAMERA'):
         return None
     
-    # Leer atributos
-    exported_name = None
-    path = None
-    exportable = True
-    
-    if cmds.attributeQuery('ExportedName', node='CAMERA', exists=True):
-        exported_name = cmds.getAttr('CAMERA.ExportedName')
-    
-    if cmds.attributeQuery('Path', node='CAMERA', exists=True):
-        path = cmds.getAttr('CAMERA.Path')
+    if index is None:
+        index = SceneIndex.build()
     
-    if cmds.attributeQuery('Exportable', node='CAMERA', exists=True):
-        exportable = cmds.getAttr('CAMERA.Exportable')
+    # Leer atributos
+    exported_name = index.value('CAMERA', 'ExportedName')
+    path = index.value('CAMERA', 'Path')
+    exportable = index.value('CAMERA', 'Exportable', True)
     
     # Validar que tenemos la info necesaria
     if not exported_name or not path:
@@ -74,36 +128,35 @@ def get_camera_export_info():
         'exportable': exportable
     }
 
-
-def export_ue_camera():
+def resolve_ue_camera(index=None):
     """
-    FUNCION PRINCIPAL - Exporta camara a UE
+    Resuelve que se exportaria sin tocar la escena
     1. Busca camara con UnrealCamera=True en grupo CAMERA
     2. Lee atributos del grupo CAMERA
-    3. Crea camara UE_ duplicada
-    4. Bake animation
-    5. Exporta FBX
-    """
-    print("\n" + "=" * 60)
-    print("PKL PIPELINE - CAMERA EXPORTER")
-    print("=" * 60)
+    3. Valida rango de frames
     
+    Args:
+        index: SceneIndex ya construido (opcional)
+    
+    Returns:
+        dict: {camera, exported_name, fbx_path, start_frame, end_frame}
+              o {'error': (title, message)} si no se puede exportar
+    """
     # ===============================
     # 1. Buscar camara automaticamente
     # ===============================
     
     print("\nSearching for Unreal Camera...")
-    camera = find_unreal_camera()
+    if index is None:
+        index = SceneIndex.build()
+    camera = find_unreal_camera(index)
     
     if not camera:
         cmds.warning("No camera found in CAMERA group")
-        cmds.confirmDialog(
-            title='No Camera Found',
-            message='No Unreal Camera was found inside the CAMERA group.\n\nPlease use Camera Setter first.',
-            button=['OK'],
-            icon='warning'
-        )
-        return False
+        return {'error': (
+            'No Camera Found',
+            'No Unreal Camera was found inside the CAMERA group.\n\nPlease use Camera Setter first.'
+        )}
     
     print("  Camera found: {}".format(camera))
     
@@ -112,27 +165,21 @@ def export_ue_camera():
     # ===============================
     
     print("\nReading CAMERA group attributes...")
-    export_info = get_camera_export_info()
+    export_info = get_camera_export_info(index)
     
     if not export_info:
         cmds.warning("CAMERA group missing")
-        cmds.confirmDialog(
-            title='Missing Group',
-            message='CAMERA group is missing required attributes.\n\nPlease organize the animation scene first.',
-            button=['OK'],
-            icon='warning'
-        )
-        return False
+        return {'error': (
+            'Missing Group',
+            'CAMERA group is missing required attributes.\n\nPlease organize the animation scene first.'
+        )}
     
     if not export_info['exportable']:
         cmds.warning("CAMERA group has Exportable set to False")
-        cmds.confirmDialog(
-            title='Export Disabled',
-            message='CAMERA group has Exportable attribute set to False.',
-            button=['OK'],
-            icon='warning'
-        )
-        return False
+        return {'error': (
+            'Export Disabled',
+            'CAMERA group has Exportable attribute set to False.'
+        )}
     
     exported_name = export_info['exported_name']
     export_path = export_info['path']
@@ -145,18 +192,51 @@ def export_ue_camera():
     # ===============================
     
     # Buscar si la camara tiene patron _FR_##_## (CamTools Logic)
-    range_match = re.search(r'_FR_(\d+)_(\d+)', camera)
+    camera_range = naming.frame_range(naming.parse_stem(camera))
     
-    if range_match:
-        start_frame = int(range_match.group(1))
-        end_frame = int(range_match.group(2))
+    if camera_range:
+        start_frame, end_frame = camera_range
         print("  Frame range from camera name: {} - {}".format(start_frame, end_frame))
     else:
         # Usar timeline actual
-        start_frame = int(cmds.playbackOptions(query=True, minTime=True))
-        end_frame = int(cmds.playbackOptions(query=True, maxTime=True))
+        start_frame, end_frame = get_scene_context().frame_range
         print("  Frame range from timeline: {} - {}".format(start_frame, end_frame))
     
+    # Reemplazar <workspace_root> en el path (el directorio lo crea el publisher)
+    full_export_path = get_scene_context().resolve_path(export_path)
+    fbx_path = os.path.join(full_export_path, "{}.fbx".format(exported_name)).replace("\\", "/")
+    
+    return {
+        'camera': camera,
+        'exported_name': exported_name,
+        'fbx_path': fbx_path,
+        'start_frame': start_frame,
+        'end_frame': end_frame
+    }
+
+
+def prepare_ue_camera(index=None):
+    """
+    Prepara la camara UE_ para exportar (sin bake)
+    1-3. resolve_ue_camera()
+    4. Crea camara UE_ duplicada (sin animacion: ver bake_ue_camera)
+    
+    Args:
+        index: SceneIndex ya construido (opcional)
+    
+    Returns:
+        dict: {camera, transform, shape, constraint, exported_name,
+               fbx_path, start_frame, end_frame}
+              o {'error': (title, message)} si no se puede exportar
+    """
+    prepared = resolve_ue_camera(index)
+    if 'error' in prepared:
+        return prepared
+    
+    camera = prepared['camera']
+    start_frame = prepared['start_frame']
+    end_frame = prepared['end_frame']
+    
     # Configurar timeline
     cmds.playbackOptions(min=start_frame, max=end_frame)
     cmds.playbackOptions(animationStartTime=start_frame, animationEndTime=end_frame)
@@ -174,21 +254,32 @@ def export_ue_camera():
     new_cam_shape = new_cam[1]
     
     # Usar ExportedName para nombrar la camara UE
-    new_cam_transform = cmds.rename(new_cam_transform, exported_name)
+    new_cam_transform = cmds.rename(new_cam_transform, prepared['exported_name'])
     new_cam_shape = cmds.listRelatives(new_cam_transform, shapes=True)[0]
     
     cmds.xform(new_cam_transform, m=world_matrix, ws=True)
     
     print("  UE camera created: {}".format(new_cam_transform))
     
-    # ===============================
-    # 5. Copiar focal length
-    # ===============================
+    prepared.update({
+        'transform': new_cam_transform,
+        'shape': new_cam_shape,
+        'constraint': None
+    })
+    return prepared
+
+
+def attach_ue_camera(prepared):
+    """
+    Camino legacy: copia las keys de focal length y crea el parentConstraint
+    (para bakeResults o BakeStage)
+    """
+    camera = prepared['camera']
     
     print("  Copying focal length...")
     
     src_attr = camera + ".focalLength"
-    dst_attr = new_cam_shape + ".focalLength"
+    dst_attr = prepared['shape'] + ".focalLength"
     
     if cmds.objExists(src_attr) and cmds.objExists(dst_attr):
         keys = cmds.keyframe(src_attr, q=True, timeChange=True)
@@ -200,103 +291,345 @@ def export_ue_camera():
             value = cmds.getAttr(src_attr)
             cmds.setAttr(dst_attr, value)
     
-    # ===============================
-    # 6. Constraint + bake
-    # ===============================
-    
-    print("  Baking animation...")
-    
-    constraint = cmds.parentConstraint(camera, new_cam_transform, mo=True)[0]
+    prepared['constraint'] = cmds.parentConstraint(camera, prepared['transform'], mo=True)[0]
+    return prepared['constraint']
+
+
+def bake_ue_camera_legacy(prepared):
+    """Camino legacy: constraint + bakeResults(simulation=True)"""
+    attach_ue_camera(prepared)
     
     cmds.bakeResults(
-        new_cam_transform,
+        prepared['transform'],
         simulation=True,
-        t=(start_frame, end_frame),
+        t=(prepared['start_frame'], prepared['end_frame']),
         at=["translate", "rotate"],
         preserveOutsideKeys=True
     )
     
-    cmds.delete(constraint)
+    cmds.delete(prepared['constraint'])
+    prepared['constraint'] = None
+
+
+def camera_frames(start_frame, end_frame):
+    """Frames enteros del rango (incluye ambos extremos)"""
+    return [start_frame + i for i in range(int(round(end_frame - start_frame)) + 1)]
+
+
+def sample_camera(camera, frames, rotate_order=0):
+    """
+    Evalua la camara en cada frame sin mover el timeline (getAttr time=)
     
-    # ===============================
-    # 7. Resolver ruta de export
-    # ===============================
+    Args:
+        camera: Transform de la camara original
+        frames: Lista de frames
+        rotate_order: rotateOrder de la camara UE_
     
-    print("\nResolving export path...")
+    Returns:
+        dict: {canal: [valores]} en unidades internas (cm, radianes) +
+              los LENS_ATTRIBUTES animados
+    """
+    shape = (cmds.listRelatives(camera, shapes=True, fullPath=True) or [camera])[0]
+    samples = dict((channel, []) for channel in CAMERA_CHANNELS)
+    
+    # Solo se muestrean los atributos del lente que tienen animacion
+    lens_attrs = [attr for attr in LENS_ATTRIBUTES
+                  if cmds.listConnections('{}.{}'.format(shape, attr),
+                                          source=True, destination=False)]
+    for attr in lens_attrs:
+        samples[attr] = []
+    
+    previous = None
+    for frame in frames:
+        matrix = om.MTransformationMatrix(
+            om.MMatrix(cmds.getAttr(camera + '.worldMatrix', time=frame)))
+        translation = matrix.translation(om.MSpace.kWorld)
+        rotation = matrix.rotation().reorder(rotate_order)
+        
+        # Filtro euler: la solucion mas cercana al frame anterior
+        if previous is not None:
+            rotation = rotation.closestSolution(previous)
+        previous = rotation
+        
+        samples['translateX'].append(translation.x)
+        samples['translateY'].append(translation.y)
+        samples['translateZ'].append(translation.z)
+        samples['rotateX'].append(rotation.x)
+        samples['rotateY'].append(rotation.y)
+        samples['rotateZ'].append(rotation.z)
+        
+        for attr in lens_attrs:
+            samples[attr].append(cmds.getAttr('{}.{}'.format(shape, attr), time=frame))
     
-    # Obtener workspace root
-    workspace_root = cmds.workspace(q=True, rootDirectory=True)
+    return samples
+
+
+def write_curve(node, attr, frames, values):
+    """
+    Escribe todas las keys de un canal con un solo MFnAnimCurve.addKeys
     
-    # Reemplazar <workspace_root> en el path
-    full_export_path = export_path.replace('<workspace_root>', workspace_root)
+    La curva se crea con setKeyframe (queda en el undo de Maya); las keys
+    se reemplazan de una vez con la API.
+    """
+    plug = '{}.{}'.format(node, attr)
+    cmds.setKeyframe(plug, time=frames[0])
+    curve = cmds.listConnections(plug, source=True, destination=False, type='animCurve')[0]
     
-    # Crear directorios si no existen
-    try:
-        if not os.path.exists(full_export_path):
-            os.makedirs(full_export_path)
-            print("  Created directory: {}".format(full_export_path))
-    except Exception as e:
-        cmds.warning("Could not create export directory: {}".format(e))
+    selection = om.MSelectionList()
+    selection.add(curve)
+    fn_curve = om.MFnAnimCurve(selection.getDependNode(0))
     
-    # Construir path completo del FBX
-    fbx_path = os.path.join(full_export_path, "{}.fbx".format(exported_name)).replace("\\", "/")
+    unit = om.MTime.uiUnit()
+    times = om.MTimeArray([om.MTime(frame, unit) for frame in frames])
+    fn_curve.addKeys(times, om.MDoubleArray(values), keepExistingKeys=False)
+
+
+def bake_ue_camera_fast(prepared):
+    """Camino rapido: una evaluacion por frame + una escritura por canal"""
+    camera = prepared['camera']
+    transform = prepared['transform']
+    shape = prepared['shape']
+    frames = camera_frames(prepared['start_frame'], prepared['end_frame'])
+    
+    rotate_order = cmds.getAttr(transform + '.rotateOrder')
+    samples = sample_camera(camera, frames, rotate_order)
+    
+    for channel in CAMERA_CHANNELS:
+        write_curve(transform, channel, frames, samples[channel])
+    
+    for attr in LENS_ATTRIBUTES:
+        if attr in samples:
+            write_curve(shape, attr, frames, samples[attr])
+        elif cmds.objExists('{}.{}'.format(camera, attr)):
+            cmds.setAttr('{}.{}'.format(shape, attr), cmds.getAttr('{}.{}'.format(camera, attr)))
+
+
+def bake_ue_camera(prepared, mode=None):
+    """
+    Hornea la camara UE_ en el rango de la camara
     
-    print("  Export path: {}".format(fbx_path))
+    Si el camino rapido falla se borran sus keys y se usa el legacy.
     
-    # ===============================
-    # 8. Configuracion FBX
-    # ===============================
+    Args:
+        prepared: Resultado de prepare_ue_camera()
+        mode: BAKE_FAST o BAKE_LEGACY (default: CAMERA_BAKE_MODE)
     
-    print("\nConfiguring FBX export...")
+    Returns:
+        tuple: (modo usado, segundos)
+    """
+    mode = mode or CAMERA_BAKE_MODE
+    frame_count = len(camera_frames(prepared['start_frame'], prepared['end_frame']))
+    print("  Baking animation ({}, {} frames)...".format(mode, frame_count))
+    
+    start = time.time()
+    if mode == BAKE_FAST:
+        try:
+            with span('camera_bake', mode=BAKE_FAST, frames=frame_count):
+                bake_ue_camera_fast(prepared)
+        except Exception as e:
+            cmds.warning("Fast camera bake failed, using legacy bake: {}".format(e))
+            cmds.cutKey(prepared['transform'], attribute=CAMERA_CHANNELS, clear=True)
+            cmds.cutKey(prepared['shape'], attribute=LENS_ATTRIBUTES, clear=True)
+            mode = BAKE_LEGACY
+            start = time.time()
+    
+    if mode == BAKE_LEGACY:
+        with span('camera_bake', mode=BAKE_LEGACY, frames=frame_count):
+            bake_ue_camera_legacy(prepared)
+    
+    elapsed = time.time() - start
+    print("  Camera bake ({}): {:.2f}s".format(mode, elapsed))
+    return mode, elapsed
+
+
+def write_ue_camera(prepared, prebaked=False):
+    """
+    Exporta la camara UE_ (ya horneada) al scratch local y la publica
     
-    mel.eval("FBXResetExport;")
-    mel.eval("FBXExportCameras -v true;")
-    mel.eval("FBXExportLights -v false;")
-    mel.eval("FBXExportSkins -v false;")
-    mel.eval("FBXExportShapes -v true;")
-    mel.eval("FBXExportBakeComplexAnimation -v true;")
-    mel.eval("FBXExportBakeComplexStart -v {};".format(start_frame))
-    mel.eval("FBXExportBakeComplexEnd -v {};".format(end_frame))
-    mel.eval("FBXExportBakeComplexStep -v 1;")
-    mel.eval("FBXExportBakeResampleAnimation -v true;")
-    mel.eval('FBXExportQuaternion -v "resample";')
+    Args:
+        prepared: Resultado de prepare_ue_camera()
+        prebaked: True si el bake lo hizo bake_stage (sin bake complejo FBX)
     
-    # ===============================
-    # 9. Export FBX
-    # ===============================
+    Returns:
+        PublishJob, o None si el FBX no se creo
+    """
+    fbx_path = prepared['fbx_path']
+    print("  Export path: {}".format(fbx_path))
+    
+    print("\nConfiguring FBX export...")
+    fbx_presets.apply_preset('camera', prepared['start_frame'], prepared['end_frame'],
+                             prebaked=prebaked)
     
     print("  Exporting FBX...")
     
-    cmds.select(new_cam_transform, r=True)
-    mel.eval('FBXExport -f "{}" -s;'.format(fbx_path))
+    # Se escribe en scratch local y se publica al share en segundo plano
+    local_path = export_publisher.scratch_path(fbx_path)
+    cmds.select(prepared['transform'], r=True)
+    with span('fbx_write', group='CAMERA'):
+        mel.eval('FBXExport -f "{}" -s;'.format(local_path))
     
-    # ===============================
-    # 10. Limpieza si export ok
-    # ===============================
+    with span('verify'):
+        written = export_publisher.verify_local(local_path)
+    if not written:
+        return None
     
-    if os.path.exists(fbx_path):
-        cmds.delete(new_cam_transform)
-        
-        print("\n" + "=" * 60)
-        print("CAMERA EXPORTED SUCCESSFULLY")
-        print("  Name: {}".format(exported_name))
-        print("  Path: {}".format(fbx_path))
-        print("=" * 60 + "\n")
-        
-        cmds.confirmDialog(
-            title='Export Complete',
-            message="Camera exported successfully!\n\n{}".format(fbx_path),
-            button=['OK'],
-            icon='information'
-        )
-        
-        return True
-    else:
+    print("  Publishing to {}...".format(fbx_path))
+    return export_publisher.get_publisher().publish(local_path, fbx_path)
+
+
+def camera_manifest_entry(prepared, publish_result):
+    """Entrada del export_manifest.json del shot para la camara publicada"""
+    return export_manifest.shot_entry(
+        prepared['exported_name'],
+        publish_result.dest_path,
+        (prepared['start_frame'], prepared['end_frame']),
+        # La camara siempre se escribe con el preset prebaked
+        fbx_presets.preset_hash('camera', prebaked=True),
+        get_scene_context().scene_path,
+        kind='camera',
+        content_hash=publish_result.checksum,
+        size=publish_result.size
+    )
+
+
+def report_camera_export(prepared, publish_result):
+    """
+    Mensajes y dialogos del resultado del export de camara
+    
+    Returns:
+        bool: True si el FBX quedo publicado
+    """
+    fbx_path = prepared['fbx_path']
+    
+    if publish_result is None:
         cmds.warning("FBX not created, UE camera kept for review")
-        cmds.confirmDialog(
+        confirm_dialog(
             title='Export Failed',
             message='FBX file was not created.\nUE camera kept in scene for review.',
             button=['OK'],
             icon='warning'
         )
-        return False
\ No newline at end of file
+        return False
+    
+    if not publish_result.success:
+        cmds.warning("Camera FBX could not be published: {}".format(publish_result.error))
+        confirm_dialog(
+            title='Publish Failed',
+            message='Camera FBX was exported but could not be copied to:\n{}\n\n'
+                    'Local file kept at:\n{}'.format(fbx_path, publish_result.local_path),
+            button=['OK'],
+            icon='warning'
+        )
+        return False
+    
+    print("\n" + "=" * 60)
+    print("CAMERA EXPORTED SUCCESSFULLY")
+    print("  Name: {}".format(prepared['exported_name']))
+    print("  Path: {}".format(fbx_path))
+    print("=" * 60 + "\n")
+    
+    confirm_dialog(
+        title='Export Complete',
+        message="Camera exported successfully!\n\n{}".format(fbx_path),
+        button=['OK'],
+        icon='information'
+    )
+    return True
+
+
+@timed('export_ue_camera')
+def export_ue_camera():
+    """
+    FUNCION PRINCIPAL - Exporta camara a UE
+    1. Busca camara con UnrealCamera=True en grupo CAMERA
+    2. Lee atributos del grupo CAMERA
+    3. Crea camara UE_ duplicada
+    4. Bake animation (camino rapido o legacy, ver bake_ue_camera)
+    5. Exporta FBX
+    """
+    print("\n" + "=" * 60)
+    print("PKL PIPELINE - CAMERA EXPORTER")
+    print("=" * 60)
+    
+    job = None
+    
+    # Un solo paso de undo, sin refresh del viewport durante el bake
+    with SceneSuspend('pkl_export_ue_camera', parallel=True):
+        with span('camera_prepare'):
+            prepared = prepare_ue_camera()
+        
+        if 'error' not in prepared:
+            bake_ue_camera(prepared)
+            
+            fbx_presets.invalidate()
+            job = write_ue_camera(prepared, prebaked=True)
+            
+            if job is not None:
+                # La limpieza corre mientras se sube el FBX
+                cmds.delete(prepared['transform'])
+    
+    if 'error' in prepared:
+        title, message = prepared['error']
+        confirm_dialog(title=title, message=message, button=['OK'], icon='warning')
+        return False
+    
+    if job is None:
+        return report_camera_export(prepared, None)
+    
+    with span('publish_wait'):
+        publish_result = job.wait()
+    if publish_result.success:
+        export_manifest.write_shot_manifest(get_scene_context().shot_export_dir,
+                                            [camera_manifest_entry(prepared, publish_result)])
+    
+    return report_camera_export(prepared, publish_result)
+
+
+def compare_camera_bake():
+    """
+    Compara tiempos (y resultado) del bake rapido contra el legacy
+    
+    Corre los dos caminos sobre la camara de la escena dentro de un undo
+    chunk cada uno: la escena queda como estaba y no se exporta nada.
+    
+    Returns:
+        dict: {modo: segundos, 'max_difference': {canal: diferencia}}
+              o None si no hay camara
+    """
+    results = {}
+    curves = {}
+    
+    for mode in (BAKE_LEGACY, BAKE_FAST):
+        with bake_stage.BakeStage():
+            prepared = prepare_ue_camera()
+            if 'error' in prepared:
+                print("  {}".format(prepared['error'][0]))
+                return None
+            
+            # Sin fallback: si falla el modo pedido se reporta el error
+            start = time.time()
+            if mode == BAKE_LEGACY:
+                bake_ue_camera_legacy(prepared)
+            else:
+                bake_ue_camera_fast(prepared)
+            results[mode] = time.time() - start
+            
+            curves[mode] = dict(
+                (channel, cmds.keyframe('{}.{}'.format(prepared['transform'], channel),
+                                        q=True, valueChange=True) or [])
+                for channel in CAMERA_CHANNELS)
+    
+    results['max_difference'] = dict(
+        (channel, max([abs(a - b) for a, b in zip(curves[BAKE_LEGACY][channel],
+                                                  curves[BAKE_FAST][channel])] or [0.0]))
+        for channel in CAMERA_CHANNELS)
+    
+    print("\n" + "=" * 60)
+    print("CAMERA BAKE COMPARISON")
+    print("  Legacy (constraint + bakeResults): {:.2f}s".format(results[BAKE_LEGACY]))
+    print("  Fast (sample + addKeys):           {:.2f}s".format(results[BAKE_FAST]))
+    print("  Speedup: {:.1f}x".format(results[BAKE_LEGACY] / max(results[BAKE_FAST], 1e-6)))
+    for channel in CAMERA_CHANNELS:
+        print("  Max difference {}: {:.5f}".format(channel, results['max_difference'][channel]))
+    print("=" * 60 + "\n")
+    return results
@@ -4,7 +4,6 @@ PKL Pipeline - Camera Setter
 Configura atributos para camaras en escenas de animacion
 """
 import maya.cmds as cmds
-import re
 import os
 import sys
 
@@ -19,22 +18,14 @@ try:
         sys.path.insert(0, utils_dir)
     
     import helpers
+    import naming
     ensure_attribute_exists = helpers.ensure_attribute_exists
     
 except ImportError as e:
-    print("Warning: Could not import helpers - {}".format(e))
-    
-    # Fallback
-    def ensure_attribute_exists(obj, attr_name, attr_type='string', default_value='', lock=False):
-        attr_full_name = obj + '.' + attr_name
-        if not cmds.attributeQuery(attr_name, node=obj, exists=True):
-            if attr_type == 'string':
-                cmds.addAttr(obj, longName=attr_name, dataType='string')
-                cmds.setAttr(attr_full_name, default_value, type='string')
-            elif attr_type == 'bool':
-                cmds.addAttr(obj, longName=attr_name, attributeType='bool', defaultValue=default_value)
-        if lock:
-            cmds.setAttr(attr_full_name, lock=True)
+    # Sin helpers/naming no se puede validar el patron de CamTools: el
+    # error llega a quien importa el modulo (la UI avisa)
+    print("Error: Could not import helpers - {}".format(e))
+    raise
 
 
 def check_camtools_pattern(camera_name):
@@ -45,8 +36,7 @@ def check_camtools_pattern(camera_name):
     Returns:
         bool: True si cumple el patron, False si no
     """
-    pattern = re.compile(r'_FR_\d+_\d+')
-    return bool(pattern.search(camera_name))
+    return naming.frame_range(naming.parse_stem(camera_name)) is not None
 
 
 def check_is_in_group(camera):
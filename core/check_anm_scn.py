@@ -2,11 +2,22 @@
 """
 PKL Pipeline - Animation Scene Checker
 Verifica que todos los assets referenciados sean archivos _MASTER
+
+Las referencias salen del inventario de helpers (una sola lectura del API,
+cacheado hasta que cambia alguna referencia) y la validacion se cachea por
+el digest del inventario: repetir el check sin cambios es instantaneo.
+
+Con enable_master_redirect() (lo registra la UI al arrancar) las mismas
+reglas se aplican antes de leer cada referencia al abrir una escena de
+animacion: si un rig CH_/PRP_ apunta a una version y el _MASTER existe, se
+carga directamente el _MASTER. Asi cada rig se carga una sola vez en vez
+de cargar la version y despues reemplazarla con el Auto-Fix. Las
+referencias que el usuario crea o carga a mano (y las de escenas de rig,
+modelado, layout...) no se tocan. PKL_MASTER_REDIRECT=0 lo desactiva.
 """
 import maya.cmds as cmds
 import os
 import sys
-import re
 
 # Importar helpers
 try:
@@ -19,52 +30,68 @@ try:
         sys.path.insert(0, utils_dir)
     
     import helpers
+    import naming
+    import fs_probe
     get_scene_name = helpers.get_scene_name
+    get_reference_inventory = helpers.get_reference_inventory
+    confirm_dialog = helpers.confirm_dialog
     
 except ImportError as e:
-    print("Warning: Could not import helpers - {}".format(e))
-    
-    # Fallback
-    def get_scene_name():
-        return cmds.file(query=True, sceneName=True, shortName=True)
+    # Sin helpers no hay inventario de referencias ni naming: el modulo no
+    # puede funcionar, el error llega a quien lo importa (la UI avisa)
+    print("Error: Could not import helpers - {}".format(e))
+    raise
+
+
+# Reference nodes que no son archivos de assets
+IGNORED_REFERENCE_NODES = ('sharedReferenceNode', '_UNKNOWN_REF_NODE_')
+
+# Resultados de validate_references por digest del inventario
+_validation_cache = {}
 
+# Callbacks de enable_master_redirect()
+_redirect_callbacks = []
 
-def get_all_references():
+# Escena que se esta abriendo (entre kBeforeOpenCheck y kAfterOpen)
+_opening_scene = None
+
+
+def get_all_references(inventory=None):
     """
     Obtiene todas las referencias en la escena
     
+    Args:
+        inventory: ReferenceInventory (opcional, se usa el de la sesion)
+    
     Returns:
         list: Lista de reference nodes
     """
-    references = cmds.ls(type='reference')
+    if inventory is None:
+        inventory = get_reference_inventory()
     
     # Filtrar referencias validas (excluir sharedReferenceNode, etc)
-    valid_refs = []
-    for ref in references:
-        if ref != 'sharedReferenceNode' and ref != '_UNKNOWN_REF_NODE_':
-            valid_refs.append(ref)
-    
-    return valid_refs
+    return [ref for ref in inventory.nodes() if ref not in IGNORED_REFERENCE_NODES]
 
 
-def get_reference_file_path(reference_node):
+def get_reference_file_path(reference_node, inventory=None):
     """
     Obtiene el path del archivo referenciado
     
     Args:
         reference_node: Nombre del reference node
+        inventory: ReferenceInventory (opcional, se usa el de la sesion)
         
     Returns:
         str: Path completo del archivo referenciado, o None si hay error
     """
-    try:
-        file_path = cmds.referenceQuery(reference_node, filename=True)
-        return file_path
-    except:
-        return None
+    if inventory is None:
+        inventory = get_reference_inventory()
+    
+    entry = inventory.get(reference_node)
+    return entry.resolved_path if entry is not None else None
 
 
-def check_reference_is_master(reference_node):
+def check_reference_is_master(reference_node, inventory=None):
     """
     Verifica si un archivo referenciado cumple con los requisitos:
     1. Debe tener prefijo CH_ o PRP_
@@ -72,6 +99,7 @@ def check_reference_is_master(reference_node):
     
     Args:
         reference_node: Nombre del reference node
+        inventory: ReferenceInventory (opcional, se usa el de la sesion)
         
     Returns:
         dict: {
@@ -84,53 +112,38 @@ def check_reference_is_master(reference_node):
             'has_master_suffix': True/False
         }
     """
-    result = {
-        'node': reference_node,
-        'file_path': None,
-        'file_name': None,
-        'is_valid': True,
-        'reason': '',
-        'prefix': None,
-        'has_master_suffix': False
-    }
-    
     # Obtener path del archivo
-    file_path = get_reference_file_path(reference_node)
-    
-    if not file_path:
-        result['is_valid'] = False
-        result['reason'] = 'Could not get file path'
-        return result
-    
-    result['file_path'] = file_path
-    
-    # Obtener nombre del archivo sin extension
-    file_name = os.path.basename(file_path)
-    file_name_no_ext = os.path.splitext(file_name)[0]
+    file_path = get_reference_file_path(reference_node, inventory)
     
-    result['file_name'] = file_name
+    # Reglas de la convencion de nombres (CH_/PRP_ -> _MASTER)
+    result = {'node': reference_node}
+    result.update(naming.classify_reference(file_path))
     
-    # Verificar prefijo CH_ o PRP_
-    if file_name_no_ext.startswith('CH_'):
-        result['prefix'] = 'CH'
-    elif file_name_no_ext.startswith('PRP_'):
-        result['prefix'] = 'PRP'
-    else:
-        # No tiene prefijo CH_ o PRP_, por lo tanto no aplica la validacion
-        result['is_valid'] = True
-        result['reason'] = 'Not a CH or PRP asset (validation skipped)'
-        return result
+    return result
+
+
+def validate_references(inventory=None):
+    """
+    check_reference_is_master de todas las referencias del inventario
     
-    # Verificar sufijo _MASTER
-    if '_MASTER' in file_name_no_ext:
-        result['has_master_suffix'] = True
-        result['is_valid'] = True
-    else:
-        result['has_master_suffix'] = False
-        result['is_valid'] = False
-        result['reason'] = 'Missing _MASTER suffix'
+    El resultado se cachea por inventory.digest: mientras no cambie ninguna
+    referencia, repetir el check no vuelve a validar nada.
     
-    return result
+    Returns:
+        list: Un dict de check_reference_is_master por referencia
+    """
+    if inventory is None:
+        inventory = get_reference_inventory()
+    
+    results = _validation_cache.get(inventory.digest)
+    if results is None:
+        results = [check_reference_is_master(ref, inventory)
+                   for ref in get_all_references(inventory)]
+        # Solo se guarda el ultimo inventario
+        _validation_cache.clear()
+        _validation_cache[inventory.digest] = results
+    
+    return list(results)
 
 
 def construct_master_path(current_path):
@@ -147,45 +160,7 @@ def construct_master_path(current_path):
     Returns:
         str: Path del archivo _MASTER, o None si no se puede construir
     """
-    if not current_path:
-        return None
-    
-    # Obtener nombre del archivo
-    file_name = os.path.basename(current_path)
-    file_name_no_ext = os.path.splitext(file_name)[0]
-    file_ext = os.path.splitext(file_name)[1]
-    
-    # Verificar que tiene prefijo CH_ o PRP_
-    if not (file_name_no_ext.startswith('CH_') or file_name_no_ext.startswith('PRP_')):
-        return None
-    
-    # Construir nombre _MASTER
-    # Remover _v### si existe
-    master_name = re.sub(r'_v\d+$', '', file_name_no_ext)
-    
-    # Si no tiene _MASTER, agregarlo
-    if not master_name.endswith('_MASTER'):
-        master_name += '_MASTER'
-    
-    master_file = master_name + file_ext
-    
-    # Construir path
-    # Si el path actual contiene /versions/, subir un nivel
-    dir_path = os.path.dirname(current_path)
-    
-    if '/versions/' in current_path or '\\versions\\' in current_path:
-        # Subir un nivel (parent de versions)
-        master_dir = os.path.dirname(dir_path)
-    else:
-        # Si no esta en versions, usar el mismo directorio
-        master_dir = dir_path
-    
-    master_path = os.path.join(master_dir, master_file)
-    
-    # Normalizar path
-    master_path = master_path.replace('\\', '/')
-    
-    return master_path
+    return naming.master_path(current_path)
 
 
 def fix_reference_to_master(reference_node, current_path):
@@ -218,8 +193,8 @@ def fix_reference_to_master(reference_node, current_path):
     
     result['master_path'] = master_path
     
-    # Verificar que el archivo master existe
-    if not os.path.exists(master_path):
+    # Verificar que el archivo master existe (listado cacheado de la carpeta)
+    if not fs_probe.exists(master_path):
         result['error'] = 'Master file does not exist: {}'.format(master_path)
         return result
     
@@ -256,6 +231,10 @@ def auto_fix_invalid_references(invalid_refs):
     fixed = []
     failed = []
     
+    # Una lista por carpeta de masters, todas en paralelo
+    master_paths = [construct_master_path(ref_data['file_path']) for ref_data in invalid_refs]
+    fs_probe.prefetch([os.path.dirname(path) for path in master_paths if path])
+    
     for ref_data in invalid_refs:
         ref_node = ref_data['node']
         current_path = ref_data['file_path']
@@ -308,6 +287,126 @@ def auto_fix_invalid_references(invalid_refs):
     }
 
 
+# ====== REDIRECCION ANTES DE CARGAR ======
+
+def redirect_path(file_path, resolved_path=None):
+    """
+    Path _MASTER que hay que cargar en lugar de file_path
+
+    Args:
+        file_path: Path de la referencia tal como esta en la escena
+        resolved_path: Path resuelto (sin variables de entorno), para
+                       verificar que el master existe
+
+    Returns:
+        str: Path del master (con el mismo formato que file_path), o None
+             si la referencia es valida, no es CH_/PRP_ o no hay master
+    """
+    if naming.classify_reference(file_path)['is_valid']:
+        return None
+
+    master_path = construct_master_path(file_path)
+    resolved_master = construct_master_path(resolved_path) if resolved_path else master_path
+    if not master_path or not resolved_master:
+        return None
+
+    # Listado cacheado: las referencias del mismo asset no vuelven al share
+    if not fs_probe.exists(resolved_master):
+        return None
+    return master_path
+
+
+def _before_scene_open(file_object, client_data):
+    """Callback de kBeforeOpenCheck: recuerda que escena se esta abriendo"""
+    global _opening_scene
+    try:
+        _opening_scene = file_object.resolvedFullName() or file_object.rawFullName()
+    except Exception:
+        _opening_scene = None
+    return True
+
+
+def _after_scene_open(*args):
+    """Callback de kAfterOpen / kAfterNew: termino la apertura"""
+    global _opening_scene
+    _opening_scene = None
+
+
+def _before_reference_load(file_object, client_data):
+    """
+    Callback de kBeforeLoadReferenceCheck
+
+    Mientras se abre una escena de animacion cambia el path del
+    MFileObject al _MASTER antes de que Maya lea el archivo. Fuera de la
+    apertura (cargar o reemplazar una referencia a mano) no hace nada.
+    Nunca cancela la carga: si algo falla la referencia se carga como
+    estaba y el check de la escena la sigue reportando.
+    """
+    if not _opening_scene or naming.scene_type(naming.parse(_opening_scene)) != 'anim':
+        return True
+
+    try:
+        raw_path = file_object.rawFullName()
+        master_path = redirect_path(raw_path, file_object.resolvedFullName())
+        if master_path:
+            file_object.setRawFullName(master_path)
+            print("[MASTER] Reference redirected: {} -> {}".format(
+                os.path.basename(raw_path), os.path.basename(master_path)))
+    except Exception as e:
+        print("Warning: Could not redirect reference to MASTER - {}".format(e))
+    return True
+
+
+def enable_master_redirect():
+    """
+    Registra la redireccion a _MASTER antes de cargar referencias (una
+    sola vez por sesion)
+
+    Returns:
+        bool: True si la redireccion esta activa
+    """
+    global _redirect_callbacks
+
+    if _redirect_callbacks:
+        return True
+
+    if os.environ.get('PKL_MASTER_REDIRECT', '').lower() in ('0', 'false', 'no'):
+        return False
+
+    try:
+        import maya.api.OpenMaya as om
+
+        message = om.MSceneMessage
+        _redirect_callbacks = [
+            message.addCheckFileCallback(message.kBeforeOpenCheck, _before_scene_open),
+            message.addCallback(message.kAfterOpen, _after_scene_open),
+            message.addCallback(message.kAfterNew, _after_scene_open),
+            message.addCheckFileCallback(message.kBeforeLoadReferenceCheck,
+                                         _before_reference_load),
+        ]
+    except Exception as e:
+        print("Warning: Could not register MASTER redirect - {}".format(e))
+        _redirect_callbacks = []
+        return False
+
+    return True
+
+
+def disable_master_redirect():
+    """Quita los callbacks de enable_master_redirect()"""
+    global _redirect_callbacks
+
+    if not _redirect_callbacks:
+        return
+
+    try:
+        import maya.api.OpenMaya as om
+        om.MMessage.removeCallbacks(_redirect_callbacks)
+    except Exception as e:
+        print("Warning: Could not remove MASTER redirect - {}".format(e))
+    _redirect_callbacks = []
+
+
 def check_animation_scene():
     """
     FUNCION PRINCIPAL - Verifica todos los assets referenciados
@@ -320,7 +419,8 @@ def check_animation_scene():
             'checked_references': int,
             'valid_references': int,
             'invalid_references': list,
-            'skipped_references': list
+            'skipped_references': list,
+            'auto_fix': dict o None (resultado de auto_fix_invalid_references)
         }
     """
     print("\n" + "=" * 60)
@@ -330,8 +430,9 @@ def check_animation_scene():
     scene_name = get_scene_name()
     print("\nScene: {}".format(scene_name if scene_name else "UNSAVED"))
     
-    # Obtener todas las referencias
-    all_references = get_all_references()
+    # Obtener todas las referencias (inventario cacheado de la sesion)
+    inventory = get_reference_inventory()
+    all_references = get_all_references(inventory)
     
     print("\nTotal references found: {}".format(len(all_references)))
     
@@ -340,7 +441,7 @@ def check_animation_scene():
         print("NO REFERENCES FOUND IN SCENE")
         print("=" * 60 + "\n")
         
-        cmds.confirmDialog(
+        confirm_dialog(
             title='No References',
             message='No references found in the current scene.',
             button=['OK'],
@@ -363,8 +464,8 @@ def check_animation_scene():
     valid_count = 0
     checked_count = 0
     
-    for ref in all_references:
-        result = check_reference_is_master(ref)
+    for result in validate_references(inventory):
+        ref = result['node']
         
         # Si no tiene prefijo CH_ o PRP_, skip
         if result['prefix'] is None:
@@ -421,7 +522,7 @@ def check_animation_scene():
         error_message += "\nAll CH_ and PRP_ assets must have _MASTER suffix.\n\n"
         error_message += "Would you like to auto-fix these references?"
         
-        response = cmds.confirmDialog(
+        response = confirm_dialog(
             title='Validation Failed',
             message=error_message,
             button=['Auto-Fix', 'Cancel'],
@@ -431,6 +532,7 @@ def check_animation_scene():
         )
         
         # Si el usuario eligio Auto-Fix
+        fix_result = None
         if response == 'Auto-Fix':
             fix_result = auto_fix_invalid_references(invalid_refs)
             
@@ -446,7 +548,7 @@ def check_animation_scene():
                 if len(fix_result['fixed']) > 5:
                     success_msg += "\n... and {} more.".format(len(fix_result['fixed']) - 5)
                 
-                cmds.confirmDialog(
+                confirm_dialog(
                     title='Auto-Fix Complete',
                     message=success_msg,
                     button=['OK'],
@@ -465,7 +567,7 @@ def check_animation_scene():
                 
                 partial_msg += "Check Script Editor for details."
                 
-                cmds.confirmDialog(
+                confirm_dialog(
                     title='Auto-Fix Partial',
                     message=partial_msg,
                     button=['OK'],
@@ -480,7 +582,7 @@ def check_animation_scene():
                 fail_msg += "- Incorrect file paths\n\n"
                 fail_msg += "Check Script Editor for details."
                 
-                cmds.confirmDialog(
+                confirm_dialog(
                     title='Auto-Fix Failed',
                     message=fail_msg,
                     button=['OK'],
@@ -492,7 +594,8 @@ def check_animation_scene():
             'checked_references': checked_count,
             'valid_references': valid_count,
             'invalid_references': invalid_refs,
-            'skipped_references': skipped_refs
+            'skipped_references': skipped_refs,
+            'auto_fix': fix_result
         }
     
     else:
@@ -509,7 +612,7 @@ def check_animation_scene():
         if skipped_refs:
             success_message += "Skipped {} other reference(s) (not CH/PRP)".format(len(skipped_refs))
         
-        cmds.confirmDialog(
+        confirm_dialog(
             title='Validation Passed',
             message=success_message,
             button=['OK'],
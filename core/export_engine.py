@@ -0,0 +1,1227 @@
+# -*- coding: utf-8 -*-
+"""
+PKL Pipeline - Export Engine
+Motor de exportacion comun de Export All y Export Selected
+
+Una estrategia de targets decide que grupos se exportan (toda la escena,
+la seleccion o un contenedor CH/PR/CAMERA); el resto es igual para todos:
+un SceneIndex por export, un solo bake del timeline (bake_stage), el
+mismo preset FBX, caches Alembic en un solo AbcExport, publish en segundo
+plano y manifest del shot.
+
+Uso:
+    run_export(SceneTargets(include_camera=True))   # Export All
+    run_export(SelectionTargets(), incremental=False)  # Export Selected
+    run_export(ContainerTargets('PR'))
+"""
+import maya.cmds as cmds
+import maya.mel as mel
+import os
+import sys
+import time
+
+# Importar helpers
+try:
+    current_file = os.path.abspath(__file__)
+    core_dir = os.path.dirname(current_file)
+    parent_dir = os.path.dirname(core_dir)
+    utils_dir = os.path.join(parent_dir, 'utils')
+    
+    if utils_dir not in sys.path:
+        sys.path.insert(0, utils_dir)
+    if core_dir not in sys.path:
+        sys.path.insert(0, core_dir)
+    
+    import helpers
+    import export_manifest
+    import fbx_presets
+    import export_publisher
+    import bake_stage
+    import camera_exporter
+    import cache_exporter
+    import fs_probe
+    has_attribute = helpers.has_attribute
+    get_attribute_value = helpers.get_attribute_value
+    SceneIndex = helpers.SceneIndex
+    get_scene_context = helpers.get_scene_context
+    SceneSuspend = helpers.SceneSuspend
+    ProgressWindow = helpers.ProgressWindow
+    confirm_dialog = helpers.confirm_dialog
+    
+    import profiling
+    span = profiling.span
+    timed = profiling.timed
+    
+except ImportError as e:
+    # Sin helpers/profiling no hay SceneIndex/SceneContext/SceneSuspend: el
+    # modulo no puede funcionar, el error llega a quien lo importa (la UI avisa)
+    print("Error: Could not import helpers - {}".format(e))
+    raise
+
+
+def find_exportable_joint(group, index=None):
+    """
+    Busca un joint con FBX_exportable=True dentro de un grupo
+    
+    Args:
+        group: Nombre del grupo a buscar
+        index: SceneIndex ya construido (opcional, se construye si no se pasa)
+        
+    Returns:
+        str: Nombre del joint encontrado, o None si no existe
+    """
+    if not cmds.objExists(group):
+        return None
+    
+    if index is None:
+        index = SceneIndex.build()
+    
+    return index.find_exportable_joint(group)
+
+
+def find_exportable_groups(index=None):
+    """
+    Encuentra todos los grupos con atributos de exportacion
+    
+    Args:
+        index: SceneIndex ya construido (opcional, se construye si no se pasa)
+    
+    Returns:
+        list: Lista de dicts con info de cada grupo exportable
+              [{group, exported_name, path, exportable}, ...]
+    """
+    if index is None:
+        index = SceneIndex.build()
+    
+    return index.exportable_groups()
+
+
+def resolve_export_path(path_template):
+    """
+    Resuelve el path de exportacion reemplazando <workspace_root>
+    
+    Args:
+        path_template: String con el path (puede contener <workspace_root>)
+        
+    Returns:
+        str: Path absoluto resuelto
+    """
+    return get_scene_context().resolve_path(path_template)
+
+
+def probe_directories(groups):
+    """
+    Carpetas del share que consulta el export: destino de cada grupo
+    (FBX/ABC y manifest) y carpetas de los rigs cargados (mtime del rig)
+    """
+    directories = set(resolve_export_path(group_data['path']) for group_data in groups)
+    for entry in helpers.get_reference_inventory():
+        if entry.loaded and entry.resolved_path:
+            directories.add(os.path.dirname(os.path.expandvars(entry.resolved_path)))
+    return sorted(directories)
+
+
+# ====== TARGETS ======
+
+# Contenedores de grupos exportables (Hierarchy o nombre del grupo)
+CONTAINERS = ('CH', 'PR')
+
+# Contenedor de la camara UE (la exporta camera_exporter, no es un grupo)
+CAMERA_CONTAINER = 'CAMERA'
+
+
+def is_camera_node(node):
+    """True si el PipelineNode es el grupo CAMERA o la camara UE"""
+    return node.hierarchy == CAMERA_CONTAINER or node.name.split('|')[-1] == CAMERA_CONTAINER
+
+
+def is_container_node(node, container=None):
+    """
+    True si el PipelineNode es un contenedor CH/PR (o el indicado). Los
+    grupos exportables tambien llevan Hierarchy = CH/PR pero no son
+    contenedores
+    """
+    names = (container,) if container else CONTAINERS
+    if node.name.split('|')[-1] in names:
+        return True
+    return node.hierarchy in names and group_data_from_node(node) is None
+
+
+def group_data_from_node(node):
+    """Dict de grupo exportable {group, exported_name, path, exportable} o None"""
+    if not (node.has('ExportedName') and node.has('Path') and node.has('Exportable')):
+        return None
+    if not (node.exportable and node.exported_name and node.path):
+        return None
+    return {
+        'group': node.name,
+        'exported_name': node.exported_name,
+        'path': node.path,
+        'exportable': node.exportable
+    }
+
+
+def container_children(parent, index):
+    """Hijos directos exportables de un contenedor (group_data de cada uno)"""
+    groups = []
+    for child in cmds.listRelatives(parent, children=True, type='transform', fullPath=True) or []:
+        node = index.resolve(child)
+        group_data = group_data_from_node(node) if node is not None else None
+        if group_data:
+            groups.append(group_data)
+    return groups
+
+
+class TargetStrategy(object):
+    """
+    Decide que se exporta; run_export hace el resto
+
+    Subclases implementan select(index). include_camera puede cambiar en
+    select() (p.ej. si se selecciono el grupo CAMERA).
+    """
+
+    label = 'EXPORT'
+    empty_title = 'No Groups Found'
+    empty_message = 'No exportable groups found.'
+
+    def __init__(self, include_camera=False):
+        self.include_camera = include_camera
+
+    def select(self, index):
+        """
+        Returns:
+            list: [{group, exported_name, path, exportable}, ...]
+        """
+        raise NotImplementedError
+
+
+class SceneTargets(TargetStrategy):
+    """Todos los grupos exportables de la escena (Export All)"""
+
+    label = 'SCENE EXPORTER'
+    empty_message = ('No exportable groups found.\n\nMake sure groups have:\n'
+                     '- ExportedName attribute\n- Path attribute\n- Exportable = True')
+
+    def select(self, index):
+        return [group_data for group_data in find_exportable_groups(index)
+                if not is_camera_node(index.get(group_data['group']))]
+
+
+class ContainerTargets(TargetStrategy):
+    """
+    Hijos exportables de un contenedor (CH, PR). Con 'CAMERA' solo se
+    exporta la camara UE
+    """
+
+    label = 'CONTAINER EXPORTER'
+    empty_title = 'Selection Error'
+
+    def __init__(self, container, include_camera=False):
+        TargetStrategy.__init__(self, include_camera or container == CAMERA_CONTAINER)
+        self.container = container
+        self.empty_message = "No exportable groups found in '{}'.".format(container)
+
+    def select(self, index):
+        if self.container == CAMERA_CONTAINER:
+            return []
+        groups = []
+        for node in index:
+            if is_container_node(node, self.container):
+                groups += container_children(node.long_name, index)
+        return groups
+
+
+class SelectionTargets(TargetStrategy):
+    """
+    Grupos seleccionados (Export Selected)
+
+    1. Contenedor CH/PR que no es exportable -> sus hijos exportables
+    2. Grupo exportable -> solo ese grupo
+    3. Grupo CAMERA o camara UE -> la camara UE
+    """
+
+    label = 'EXPORT SELECTED'
+    empty_title = 'Selection Error'
+    empty_message = 'Please select a parent container (CH/PR/CAMERA) or specific exportable sub-groups.'
+
+    def select(self, index):
+        selection = cmds.ls(selection=True, type='transform', long=True) or []
+
+        groups = []
+        processed = set()
+        for obj in selection:
+            node = index.resolve(obj)
+            if node is None:
+                continue
+            group_data = group_data_from_node(node)
+
+            if is_camera_node(node):
+                print("  Detected camera: {}".format(obj))
+                self.include_camera = True
+
+            elif is_container_node(node):
+                print("  Detected parent container: {} - Searching children...".format(obj))
+                for child_data in container_children(obj, index):
+                    if child_data['group'] not in processed:
+                        groups.append(child_data)
+                        processed.add(child_data['group'])
+
+            elif group_data:
+                if group_data['group'] not in processed:
+                    groups.append(group_data)
+                    processed.add(group_data['group'])
+                    print("  Detected exportable sub-group: {}".format(obj))
+
+            else:
+                print("  [SKIP] Object is not an exportable group or container: {}".format(obj))
+
+        return groups
+
+
+# Preset FBX de todos los grupos, de cualquier estrategia (ver fbx_presets)
+FBX_PRESET = 'skeleton'
+
+# Mensaje de export_group_to_fbx cuando el FBX no cambio
+UP_TO_DATE = export_manifest.UP_TO_DATE
+
+# prepare_group_export sin skeleton (el grupo puede ir como cache Alembic)
+NO_SKELETON = 'No exportable skeleton found'
+
+
+def configure_fbx_export(start_frame, end_frame, prebaked=False):
+    """
+    Aplica el preset FBX de los grupos (solo si cambio el preset o el rango)
+    
+    Args:
+        start_frame: Frame inicial
+        end_frame: Frame final
+        prebaked: Curvas ya horneadas por bake_stage (sin bake complejo)
+    """
+    if fbx_presets.apply_preset(FBX_PRESET, start_frame, end_frame, prebaked=prebaked):
+        print("  Configuring FBX export settings...")
+
+
+def get_reference_file(node):
+    """Archivo referenciado del que viene el nodo (None si es local)"""
+    try:
+        if not cmds.referenceQuery(node, isNodeReferenced=True):
+            return None
+        return cmds.referenceQuery(node, filename=True, withoutCopyNumber=True)
+    except RuntimeError:
+        return None
+
+
+def compute_export_fingerprint(skeleton, start_frame, end_frame, prebaked=False, animation=True):
+    """
+    Partes del fingerprint de un grupo para la exportacion incremental
+
+    - curves: keys y tangentes de las animCurves que mueven el skeleton
+      (historia de los joints: constraints -> controles -> curvas)
+    - pose: matrices de los joints en el primer frame (valores sin keys)
+    - rig: archivo del rig referenciado y su mtime
+    - frame_range y fbx_settings (el preset tal como se aplica al escribir)
+
+    Args:
+        prebaked: El FBX se escribe con el preset prebaked (bake_stage)
+        animation: Calcular curves y pose (lo caro: historia del rig, dos
+                   queries por curva y una evaluacion por joint). Sin
+                   ellas el fingerprint nunca coincide con uno completo
+
+    Returns:
+        dict: Partes serializables a JSON (ver export_manifest.fingerprint)
+    """
+    parts = {
+        'skeleton': skeleton.split('|')[-1].split(':')[-1],
+        'frame_range': [start_frame, end_frame],
+        'fbx_settings': fbx_presets.preset_hash(FBX_PRESET, prebaked=prebaked),
+    }
+
+    rig_file = get_reference_file(skeleton)
+    rig_mtime = None
+    if rig_file:
+        rig_mtime = fs_probe.mtime(os.path.expandvars(rig_file))
+        if rig_mtime is not None:
+            rig_mtime = int(rig_mtime)
+    parts['rig'] = [rig_file, rig_mtime]
+
+    if not animation:
+        return parts
+
+    joints = [skeleton] + (cmds.listRelatives(skeleton, allDescendents=True,
+                                              type='joint', fullPath=True) or [])
+
+    history = cmds.listHistory(joints) or []
+    curves = sorted(set(cmds.ls(history, type='animCurve') or []))
+
+    curve_data = []
+    for curve in curves:
+        curve_data.append(curve)
+        curve_data.append(cmds.keyframe(curve, query=True, timeChange=True, valueChange=True))
+        curve_data.append(cmds.keyTangent(curve, query=True, inAngle=True, outAngle=True,
+                                          inWeight=True, outWeight=True))
+
+    pose = []
+    for joint in joints:
+        matrix = cmds.getAttr(joint + '.worldMatrix', time=start_frame)
+        pose.append([round(v, 5) for v in matrix])
+
+    parts['curves'] = export_manifest.digest(curve_data)
+    parts['curve_count'] = len(curves)
+    parts['pose'] = export_manifest.digest(pose)
+    return parts
+
+def prepare_group_export(group_data, start_frame, end_frame, index=None, incremental=False,
+                         prebaked=False):
+    """
+    Etapa collect: skeleton, path del FBX y fingerprint de un grupo
+    
+    Args:
+        group_data: Dict con info del grupo {group, exported_name, path, exportable}
+        start_frame: Frame inicial
+        end_frame: Frame final
+        index: SceneIndex de la escena (opcional)
+        incremental: Si True, marca como UP_TO_DATE los grupos cuyo
+                     fingerprint es igual al del ultimo export. Si es False
+                     no se calculan las partes caras del fingerprint (el
+                     proximo export incremental re-exporta el grupo)
+        prebaked: El FBX se va a escribir con el preset prebaked
+        
+    Returns:
+        dict: {success, message, fbx_path, group, exported_name, skeleton, parts}.
+              success=False si no se puede exportar; message=UP_TO_DATE si
+              no hace falta exportar
+    """
+    group = group_data['group']
+    exported_name = group_data['exported_name']
+    path_template = group_data['path']
+    
+    print("\n" + "-" * 50)
+    print("Processing group: {}".format(group))
+    print("  Exported Name: {}".format(exported_name))
+    print("  Path Template: {}".format(path_template))
+    
+    # 1. Buscar skeleton
+    skeleton = find_exportable_joint(group, index)
+    
+    if not skeleton:
+        print("  [SKIP] No exportable skeleton found in group")
+        return {
+            'success': False,
+            'message': NO_SKELETON,
+            'fbx_path': None
+        }
+    
+    print("  [OK] Skeleton found: {}".format(skeleton))
+    
+    # 2. Resolver path (el directorio lo crea el publisher)
+    export_dir = resolve_export_path(path_template)
+    
+    # 3. Construir path completo del FBX
+    fbx_filename = "{}.fbx".format(exported_name)
+    fbx_path = os.path.join(export_dir, fbx_filename).replace('\\', '/')
+    
+    print("  Export Path: {}".format(fbx_path))
+    
+    # Fingerprint (curves/pose solo si se va a comparar)
+    parts = compute_export_fingerprint(skeleton, start_frame, end_frame, prebaked,
+                                       animation=incremental)
+    
+    target = {
+        'success': True,
+        'message': 'Ready to export',
+        'fbx_path': fbx_path,
+        'group': group,
+        'exported_name': exported_name,
+        'skeleton': skeleton,
+        'parts': parts
+    }
+    
+    if incremental:
+        up_to_date, changed = export_manifest.check(fbx_path, parts)
+        if up_to_date:
+            print("  [UP TO DATE] Nothing changed since last export")
+            target['message'] = UP_TO_DATE
+            return target
+        print("  Changed: {}".format(', '.join(changed)))
+    
+    return target
+
+
+def write_group_fbx(target, start_frame, end_frame, prebaked=False):
+    """
+    Etapas write + verify + publish de un grupo preparado
+    
+    Args:
+        target: Resultado de prepare_group_export()
+        start_frame: Frame inicial
+        end_frame: Frame final
+        prebaked: True si bake_stage ya horneo el skeleton
+        
+    Returns:
+        dict: {success, message, fbx_path}. Si se exporto, 'publish' es el
+              PublishJob que sube el FBX al share (export_publisher)
+    """
+    fbx_path = target['fbx_path']
+    skeleton = target['skeleton']
+    parts = target['parts']
+    
+    # 4. Configurar FBX
+    configure_fbx_export(start_frame, end_frame, prebaked)
+    
+    # 5. Seleccionar skeleton (root joint)
+    try:
+        cmds.select(skeleton, replace=True)
+        print("  [OK] Skeleton selected for export: {}".format(skeleton))
+    except Exception as e:
+        print("  [ERROR] Could not select skeleton: {}".format(e))
+        return {
+            'success': False,
+            'message': 'Could not select skeleton: {}'.format(e),
+            'fbx_path': None
+        }
+    
+    # 6. Exportar FBX al scratch local
+    try:
+        local_path = export_publisher.scratch_path(fbx_path)
+        write_start = time.time()
+        with span('fbx_write', group=target['exported_name']):
+            mel.eval('FBXExport -f "{}" -s;'.format(local_path))
+        
+        # 7. Verificar y publicar al share en segundo plano
+        with span('verify'):
+            written = export_publisher.verify_local(local_path)
+        
+        if written:
+            print("  [SUCCESS] FBX exported, publishing in background")
+            manifest_info = {
+                'scene': get_scene_context().scene_path,
+                'group': target['group'].split('|')[-1],
+                # Historial para las estimaciones del dry-run
+                'write_seconds': round(time.time() - write_start, 2)
+            }
+            job = export_publisher.get_publisher().publish(
+                local_path, fbx_path,
+                on_success=lambda result: export_manifest.record(
+                    result.dest_path, parts, checksum=result.checksum,
+                    size=result.size, **manifest_info)
+            )
+            return {
+                'success': True,
+                'message': 'Exported successfully',
+                'fbx_path': fbx_path,
+                'publish': job
+            }
+        else:
+            print("  [ERROR] FBX file not created")
+            return {
+                'success': False,
+                'message': 'FBX file not created',
+                'fbx_path': None
+            }
+    
+    except Exception as e:
+        print("  [ERROR] FBX export failed: {}".format(e))
+        return {
+            'success': False,
+            'message': 'Export failed: {}'.format(e),
+            'fbx_path': None
+        }
+
+
+def export_group_to_fbx(group_data, start_frame, end_frame, index=None, incremental=False):
+    """
+    Exporta un grupo individual a FBX (con el bake complejo del FBX)
+    
+    Args:
+        group_data: Dict con info del grupo {group, exported_name, path, exportable}
+        start_frame: Frame inicial
+        end_frame: Frame final
+        index: SceneIndex de la escena (opcional)
+        incremental: Si True, no exporta si el fingerprint es igual al
+                     del ultimo export (message = UP_TO_DATE)
+        
+    Returns:
+        dict: Resultado de la exportacion {success, message, fbx_path[, publish]}
+    """
+    target = prepare_group_export(group_data, start_frame, end_frame, index, incremental)
+    if not target['success'] or target['message'] == UP_TO_DATE:
+        return target
+    return write_group_fbx(target, start_frame, end_frame)
+
+
+# ====== DRY RUN ======
+
+# Estimaciones del dry-run cuando no hay un export anterior del mismo
+# archivo en el manifest sidecar (valores aproximados, medidos en shots
+# tipicos; con historial se escala el ultimo export por cantidad de frames)
+ESTIMATE_BAKE_SECONDS_PER_JOINT_FRAME = 0.0002
+ESTIMATE_FBX_SECONDS_PER_JOINT_FRAME = 0.0001
+ESTIMATE_FBX_BYTES_PER_JOINT_FRAME = 120
+ESTIMATE_CACHE_SECONDS_PER_VERTEX_FRAME = 0.0000005
+ESTIMATE_CACHE_BYTES_PER_VERTEX_FRAME = 12
+ESTIMATE_CAMERA_SECONDS_PER_FRAME = 0.001
+ESTIMATE_CAMERA_BYTES_PER_FRAME = 200
+
+
+def estimate_from_history(path, frames):
+    """
+    Tiempo y tamano del ultimo export del archivo, escalados a frames
+
+    Returns:
+        tuple: (segundos o None, bytes o None)
+    """
+    export_dir, file_name = os.path.split(path)
+    entry = export_manifest.load(export_dir).get(file_name) or {}
+    old_range = entry.get('parts', {}).get('frame_range')
+    scale = float(frames) / (old_range[1] - old_range[0] + 1) if old_range else 1.0
+
+    size = entry.get('size')
+    if size is None:
+        size = fs_probe.size(path)
+    seconds = entry.get('write_seconds')
+
+    return (seconds * scale if seconds is not None else None,
+            int(size * scale) if size is not None else None)
+
+
+def plan_target(group_data, frames, index, geometry_cache=True):
+    """
+    Resuelve un grupo sin exportar nada
+
+    Returns:
+        dict: {group, target, kind, path, root(s), preset, preset_hash,
+               estimated_seconds, estimated_bytes} o {group, reason} si se
+               saltaria
+    """
+    group = group_data['group']
+    exported_name = group_data['exported_name']
+    export_dir = resolve_export_path(group_data['path'])
+    
+    skeleton = find_exportable_joint(group, index)
+    if skeleton:
+        joints = 1 + len(cmds.listRelatives(skeleton, allDescendents=True, type='joint') or [])
+        path = os.path.join(export_dir, exported_name + '.fbx').replace('\\', '/')
+        seconds, size = estimate_from_history(path, frames)
+        if seconds is None:
+            seconds = joints * frames * ESTIMATE_FBX_SECONDS_PER_JOINT_FRAME
+        if size is None:
+            size = joints * frames * ESTIMATE_FBX_BYTES_PER_JOINT_FRAME
+        return {
+            'group': group,
+            'target': exported_name,
+            'kind': 'skeleton',
+            'path': path,
+            'root': skeleton,
+            'joints': joints,
+            'preset': FBX_PRESET,
+            'preset_hash': fbx_presets.preset_hash(FBX_PRESET, prebaked=True),
+            'bake_seconds': joints * frames * ESTIMATE_BAKE_SECONDS_PER_JOINT_FRAME,
+            'estimated_seconds': seconds,
+            'estimated_bytes': size
+        }
+    
+    if not geometry_cache:
+        return {'group': group, 'reason': NO_SKELETON}
+    
+    roots = cache_exporter.find_cache_roots(group)
+    if not roots:
+        return {'group': group, 'reason': 'No exportable skeleton or geometry found'}
+    
+    meshes = cmds.listRelatives(group, allDescendents=True, type='mesh', fullPath=True) or []
+    vertices = sum(cmds.polyEvaluate(mesh, vertex=True) or 0
+                   for mesh in cmds.ls(meshes, noIntermediate=True, long=True) or [])
+    path = os.path.join(export_dir, exported_name + cache_exporter.CACHE_EXTENSION).replace('\\', '/')
+    seconds, size = estimate_from_history(path, frames)
+    if seconds is None:
+        seconds = vertices * frames * ESTIMATE_CACHE_SECONDS_PER_VERTEX_FRAME
+    if size is None:
+        size = vertices * frames * ESTIMATE_CACHE_BYTES_PER_VERTEX_FRAME
+    return {
+        'group': group,
+        'target': exported_name,
+        'kind': 'cache',
+        'path': path,
+        'roots': roots,
+        'vertices': vertices,
+        'preset': 'alembic',
+        'preset_hash': cache_exporter.abc_settings_hash(),
+        'bake_seconds': 0.0,
+        'estimated_seconds': seconds,
+        'estimated_bytes': size
+    }
+
+
+def plan_export(strategy, geometry_cache=True, index=None):
+    """
+    Plan del export sin hornear ni escribir nada (dry-run)
+    
+    Resuelve targets, skeletons, paths, rangos y presets y valida:
+    ExportedName o paths repetidos, carpetas sin permiso de escritura,
+    tokens sin resolver y grupos sin skeleton.
+    
+    Args:
+        strategy: TargetStrategy que elige los grupos (y la camara)
+        geometry_cache: Planear como Alembic los grupos sin skeleton
+        index: SceneIndex ya construido (opcional)
+    
+    Returns:
+        dict: {frame_range, targets, skipped, errors, warnings,
+               estimated_seconds, estimated_bytes, ok}
+    """
+    start_frame, end_frame = get_scene_context().frame_range
+    frames = end_frame - start_frame + 1
+    
+    plan = {
+        'frame_range': [start_frame, end_frame],
+        'targets': [],
+        'skipped': [],
+        'errors': [],
+        'warnings': []
+    }
+    
+    if frames < 1:
+        plan['errors'].append("Invalid frame range: {} - {}".format(start_frame, end_frame))
+    
+    if index is None:
+        index = SceneIndex.build()
+    
+    for group_data in strategy.select(index):
+        target = plan_target(group_data, max(frames, 1), index, geometry_cache)
+        if 'reason' in target:
+            plan['skipped'].append(target)
+            plan['warnings'].append("{}: {}".format(target['group'], target['reason']))
+        else:
+            target['frame_range'] = [start_frame, end_frame]
+            plan['targets'].append(target)
+    
+    if strategy.include_camera:
+        camera = camera_exporter.resolve_ue_camera(index)
+        if 'error' in camera:
+            title, message = camera['error']
+            # Sin camara se salta (igual que en el export); el resto es un error
+            issues = plan['warnings'] if title == 'No Camera Found' else plan['errors']
+            issues.append("Camera: {}".format(title))
+        else:
+            camera_frames = camera['end_frame'] - camera['start_frame'] + 1
+            seconds, size = estimate_from_history(camera['fbx_path'], camera_frames)
+            if seconds is None:
+                seconds = camera_frames * ESTIMATE_CAMERA_SECONDS_PER_FRAME
+            if size is None:
+                size = camera_frames * ESTIMATE_CAMERA_BYTES_PER_FRAME
+            plan['targets'].append({
+                'group': 'CAMERA',
+                'target': camera['exported_name'],
+                'kind': 'camera',
+                'path': camera['fbx_path'],
+                'root': camera['camera'],
+                'frame_range': [camera['start_frame'], camera['end_frame']],
+                'preset': 'camera',
+                'preset_hash': fbx_presets.preset_hash('camera', prebaked=True),
+                'bake_seconds': 0.0,
+                'estimated_seconds': seconds,
+                'estimated_bytes': size
+            })
+    
+    # Colisiones: dos targets con el mismo ExportedName o el mismo archivo
+    for key, label in (('target', 'ExportedName'), ('path', 'path')):
+        owners = {}
+        for target in plan['targets']:
+            owners.setdefault(target[key].lower(), []).append(target['group'])
+        for value, groups in sorted(owners.items()):
+            if len(groups) > 1:
+                plan['errors'].append("Duplicate {} '{}': {}".format(label, value, ', '.join(groups)))
+    
+    # Paths y permisos (una vez por carpeta)
+    checked = set()
+    for target in plan['targets']:
+        export_dir = os.path.dirname(target['path'])
+        if '<' in export_dir or '>' in export_dir:
+            plan['errors'].append("{}: unresolved token in path {}".format(target['group'], export_dir))
+            continue
+        if export_dir in checked:
+            continue
+        checked.add(export_dir)
+        writable, reason = export_publisher.check_writable(export_dir)
+        if not writable:
+            plan['errors'].append("Cannot write to {}: {}".format(export_dir, reason))
+    
+    plan['estimated_seconds'] = sum(target['bake_seconds'] + target['estimated_seconds']
+                                    for target in plan['targets'])
+    plan['estimated_bytes'] = sum(target['estimated_bytes'] for target in plan['targets'])
+    plan['ok'] = not plan['errors']
+    return plan
+
+
+def print_plan(plan):
+    """Imprime el plan del dry-run en el Script Editor"""
+    print("\n" + "=" * 60)
+    print("EXPORT PLAN (DRY RUN) - nothing was baked or written")
+    print("=" * 60)
+    print("\nFrame Range: {} - {}".format(*plan['frame_range']))
+    
+    print("\nTargets: {}".format(len(plan['targets'])))
+    for target in plan['targets']:
+        print("  [{}] {} ({})".format(target['kind'].upper(), target['target'], target['group']))
+        print("       {}".format(target['path']))
+        print("       preset: {}  frames: {} - {}  ~{:.1f}s  ~{:.1f} MB".format(
+            target['preset'], target['frame_range'][0], target['frame_range'][1],
+            target['bake_seconds'] + target['estimated_seconds'],
+            target['estimated_bytes'] / 1048576.0))
+    
+    print("\nSkipped: {}".format(len(plan['skipped'])))
+    for item in plan['skipped']:
+        print("  [SKIP] {} - {}".format(item['group'], item['reason']))
+    
+    print("\nErrors: {}".format(len(plan['errors'])))
+    for error in plan['errors']:
+        print("  [ERROR] {}".format(error))
+    
+    print("\nEstimated: ~{:.0f}s, ~{:.1f} MB".format(
+        plan['estimated_seconds'], plan['estimated_bytes'] / 1048576.0))
+    print("=" * 60 + "\n")
+
+
+def shot_manifest_entries(results):
+    """
+    Entradas del export_manifest.json del shot para los grupos exportados
+    y los que ya estaban al dia (su hash y tamano salen del .pkl_export.json
+    de la carpeta: no se vuelve a leer el archivo del share)
+    """
+    scene_path = get_scene_context().scene_path
+    entries = []
+    sidecars = {}    # carpeta -> entradas del .pkl_export.json
+    
+    for item in results['success']:
+        entries.append(export_manifest.shot_entry(
+            item['target'], item['path'], item['parts']['frame_range'],
+            item['preset_hash'], scene_path, kind=item['kind'],
+            content_hash=item['checksum'], size=item['size']
+        ))
+    
+    for item in results['unchanged']:
+        export_dir, file_name = os.path.split(item['path'])
+        if export_dir not in sidecars:
+            sidecars[export_dir] = export_manifest.load(export_dir)
+        recorded = sidecars[export_dir].get(file_name) or {}
+        entries.append(export_manifest.shot_entry(
+            item['target'], item['path'], item['parts']['frame_range'],
+            item['preset_hash'], scene_path, kind=item['kind'], status='unchanged',
+            content_hash=recorded.get('checksum'), size=recorded.get('size')
+        ))
+    
+    return entries
+
+
+# ====== EXPORT ======
+
+@timed('export')
+def run_export(strategy, incremental=True, geometry_cache=True, dry_run=False, on_result=None):
+    """
+    FUNCION PRINCIPAL - Exporta los grupos que elige la estrategia
+    
+    Valida skeletons y exporta FBX. Todos los skeletons (y la camara UE si
+    strategy.include_camera) se hornean en un solo recorrido del timeline
+    (bake_stage) y los FBX se escriben sin bake complejo. Los grupos sin
+    skeleton pero con geometria se exportan como cache Alembic
+    (cache_exporter), todos en un solo AbcExport.
+    
+    Con UI corre dentro de un progressWindow (helpers.ProgressWindow) con
+    tiempo transcurrido/restante; el usuario puede cancelar entre grupos y
+    lo ya escrito se publica igual.
+    
+    Args:
+        strategy: TargetStrategy (SceneTargets, SelectionTargets,
+                  ContainerTargets)
+        incremental: Saltar los grupos que no cambiaron desde el ultimo
+                     export (False = exportar todo)
+        geometry_cache: Exportar como Alembic los grupos sin skeleton
+        dry_run: Solo resolver y validar (ver plan_export); no hornea ni
+                 escribe nada
+        on_result: callable(line) que recibe el resultado de cada grupo
+                   en cuanto termina (p.ej. el log de la UI)
+    
+    Returns:
+        bool: True si se exporto (o ya estaba al dia) algun FBX.
+              Con dry_run devuelve el plan (dict)
+    """
+    print("\n" + "=" * 60)
+    print("PKL PIPELINE - {}".format(strategy.label))
+    print("=" * 60)
+    
+    # Un solo SceneIndex para seleccion, skeletons y camara
+    with span('discovery'):
+        index = SceneIndex.build()
+    
+    if dry_run:
+        start = time.time()
+        plan = plan_export(strategy, geometry_cache, index)
+        plan['plan_seconds'] = round(time.time() - start, 3)
+        print_plan(plan)
+        
+        message = "Targets: {}\nSkipped: {}\nErrors: {}\n\n".format(
+            len(plan['targets']), len(plan['skipped']), len(plan['errors']))
+        message += "\n".join(plan['errors'][:10])
+        message += "\n\nEstimated: ~{:.0f}s, ~{:.1f} MB\nCheck Script Editor for details.".format(
+            plan['estimated_seconds'], plan['estimated_bytes'] / 1048576.0)
+        confirm_dialog(
+            title='Export Plan' if plan['ok'] else 'Export Plan Errors',
+            message=message,
+            button=['OK'],
+            icon='information' if plan['ok'] else 'warning'
+        )
+        return plan
+    
+    # 1. Obtener frame range
+    start_frame, end_frame = get_scene_context().frame_range
+    
+    print("\nFrame Range: {} - {}".format(start_frame, end_frame))
+    
+    # Las opciones FBX se aplican una vez para todos los grupos
+    fbx_presets.invalidate()
+    
+    # 2. Grupos a exportar segun la estrategia
+    print("\nSearching for exportable groups...")
+    with span('select_targets', strategy=type(strategy).__name__):
+        exportable_groups = strategy.select(index)
+    include_camera = strategy.include_camera
+    
+    if not exportable_groups:
+        cmds.warning("No exportable groups found")
+        if not include_camera:
+            confirm_dialog(
+                title=strategy.empty_title,
+                message=strategy.empty_message,
+                button=['OK'],
+                icon='warning'
+            )
+            return False
+    
+    print("  Found {} exportable groups".format(len(exportable_groups)))
+    
+    # Una lista por carpeta, en paralelo; el collect responde desde memoria
+    with span('fs_prefetch'):
+        fs_probe.prefetch(probe_directories(exportable_groups), refresh=True)
+    
+    # 3. Collect: preparar cada grupo
+    print("\n" + "=" * 60)
+    print("STARTING EXPORT PROCESS")
+    print("=" * 60)
+    
+    results = {
+        'success': [],
+        'unchanged': [],
+        'skipped': [],
+        'failed': [],
+        'cancelled': []
+    }
+    
+    targets = []
+    cache_targets = []
+    camera = None
+    camera_result = None
+    
+    # Un paso por grupo (collect); bake y writes se suman al conocerlos.
+    # Se puede cancelar entre pasos: lo ya escrito se publica igual.
+    with ProgressWindow('PKL Export - {}'.format(strategy.label.title()),
+                        total=len(exportable_groups), on_result=on_result) as progress:
+        for group_data in exportable_groups:
+            if progress.cancelled:
+                results['cancelled'].append({'group': group_data['group']})
+                continue
+            
+            progress.step("Checking {}".format(group_data['group']))
+            with span('fingerprint'):
+                target = prepare_group_export(group_data, start_frame, end_frame, index,
+                                              incremental, prebaked=True)
+            
+            if target['message'] == UP_TO_DATE:
+                item = {
+                    'group': group_data['group'],
+                    'target': target['exported_name'],
+                    'path': target['fbx_path'],
+                    'kind': 'skeleton',
+                    'preset_hash': target['parts']['fbx_settings'],
+                    'parts': target['parts']
+                }
+                results['unchanged'].append(item)
+                progress.finish("[=] {}".format(item['group']))
+                continue
+            elif target['success']:
+                targets.append(target)
+            elif target['message'] == NO_SKELETON and geometry_cache:
+                with span('fingerprint'):
+                    target = cache_exporter.prepare_cache_export(group_data, start_frame, end_frame, incremental)
+                
+                if target['message'] == UP_TO_DATE:
+                    item = {
+                        'group': group_data['group'],
+                        'target': target['exported_name'],
+                        'path': target['path'],
+                        'kind': 'cache',
+                        'preset_hash': target['parts']['abc_settings'],
+                        'parts': target['parts']
+                    }
+                    results['unchanged'].append(item)
+                    progress.finish("[=] {}".format(item['group']))
+                    continue
+                elif target['success']:
+                    cache_targets.append(target)
+                else:
+                    results['skipped'].append({
+                        'group': group_data['group'],
+                        'reason': target['message']
+                    })
+                    progress.finish("[SKIP] {}".format(group_data['group']))
+                    continue
+            elif target['message'] == NO_SKELETON:
+                results['skipped'].append({
+                    'group': group_data['group'],
+                    'reason': target['message']
+                })
+                progress.finish("[SKIP] {}".format(group_data['group']))
+                continue
+            else:
+                results['failed'].append({
+                    'group': group_data['group'],
+                    'reason': target['message']
+                })
+                progress.finish("[FAIL] {}".format(group_data['group']))
+                continue
+            progress.finish()
+        
+        if progress.cancelled:
+            for target in targets + cache_targets:
+                results['cancelled'].append({'group': target['group']})
+            targets = []
+            cache_targets = []
+            include_camera = False
+        
+        # bake + un write por grupo + caches + camara + publish
+        progress.add_steps(int(bool(targets)) + len(targets) + int(bool(cache_targets)) +
+                           2 * int(include_camera) + 1)
+        
+        # 4. Bake (un solo recorrido del timeline) + write. Al salir del
+        #    BakeStage se deshace el bake y se borra la camara UE.
+        camera_job = None
+        
+        # Sin refresh ni autosave; el undo lo maneja BakeStage
+        with SceneSuspend('pkl_export_scene', undo=None, parallel=True):
+            with bake_stage.BakeStage() as stage:
+                for target in targets:
+                    stage.add_skeleton(target['skeleton'])
+                
+                if include_camera:
+                    progress.step("Preparing UE camera")
+                    print("\n" + "-" * 50)
+                    print("Processing UE camera")
+                    with span('camera_prepare'):
+                        camera = camera_exporter.prepare_ue_camera(index)
+                    
+                    if 'error' not in camera:
+                        camera_range = (camera['start_frame'], camera['end_frame'])
+                        if targets and camera_range == (start_frame, end_frame):
+                            # El timeline ya se recorre para los skeletons
+                            camera_exporter.attach_ue_camera(camera)
+                            stage.add_camera(camera['transform'], camera['constraint'])
+                        else:
+                            # Sin skeletons o con rango propio (_FR_): camino rapido
+                            camera_exporter.bake_ue_camera(camera)
+                    progress.finish()
+                
+                if targets:
+                    # Un solo bakeResults: no se puede cancelar a la mitad
+                    progress.step("Baking {} skeleton(s)".format(len(targets)))
+                    with span('bake', joints=len(stage.joints)):
+                        stage.bake(start_frame, end_frame)
+                    progress.finish()
+                
+                for target in targets:
+                    if progress.cancelled:
+                        results['cancelled'].append({'group': target['group']})
+                        continue
+                    
+                    progress.step("Writing {}".format(target['exported_name']))
+                    print("\nWriting: {}".format(target['fbx_path']))
+                    result = write_group_fbx(target, start_frame, end_frame, prebaked=True)
+                    
+                    if result['success']:
+                        results['success'].append({
+                            'group': target['group'],
+                            'target': target['exported_name'],
+                            'path': result['fbx_path'],
+                            'kind': 'skeleton',
+                            'preset_hash': target['parts']['fbx_settings'],
+                            'parts': target['parts'],
+                            'publish': result['publish']
+                        })
+                        progress.finish("[OK] {} - written, publishing".format(target['group']))
+                    else:
+                        results['failed'].append({
+                            'group': target['group'],
+                            'reason': result['message']
+                        })
+                        progress.finish("[FAIL] {} - {}".format(target['group'], result['message']))
+                
+                if camera and 'error' not in camera:
+                    if progress.cancelled:
+                        results['cancelled'].append({'group': 'CAMERA'})
+                        camera = None
+                    else:
+                        progress.step("Writing UE camera")
+                        camera_job = camera_exporter.write_ue_camera(camera, prebaked=True)
+                        progress.finish()
+            
+            # Caches Alembic: un solo AbcExport para todos los grupos sin skeleton
+            if cache_targets and progress.cancelled:
+                for target in cache_targets:
+                    results['cancelled'].append({'group': target['group']})
+                cache_targets = []
+            elif cache_targets:
+                progress.step("Writing {} Alembic cache(s)".format(len(cache_targets)))
+            
+            with span('abc_write', caches=len(cache_targets)):
+                cache_results = cache_exporter.export_caches(cache_targets, start_frame, end_frame)
+            for target, result in zip(cache_targets, cache_results):
+                if result['success']:
+                    results['success'].append({
+                        'group': target['group'],
+                        'target': target['exported_name'],
+                        'path': result['path'],
+                        'kind': 'cache',
+                        'preset_hash': target['parts']['abc_settings'],
+                        'parts': target['parts'],
+                        'publish': result['publish']
+                    })
+                    progress.report("[ABC] {}".format(target['group']))
+                else:
+                    results['failed'].append({
+                        'group': target['group'],
+                        'reason': result['message']
+                    })
+                    progress.report("[FAIL] {} - {}".format(target['group'], result['message']))
+            if cache_targets:
+                progress.finish()
+        
+        # 5. Esperar las publicaciones al share (ya no se cancela: los
+        #    archivos estan escritos)
+        progress.step("Publishing {} file(s)".format(len(results['success'])))
+        if results['success']:
+            print("\nWaiting for {} file(s) to publish...".format(len(results['success'])))
+        
+        published = []
+        for item in results['success']:
+            with span('publish_wait'):
+                publish_result = item.pop('publish').wait()
+            if publish_result.success:
+                item['checksum'] = publish_result.checksum
+                item['size'] = publish_result.size
+                published.append(item)
+                progress.report("[PUBLISHED] {}".format(item['path']))
+            else:
+                print("  [ERROR] Publish failed: {}".format(publish_result.error))
+                results['failed'].append({
+                    'group': item['group'],
+                    'reason': 'Publish failed: {} (local file: {})'.format(
+                        publish_result.error, publish_result.local_path)
+                })
+                progress.report("[FAIL] {} - publish failed".format(item['group']))
+        results['success'] = published
+        
+        camera_result = camera_job.wait() if camera_job else None
+        progress.finish()
+    
+    # 6. Manifest del shot para el importer de Unreal
+    manifest_entries = shot_manifest_entries(results)
+    if camera_result is not None and camera_result.success:
+        manifest_entries.append(camera_exporter.camera_manifest_entry(camera, camera_result))
+    if manifest_entries:
+        with span('shot_manifest'):
+            manifest_file = export_manifest.write_shot_manifest(
+                get_scene_context().shot_export_dir, manifest_entries)
+        if manifest_file:
+            print("\nShot manifest: {}".format(manifest_file))
+    
+    # 7. Mostrar resumen
+    print("\n" + "=" * 60)
+    print("EXPORT COMPLETE - SUMMARY")
+    print("=" * 60)
+    print("\nSuccessful Exports: {}".format(len(results['success'])))
+    for item in results['success']:
+        print("  [{}] {}".format('ABC' if item['kind'] == 'cache' else 'OK', item['group']))
+        print("       {}".format(item['path']))
+    
+    print("\nUnchanged (Up to date): {}".format(len(results['unchanged'])))
+    for item in results['unchanged']:
+        print("  [=] {}".format(item['group']))
+    
+    print("\nSkipped (No Skeleton / Geometry): {}".format(len(results['skipped'])))
+    for item in results['skipped']:
+        print("  [SKIP] {}".format(item['group']))
+    
+    print("\nFailed: {}".format(len(results['failed'])))
+    for item in results['failed']:
+        print("  [FAIL] {}".format(item['group']))
+        print("         {}".format(item['reason']))
+    
+    if results['cancelled']:
+        print("\nCancelled: {}".format(len(results['cancelled'])))
+        for item in results['cancelled']:
+            print("  [CANCEL] {}".format(item['group']))
+    
+    print("\n" + "=" * 60 + "\n")
+    
+    # 8. Dialogo de resultado
+    if results['cancelled']:
+        message = "Export cancelled.\n\n"
+        message += "Successful: {}\n".format(len(results['success']))
+        message += "Unchanged: {}\n".format(len(results['unchanged']))
+        message += "Failed: {}\n".format(len(results['failed']))
+        message += "Not exported: {}\n\n".format(len(results['cancelled']))
+        message += "Check Script Editor for details."
+        
+        confirm_dialog(
+            title='Export Cancelled',
+            message=message,
+            button=['OK'],
+            icon='warning'
+        )
+    elif exportable_groups:
+        if results['success'] or results['unchanged']:
+            message = "Export completed!\n\n"
+            message += "Successful: {}\n".format(len(results['success']))
+            message += "Unchanged: {}\n".format(len(results['unchanged']))
+            message += "Skipped: {}\n".format(len(results['skipped']))
+            message += "Failed: {}\n\n".format(len(results['failed']))
+            message += "Check Script Editor for details."
+            
+            confirm_dialog(
+                title='Export Complete',
+                message=message,
+                button=['OK'],
+                icon='information'
+            )
+        else:
+            message = "No groups were exported.\n\n"
+            message += "Skipped: {}\n".format(len(results['skipped']))
+            message += "Failed: {}\n\n".format(len(results['failed']))
+            message += "Check Script Editor for details."
+            
+            confirm_dialog(
+                title='Export Failed',
+                message=message,
+                button=['OK'],
+                icon='warning'
+            )
+    
+    exported = len(results['success']) + len(results['unchanged']) > 0
+    
+    # 9. Resultado de la camara (el FBX se subio mientras se exportaban los grupos)
+    if camera is not None:
+        if 'error' in camera:
+            title, message = camera['error']
+            confirm_dialog(title=title, message=message, button=['OK'], icon='warning')
+        else:
+            exported = camera_exporter.report_camera_export(camera, camera_result) or exported
+    
+    return exported
+
@@ -5,7 +5,6 @@ Crea grupos MASTER con atributos desde el nombre del archivo
 """
 import maya.cmds as cmds
 import maya.mel as mm
-import re
 import os
 import sys
 
@@ -20,18 +19,15 @@ try:
         sys.path.insert(0, utils_dir)
     
     import helpers
+    import naming
     set_locked_attribute = helpers.set_locked_attribute
+    get_scene_context = helpers.get_scene_context
     
 except ImportError as e:
-    print("Warning: Could not import helpers - {}".format(e))
-    
-    # Fallback
-    def set_locked_attribute(obj, attr_name, value):
-        attr_full = obj + '.' + attr_name
-        if not cmds.attributeQuery(attr_name, node=obj, exists=True):
-            cmds.addAttr(obj, longName=attr_name, dataType='string')
-        cmds.setAttr(attr_full, value, type='string')
-        cmds.setAttr(attr_full, lock=True)
+    # Sin helpers/naming no hay SceneContext ni gramatica de nombres: el
+    # error llega a quien importa el modulo (la UI avisa)
+    print("Error: Could not import helpers - {}".format(e))
+    raise
 
 
 def create_main_group():
@@ -45,7 +41,7 @@ def create_main_group():
     print("=" * 60)
     
     # 1. Obtener datos del archivo
-    ruta_completa = cmds.file(query=True, sceneName=True)
+    ruta_completa = get_scene_context().scene_path
     
     if not ruta_completa:
         cmds.warning("Please save the scene before running this tool")
@@ -58,14 +54,12 @@ def create_main_group():
         return False
 
     nombre_archivo = os.path.basename(ruta_completa)
-    nombre_base = os.path.splitext(nombre_archivo)[0]
+    parsed = naming.parse(nombre_archivo)
     
     print("\nFile: {}".format(nombre_archivo))
 
     # 2. VALIDACION: Solo permite model o rig
-    id_match = re.search(r"(rig|textures|model)", nombre_base, re.IGNORECASE)
-    
-    if not id_match:
+    if parsed.department is None:
         cmds.warning("Scene name must contain 'model', 'rig', or 'textures'")
         cmds.confirmDialog(
             title='Invalid Scene Type',
@@ -76,11 +70,11 @@ def create_main_group():
         )
         return False
     
-    found = id_match.group(1).lower()
+    found = parsed.department.lower()
     id_val = "RIG" if found == "textures" else found.upper()
     
     # Validacion adicional: rechazar escenas de animacion
-    if re.search(r"_anim_", nombre_base, re.IGNORECASE):
+    if parsed.type_anim:
         cmds.warning("Cannot run on animation scenes")
         cmds.confirmDialog(
             title='Invalid Scene Type',
@@ -95,17 +89,15 @@ def create_main_group():
     
     print("  Scene Type: {} (valid)".format(id_val))
 
-    # 3. Extraccion de datos con Regex
+    # 3. Extraccion de datos desde la convencion de nombres
     
     # Categoria (CH, PR, etc)
-    cat_match = re.search(r"^([a-zA-Z]+)_", nombre_base)
-    category_val = cat_match.group(1).upper() if cat_match else "UKN"
+    category_val = parsed.category.upper() if parsed.category else "UKN"
     print("  Category: {}".format(category_val))
 
     # Nombre del Asset
-    name_match = re.search(r"^[a-zA-Z]+_([a-zA-Z]+)_\d+_", nombre_base)
-    if name_match:
-        raw_name = name_match.group(1)
+    if parsed.asset_name:
+        raw_name = parsed.asset_name
         name_val_attr = raw_name.capitalize()
         name_val_group = raw_name.upper()
     else:
@@ -5,8 +5,35 @@ Verifica geometria limpia basado en Maya Cleanup Options
 """
 import maya.cmds as cmds
 import maya.mel as mel
+import os
+import sys
 from collections import defaultdict
 
+# Importar helpers
+try:
+    current_file = os.path.abspath(__file__)
+    core_dir = os.path.dirname(current_file)
+    parent_dir = os.path.dirname(core_dir)
+    utils_dir = os.path.join(parent_dir, 'utils')
+    
+    if utils_dir not in sys.path:
+        sys.path.insert(0, utils_dir)
+    
+    import helpers
+    SceneSuspend = helpers.SceneSuspend
+    UNDO_OFF = helpers.UNDO_OFF
+    confirm_dialog = helpers.confirm_dialog
+    
+    import profiling
+    span = profiling.span
+    timed = profiling.timed
+    
+except ImportError as e:
+    # Sin helpers/profiling no hay SceneSuspend ni spans: el error llega a
+    # quien importa el modulo (la UI avisa)
+    print("Error: Could not import helpers - {}".format(e))
+    raise
+
 def _get_geo_transforms():
     """Retorna los transforms de las mallas poligonales."""
     return [
@@ -24,6 +51,7 @@ def _run_cleanup_select(flags_list):
     mel_cmd = 'polyCleanupArgList 3 {{{}}};'.format(arg_string)
     mel.eval(mel_cmd)
 
+@timed('model_check')
 def model_check_cleanup():
     """
     Realiza cleanup check basado en la imagen de referencia:
@@ -57,37 +85,41 @@ def model_check_cleanup():
             
     ]
 
-    for label, index in checks:
-        flags = ["0"] * 31 
-        flags[0] = "1"  # Modo Select Only
-        flags[index] = "1"
+    # Las selecciones de cada check no se registran en el undo ni redibujan
+    with SceneSuspend('pkl_model_check', undo=UNDO_OFF):
+        for label, index in checks:
+            flags = ["0"] * 31 
+            flags[0] = "1"  # Modo Select Only
+            flags[index] = "1"
 
-        cmds.select(geos, r=True)
-        _run_cleanup_select(flags)
+            cmds.select(geos, r=True)
+            with span('cleanup_check', check=label, meshes=len(geos)):
+                _run_cleanup_select(flags)
 
-        selection = cmds.ls(sl=True, fl=True) or []
-        
-        for item in selection:
-            if "." in item:  # Es un componente (face, edge, etc)
-                geo = item.split(".")[0]
-                error_map[geo][label] += 1
-                all_problem_components.append(item)
+            selection = cmds.ls(sl=True, fl=True) or []
+            
+            for item in selection:
+                if "." in item:  # Es un componente (face, edge, etc)
+                    geo = item.split(".")[0]
+                    error_map[geo][label] += 1
+                    all_problem_components.append(item)
 
-    # --- CHECK DE FREEZE TRANSFORMATIONS ---
-    for geo in geos:
-        # Revisa traslacion, rotacion y escala con tolerancia
-        t = cmds.getAttr(geo + ".t")[0]
-        r = cmds.getAttr(geo + ".r")[0]
-        s = cmds.getAttr(geo + ".s")[0]
-        
-        needs_freeze = False
-        if any(abs(v) > 0.001 for v in t): needs_freeze = True
-        if any(abs(v) > 0.001 for v in r): needs_freeze = True
-        if any(abs(1.0 - v) > 0.001 for v in s): needs_freeze = True
-        
-        if needs_freeze:
-            error_map[geo]["Unfrozen Transformations"] = 1
-            objects_to_freeze.append(geo)
+        # --- CHECK DE FREEZE TRANSFORMATIONS ---
+        with span('freeze_check', meshes=len(geos)):
+            for geo in geos:
+                # Revisa traslacion, rotacion y escala con tolerancia
+                t = cmds.getAttr(geo + ".t")[0]
+                r = cmds.getAttr(geo + ".r")[0]
+                s = cmds.getAttr(geo + ".s")[0]
+            
+                needs_freeze = False
+                if any(abs(v) > 0.001 for v in t): needs_freeze = True
+                if any(abs(v) > 0.001 for v in r): needs_freeze = True
+                if any(abs(1.0 - v) > 0.001 for v in s): needs_freeze = True
+            
+                if needs_freeze:
+                    error_map[geo]["Unfrozen Transformations"] = 1
+                    objects_to_freeze.append(geo)
 
     # --- SELECCION Y REPORTE FINAL ---
     final_selection = all_problem_components + objects_to_freeze
@@ -106,7 +138,7 @@ def model_check_cleanup():
         
         report.append("Total problem components: {}".format(len(all_problem_components)))
 
-        cmds.confirmDialog(
+        confirm_dialog(
             title="Model Check Results",
             message="\n".join(report),
             button=["OK"],
@@ -114,12 +146,15 @@ def model_check_cleanup():
         )
     else:
         cmds.select(clear=True)
-        cmds.confirmDialog(
+        confirm_dialog(
             title="Model Check",
             message="No geometry issues found!\n\nAll geometry is clean.",
             button=["OK"],
             icon="information"
         )
 
+    # {geo: {check: count}} (vacio si la geometria esta limpia)
+    return dict((geo, dict(errors)) for geo, errors in error_map.items())
+
 # Para ejecutar:
 # model_check_cleanup()
\ No newline at end of file
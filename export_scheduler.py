@@ -0,0 +1,378 @@
+# -*- coding: utf-8 -*-
+"""
+PKL Pipeline - Export Scheduler
+Re-exporta muchos shots en paralelo con N procesos mayapy
+
+Cada tarea es una escena: un worker corre batch.py (export_all: skeletons
+y camara UE con un solo bake) sobre esa escena. El estado de cada shot se guarda en un
+manifest JSON despues de cada cambio, asi una corrida interrumpida se
+retoma donde quedo y los fallos se reintentan.
+
+Uso (con python o mayapy; los workers usan mayapy):
+    python export_scheduler.py --scenes "P:/PKL/scenes/**/*_anim_*.ma" --manifest reexport.json
+    python export_scheduler.py --manifest reexport.json              # retomar
+    python export_scheduler.py --manifest reexport.json --status     # solo resumen
+    python export_scheduler.py --manifest reexport.json --retry-failed
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+from collections import OrderedDict, deque
+
+import batch
+import export_manifest
+
+PIPELINE_DIR = os.path.dirname(os.path.abspath(__file__))
+BATCH_SCRIPT = os.path.join(PIPELINE_DIR, 'batch.py')
+
+MANIFEST_VERSION = 1
+
+DEFAULT_OPERATIONS = ['export_all']
+
+# Estados de un job
+PENDING = 'pending'
+RUNNING = 'running'
+OK = 'ok'
+SKIPPED = 'skipped'
+FAILED = 'failed'
+JOB_STATES = (PENDING, RUNNING, OK, SKIPPED, FAILED)
+
+# Segundos entre cada revision de los workers
+POLL_INTERVAL = 0.5
+
+
+# ====== MANIFEST ======
+
+class JobManifest(object):
+    """
+    Manifest persistente de una corrida del scheduler
+
+    {
+        "version": 1,
+        "operations": ["export_all"],
+        "jobs": {
+            "<scene>": {"id", "status", "attempts", "report", "log",
+                        "error", "duration", "updated"}
+        }
+    }
+    """
+
+    def __init__(self, path, operations=None):
+        self.path = os.path.abspath(path)
+        self.operations = list(operations or DEFAULT_OPERATIONS)
+        self.jobs = OrderedDict()
+
+    @classmethod
+    def load(cls, path):
+        """Carga el manifest (o uno vacio si el archivo no existe)"""
+        manifest = cls(path)
+        if not os.path.exists(manifest.path):
+            return manifest
+
+        with open(manifest.path, 'r') as f:
+            data = json.load(f, object_pairs_hook=OrderedDict)
+
+        if data.get('version') != MANIFEST_VERSION:
+            raise ValueError("Unsupported manifest version: {}".format(data.get('version')))
+
+        manifest.operations = data['operations']
+        manifest.jobs = data['jobs']
+
+        # Jobs que quedaron corriendo cuando se corto la corrida anterior
+        for job in manifest.jobs.values():
+            if job['status'] == RUNNING:
+                job['status'] = PENDING
+        return manifest
+
+    def save(self):
+        """Escribe el manifest de forma atomica (tmp + replace)"""
+        data = OrderedDict([
+            ('version', MANIFEST_VERSION),
+            ('operations', self.operations),
+            ('jobs', self.jobs),
+        ])
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, indent=2)
+        export_manifest.replace_file(tmp_path, self.path)
+
+    @property
+    def work_dir(self):
+        """Carpeta con los reportes y logs de cada job"""
+        return os.path.splitext(self.path)[0] + '_jobs'
+
+    def add_scenes(self, scenes):
+        """Agrega escenas nuevas como pending (las existentes no cambian)"""
+        added = 0
+        for scene in scenes:
+            if scene in self.jobs:
+                continue
+            job_id = '{:04d}'.format(len(self.jobs))
+            job_dir = os.path.join(self.work_dir, job_id)
+            self.jobs[scene] = OrderedDict([
+                ('id', job_id),
+                ('status', PENDING),
+                ('attempts', 0),
+                ('report', os.path.join(job_dir, batch.report_name(scene))),
+                ('log', os.path.join(job_dir, 'worker.log')),
+                ('error', None),
+                ('duration', None),
+                ('updated', None),
+            ])
+            added += 1
+        return added
+
+    def update(self, scene, **values):
+        job = self.jobs[scene]
+        job.update(values)
+        job['updated'] = time.strftime('%Y-%m-%d %H:%M:%S')
+        self.save()
+
+    def reset(self, states):
+        """Vuelve a pending los jobs en esos estados (y reinicia intentos)"""
+        for job in self.jobs.values():
+            if job['status'] in states:
+                job['status'] = PENDING
+                job['attempts'] = 0
+        self.save()
+
+    def summary(self):
+        counts = OrderedDict((state, 0) for state in JOB_STATES)
+        for job in self.jobs.values():
+            counts[job['status']] += 1
+        return counts
+
+
+# ====== WORKERS ======
+
+class Worker(object):
+    """Un proceso mayapy corriendo batch.py sobre una escena"""
+
+    def __init__(self, scene, job, args, operations):
+        self.scene = scene
+        self.start = time.time()
+
+        job_dir = os.path.dirname(job['report'])
+        if not os.path.exists(job_dir):
+            os.makedirs(job_dir)
+        if os.path.exists(job['report']):
+            os.remove(job['report'])
+
+        command = [args.mayapy, BATCH_SCRIPT] + list(operations) + [
+            '--scenes', scene,
+            '--report-dir', job_dir,
+        ]
+        if args.project:
+            command += ['--project', args.project]
+        if args.force:
+            command.append('--force')
+
+        self.log_file = open(job['log'], 'a')
+        self.log_file.write("\n# {} attempt {}\n".format(
+            time.strftime('%Y-%m-%d %H:%M:%S'), job['attempts'] + 1))
+        self.log_file.flush()
+        self.process = subprocess.Popen(command, stdout=self.log_file,
+                                        stderr=subprocess.STDOUT, cwd=PIPELINE_DIR)
+
+    @property
+    def elapsed(self):
+        return time.time() - self.start
+
+    def poll(self):
+        return self.process.poll()
+
+    def kill(self):
+        if self.process.poll() is None:
+            self.process.kill()
+            self.process.wait()
+        self.close()
+
+    def close(self):
+        if not self.log_file.closed:
+            self.log_file.close()
+
+
+def read_result(job, return_code):
+    """
+    Lee el reporte JSON que escribio batch.py
+
+    Returns:
+        tuple: (status, error)
+    """
+    if not os.path.exists(job['report']):
+        return FAILED, "Worker exited with code {} without a report (see {})".format(
+            return_code, job['log'])
+
+    with open(job['report'], 'r') as f:
+        report = json.load(f)
+
+    if report['status'] in (OK, SKIPPED):
+        return report['status'], None
+
+    errors = [report['error']] if report.get('error') else []
+    for op in report.get('operations', []):
+        if not op['success'] and not op.get('skipped'):
+            detail = op['error'] or '; '.join(d['title'] for d in op.get('dialogs', []))
+            errors.append("{}: {}".format(op['operation'], detail or 'failed'))
+    return FAILED, '\n'.join(errors) or 'failed'
+
+
+# ====== SCHEDULER ======
+
+def run_jobs(manifest, args):
+    """
+    Corre los jobs pending con hasta args.workers procesos a la vez
+
+    Los fallos vuelven a la cola hasta agotar args.retries reintentos.
+    """
+    queue = deque(scene for scene, job in manifest.jobs.items() if job['status'] == PENDING)
+    running = {}
+    total = len(queue)
+    done = 0
+
+    print("Running {} job(s) with {} worker(s)".format(total, args.workers))
+
+    try:
+        while queue or running:
+            while queue and len(running) < args.workers:
+                scene = queue.popleft()
+                job = manifest.jobs[scene]
+                running[scene] = Worker(scene, job, args, manifest.operations)
+                manifest.update(scene, status=RUNNING, attempts=job['attempts'] + 1)
+
+            time.sleep(POLL_INTERVAL)
+
+            for scene, worker in list(running.items()):
+                return_code = worker.poll()
+                job = manifest.jobs[scene]
+
+                if return_code is None:
+                    if args.timeout and worker.elapsed > args.timeout:
+                        worker.kill()
+                        status, error = FAILED, "Timeout after {}s".format(args.timeout)
+                    else:
+                        continue
+                else:
+                    worker.close()
+                    status, error = read_result(job, return_code)
+
+                del running[scene]
+
+                if status == FAILED and job['attempts'] <= args.retries:
+                    queue.append(scene)
+                    manifest.update(scene, status=PENDING, error=error,
+                                    duration=round(worker.elapsed, 1))
+                    print("[RETRY] {} (attempt {} failed)".format(
+                        os.path.basename(scene), job['attempts']))
+                    continue
+
+                done += 1
+                manifest.update(scene, status=status, error=error,
+                                duration=round(worker.elapsed, 1))
+                print("[{}/{}] [{}] {} ({:.1f}s)".format(
+                    done, total, status.upper(), os.path.basename(scene), worker.elapsed))
+
+    except KeyboardInterrupt:
+        print("\nInterrupted - stopping workers...")
+        for scene, worker in running.items():
+            worker.kill()
+            job = manifest.jobs[scene]
+            # El intento cortado no cuenta
+            manifest.update(scene, status=PENDING, attempts=job['attempts'] - 1)
+        print("Manifest saved. Run again with --manifest {} to resume.".format(manifest.path))
+        raise
+
+
+def print_summary(manifest):
+    summary = manifest.summary()
+    print("\n" + "=" * 60)
+    print("EXPORT SCHEDULER - {}".format(manifest.path))
+    print("  " + ', '.join('{} {}'.format(count, state) for state, count in summary.items()))
+
+    failed = [(scene, job) for scene, job in manifest.jobs.items() if job['status'] == FAILED]
+    for scene, job in failed:
+        print("\n  [FAILED] {} ({} attempts)".format(scene, job['attempts']))
+        for line in (job['error'] or '').splitlines()[-3:]:
+            print("    {}".format(line))
+        print("    Log: {}".format(job['log']))
+    print("=" * 60)
+    return summary
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description='Export many shots in parallel with mayapy workers (resumable)'
+    )
+    parser.add_argument('--manifest', required=True,
+                        help='Job manifest (created if missing, resumed if it exists)')
+    parser.add_argument('--scenes', nargs='+', default=[],
+                        help='Scene files or glob patterns to add (supports **)')
+    parser.add_argument('--operations', nargs='+', choices=list(batch.OPERATIONS), default=None,
+                        help='Operations per scene (default: {})'.format(' '.join(DEFAULT_OPERATIONS)))
+    parser.add_argument('--workers', type=int, default=multiprocessing.cpu_count(),
+                        help='Parallel mayapy processes (default: CPU count)')
+    parser.add_argument('--retries', type=int, default=1,
+                        help='Retries per failed scene (default: 1)')
+    parser.add_argument('--timeout', type=float, default=0,
+                        help='Kill a worker after this many seconds (0 = no limit)')
+    parser.add_argument('--mayapy', default=os.environ.get('MAYAPY', 'mayapy'),
+                        help='mayapy executable (default: $MAYAPY or mayapy in PATH)')
+    parser.add_argument('--project', default=None,
+                        help='Maya project root passed to the workers')
+    parser.add_argument('--force', action='store_true',
+                        help='Re-export every group even if nothing changed')
+    parser.add_argument('--retry-failed', action='store_true',
+                        help='Reset failed jobs to pending before running')
+    parser.add_argument('--rerun', action='store_true',
+                        help='Reset every job to pending before running')
+    parser.add_argument('--status', action='store_true',
+                        help='Only print the manifest summary')
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    manifest = JobManifest.load(args.manifest)
+    if args.status:
+        print_summary(manifest)
+        return 0
+
+    if args.operations:
+        if manifest.jobs and args.operations != manifest.operations:
+            print("Manifest was created with operations: {}".format(' '.join(manifest.operations)))
+            return 1
+        manifest.operations = args.operations
+
+    added = manifest.add_scenes(batch.expand_scenes(args.scenes)) if args.scenes else 0
+    if added:
+        print("Added {} scene(s) to {}".format(added, manifest.path))
+
+    if args.rerun:
+        manifest.reset(JOB_STATES)
+    elif args.retry_failed:
+        manifest.reset((FAILED,))
+    manifest.save()
+
+    if not manifest.jobs:
+        print("No scenes in manifest. Use --scenes to add some.")
+        return 1
+
+    start = time.time()
+    try:
+        run_jobs(manifest, args)
+    except KeyboardInterrupt:
+        print_summary(manifest)
+        return 130
+
+    summary = print_summary(manifest)
+    print("Total time: {:.1f}s".format(time.time() - start))
+    return 1 if summary[FAILED] or summary[PENDING] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -99,6 +99,7 @@ try:
     
     import helpers
     get_scene_type = helpers.get_scene_type
+    get_scene_context = helpers.get_scene_context
     
     
     check_scene = getattr(scene_checker, 'check_scene', None)
@@ -108,9 +109,10 @@ try:
     set_camera_func = getattr(camera_setter, 'set_camera_attributes', None)
     check_model_func = getattr(model_checker, 'model_check_cleanup', None)
     set_joint_func = getattr(skeleton_marker, 'mark_skeleton_exportable', None)
-    export_all_func = getattr(scene_exporter, 'export_scene', None)
+    export_all_func = getattr(scene_exporter, 'export_all', None)
     export_selected_func = getattr(export_selected_grp, 'export_selected', None)
     check_animation_scene = check_anm_scn.check_animation_scene
+    enable_master_redirect = getattr(check_anm_scn, 'enable_master_redirect', None)
 
     
     if check_scene is None:
@@ -139,11 +141,14 @@ try:
     
     if export_all_func is None:
         print("  Warning: function not found in module")
-        def export_all_func(): print("(No function found)")
+        def export_all_func(**kwargs): print("(No function found)")
    
     if export_selected_func is None:
         print("  Warning: export_selected function not found in export_selected module")
-        def export_selected_func(): print("Export Selected (No function found)")
+        def export_selected_func(**kwargs): print("Export Selected (No function found)")
+    
+    if enable_master_redirect is None:
+        def enable_master_redirect(): return False
    
     VERSION = settings.VERSION
     
@@ -159,10 +164,25 @@ except ImportError as e:
     def organize_animation(): print("Animation Organized (Fallback)")
     def create_main_group_func(): print("Create Main Group (Fallback)")
     def get_scene_type(): return ("UNIDENTIFIED", [1.0, 0.4, 0.4])
+    def get_scene_context():
+        class _Context(object):
+            frame_range = (int(cmds.playbackOptions(query=True, minTime=True)),
+                           int(cmds.playbackOptions(query=True, maxTime=True)))
+        return _Context()
     VERSION = "PRUEBA"
+    def enable_master_redirect(): return False
 
+# Tiempos de cada accion de la UI (ver utils/profiling.py)
+try:
+    import profiling
+    timed = profiling.timed
+except ImportError as e:
+    print("PKL Pipeline Warning: Could not import profiling - {}".format(e))
+    def timed(name, **meta): return lambda func: func
 
 
+
+@timed('ui.check_scene')
 def CheckScene(*args): 
     
     if not security.validate_pinkooland_project():
@@ -171,18 +191,21 @@ def CheckScene(*args):
     
     check_model_func()
 
+@timed('ui.set_joints')
 def SetJoints(*args):
     if not security.validate_pinkooland_project():
             print("Access Denied: Incorrect Project.")
             return 
     set_joint_func()
     
+@timed('ui.create_main_group')
 def create_main_group(*args): 
     if not security.validate_pinkooland_project():
             print("Access Denied: Incorrect Project.")
             return
     create_main_group_func()
     
+@timed('ui.check_anim_scene')
 def check_anim_scene(*args):
     if not security.validate_pinkooland_project():
             print("Access Denied: Incorrect Project.")
@@ -190,12 +213,14 @@ def check_anim_scene(*args):
     print("Scene ready")
     check_animation_scene()
     
+@timed('ui.set_camera')
 def set_camera(*args): 
     if not security.validate_pinkooland_project():
             print("Access Denied: Incorrect Project.")
             return
     set_camera_func()
     
+@timed('ui.organize')
 def orgAnim(*args): 
     """Llama al script 2 del core"""
     if not security.validate_pinkooland_project():
@@ -203,6 +228,7 @@ def orgAnim(*args):
             return
     organize_animation()
     
+@timed('ui.check_errors')
 def Check_errors(*args): 
     if not security.validate_pinkooland_project():
             print("Access Denied: Incorrect Project.")
@@ -210,20 +236,37 @@ def Check_errors(*args):
     print("Errores")
     check_animation_scene()
     
+# Log de resultados del export (se llena mientras exporta cada grupo)
+EXPORT_LOG = "pkl_export_log"
+
+def clear_export_log():
+    if cmds.scrollField(EXPORT_LOG, exists=True):
+        cmds.scrollField(EXPORT_LOG, edit=True, clear=True)
+
+def log_export_result(line):
+    if cmds.scrollField(EXPORT_LOG, exists=True):
+        text = cmds.scrollField(EXPORT_LOG, query=True, text=True) or ""
+        cmds.scrollField(EXPORT_LOG, edit=True, text=text + line + "\n")
+
+@timed('ui.export_all')
 def export_all(*args): 
     if not security.validate_pinkooland_project():
             print("Access Denied: Incorrect Project.")
             return
-    export_all_func()
-    ue_cam_exporter()
+    # Skeletons + camara UE con un solo bake del timeline
+    clear_export_log()
+    export_all_func(on_result=log_export_result)
     
+@timed('ui.export_selected')
 def export_selected(*args):
     if not security.validate_pinkooland_project():
             print("Access Denied: Incorrect Project.")
             return
-    export_selected_func()
+    clear_export_log()
+    export_selected_func(on_result=log_export_result)
     
     
+@timed('ui.export_camera')
 def export_camera(*args):
     if not security.validate_pinkooland_project():
             print("Access Denied: Incorrect Project.")
@@ -312,9 +355,8 @@ class PKLPipelineUI(object):
         scene_type, type_color = get_scene_type()
 
         
-        start = cmds.playbackOptions(query=True, minTime=True)
-        end = cmds.playbackOptions(query=True, maxTime=True)
-        frame_range = "{0} - {1}".format(int(start), int(end))
+        start, end = get_scene_context().frame_range
+        frame_range = "{0} - {1}".format(start, end)
 
         
         cmds.text(self.type_label, edit=True, label=scene_type, backgroundColor=type_color)
@@ -469,6 +511,8 @@ class PKLPipelineUI(object):
         cmds.button(label="Export all", command=export_all)
         cmds.button(label="Export Selected Groups", command=export_selected)
         cmds.button(label="Export Camera", command=export_camera)
+        cmds.scrollField(EXPORT_LOG, editable=False, wordWrap=False, height=80,
+                         text="", font="smallFixedWidthFont")
         cmds.setParent("..")
         cmds.setParent("..")
 
@@ -546,6 +590,10 @@ def main():
     
     silent_check_update_on_startup()
     
+    # Las referencias CH_/PRP_ se cargan directo del _MASTER al abrir escenas
+    if enable_master_redirect():
+        print("PKL Pipeline: MASTER redirect on reference load enabled")
+    
     
     modules_to_reload = [
         'security',
@@ -556,6 +604,7 @@ def main():
         'camera_exporter',
         'camera_setter',
         'settings',
+        'naming',
         'helpers'
     ]
     
@@ -0,0 +1,615 @@
+# -*- coding: utf-8 -*-
+"""
+PKL Pipeline - cmds Tracer
+Registra las llamadas a maya.cmds / maya.mel de una operacion (opt-in)
+
+Mientras el tracer esta activo cada comando de maya.cmds y mel.eval pasa
+por un wrapper que cuenta llamadas por comando y por funcion que llama,
+mide el tiempo dentro del comando y escribe la secuencia completa (args,
+flags y resultado) a un .trace.gz (JSON lines comprimido). Del API se
+registra MSelectionList (lo que usa SceneIndex para leer atributos en
+bloque) y las lecturas del pipeline de TRACED_FUNCTIONS, como un evento
+cada una.
+
+Con PKL_TRACE=1 (o set_enabled(True)) cada operacion raiz de profiling
+deja un trace junto al log de tiempos. Tambien se puede usar directo:
+
+    with cmds_tracer.trace('organize.trace.gz', target='animation_organizer.organize_animation'):
+        organize_animation()
+
+Replay (sin Maya): corre la funcion otra vez contra un backend que
+responde cada comando con lo grabado y compara la cantidad de llamadas,
+para medir regresiones en animation_organizer, scene_exporter o
+check_anm_scn desde Linux:
+
+    python utils/cmds_tracer.py summary organize.trace.gz
+    python utils/cmds_tracer.py replay organize.trace.gz [--run modulo.funcion] [--max-increase 10]
+"""
+import argparse
+import gzip
+import json
+import numbers
+import os
+import sys
+import time
+import timeit
+import types
+from collections import deque
+
+TRACE_FORMAT = 'pkl-cmds-trace'
+TRACE_VERSION = 1
+TRACE_EXTENSION = '.trace.gz'
+
+# Tipos del API que se guardan para cada getDependNode (replay de hasFn)
+TRACKED_FN = ('kTransform', 'kJoint', 'kMesh', 'kCamera', 'kDagNode', 'kAnimCurve')
+
+# Funciones del pipeline que leen con el API y se graban como un solo
+# evento (modulo, funcion); el resultado tiene que ser serializable
+TRACED_FUNCTIONS = (
+    ('helpers', 'read_reference_nodes'),
+)
+
+# Respuesta grabada de un comando que lanzo una excepcion
+ERROR_KEY = '__error__'
+
+try:
+    string_types = (str, unicode)
+except NameError:
+    string_types = (str,)
+
+_enabled = os.environ.get('PKL_TRACE', '').lower() in ('1', 'true', 'yes')
+
+
+def is_enabled():
+    return _enabled
+
+
+def set_enabled(enabled=True):
+    """Activa/desactiva el trace automatico de las operaciones de profiling"""
+    global _enabled
+    _enabled = bool(enabled)
+
+
+def encode(value):
+    """Valor serializable y estable (tambien es la clave del replay)"""
+    if value is None or isinstance(value, (bool, numbers.Number) + string_types):
+        return value
+    if isinstance(value, (list, tuple)):
+        return [encode(item) for item in value]
+    if isinstance(value, dict):
+        return dict((str(key), encode(item)) for key, item in value.items())
+    if callable(value):
+        return {'__callable__': getattr(value, '__name__', type(value).__name__)}
+    return {'__repr__': repr(value)}
+
+
+def call_key(command, args, kwargs):
+    return command, json.dumps([args, kwargs], sort_keys=True)
+
+
+def _caller(frame):
+    """'modulo:funcion' del codigo que llamo al comando"""
+    module = os.path.splitext(os.path.basename(frame.f_code.co_filename))[0]
+    return '{}:{}'.format(module, frame.f_code.co_name)
+
+
+# ====== GRABACION ======
+
+class Tracer(object):
+    """
+    Envuelve maya.cmds, maya.mel y MSelectionList mientras esta activo
+
+    Attributes:
+        counts (dict): {comando: llamadas}
+        seconds (dict): {comando: segundos dentro del comando}
+        callers (dict): {(comando, 'modulo:funcion'): llamadas}
+    """
+
+    def __init__(self, path=None, op='', target=''):
+        self.path = path
+        self.op = op
+        self.target = target
+        self.counts = {}
+        self.seconds = {}
+        self.callers = {}
+        self._ids = {}
+        self._file = None
+        self._patched = []
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.stop()
+        return False
+
+    @property
+    def total_calls(self):
+        return sum(self.counts.values())
+
+    def start(self):
+        import maya.cmds as cmds
+        import maya.mel as mel
+        import maya.api.OpenMaya as om
+
+        if self.path:
+            self._file = gzip.open(self.path, 'wb')
+            self._write({
+                'format': TRACE_FORMAT,
+                'version': TRACE_VERSION,
+                'op': self.op,
+                'target': self.target,
+                'scene': cmds.file(query=True, sceneName=True) or '',
+                'date': time.strftime('%Y-%m-%d %H:%M:%S'),
+            })
+
+        for name in dir(cmds):
+            func = getattr(cmds, name)
+            if not name.startswith('_') and callable(func):
+                self._patch(cmds, name, self._wrap(name, func))
+        self._patch(mel, 'eval', self._wrap('mel.eval', mel.eval))
+        self._patch(om, 'MSelectionList', _traced_selection_list(self, om))
+
+        for module_name, func_name in TRACED_FUNCTIONS:
+            module = sys.modules.get(module_name)
+            if module is not None and hasattr(module, func_name):
+                self._patch(module, func_name, self._wrap(
+                    '{}.{}'.format(module_name, func_name), getattr(module, func_name)))
+
+    def stop(self):
+        for module, name, original in reversed(self._patched):
+            setattr(module, name, original)
+        self._patched = []
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _patch(self, module, name, replacement):
+        self._patched.append((module, name, getattr(module, name)))
+        setattr(module, name, replacement)
+
+    def _wrap(self, command, func):
+        tracer = self
+
+        def wrapper(*args, **kwargs):
+            caller = _caller(sys._getframe(1))
+            start = timeit.default_timer()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                tracer.record(command, caller, timeit.default_timer() - start, args, kwargs,
+                              {ERROR_KEY: type(e).__name__, 'message': str(e)})
+                raise
+            tracer.record(command, caller, timeit.default_timer() - start, args, kwargs, result)
+            return result
+
+        wrapper.__name__ = command.split('.')[-1]
+        return wrapper
+
+    def record(self, command, caller, seconds, args, kwargs, result):
+        """Cuenta la llamada y la agrega al trace"""
+        self.counts[command] = self.counts.get(command, 0) + 1
+        self.seconds[command] = self.seconds.get(command, 0.0) + seconds
+        key = (command, caller)
+        self.callers[key] = self.callers.get(key, 0) + 1
+
+        if self._file is not None:
+            self._write([self._id(command), self._id(caller), int(seconds * 1000000),
+                         encode(list(args)), encode(kwargs), encode(result)])
+
+    def _id(self, text):
+        """Tabla de strings: cada nombre se escribe una sola vez"""
+        text_id = self._ids.get(text)
+        if text_id is None:
+            text_id = self._ids[text] = len(self._ids)
+            self._write(['=', text_id, text])
+        return text_id
+
+    def _write(self, data):
+        line = json.dumps(data, separators=(',', ':')) + '\n'
+        self._file.write(line.encode('utf-8'))
+
+
+def _traced_selection_list(tracer, om):
+    """
+    MSelectionList que delega en el real y registra lo que se lee de cada
+    item (por nombre del item, no por indice) para poder responderlo en el replay
+    """
+    real_class = om.MSelectionList
+
+    def traced_api(method, item, func, describe):
+        caller = _caller(sys._getframe(2))
+        start = timeit.default_timer()
+        try:
+            value = func()
+        except Exception as e:
+            tracer.record(method, caller, timeit.default_timer() - start, [item], {},
+                          {ERROR_KEY: type(e).__name__, 'message': str(e)})
+            raise
+        tracer.record(method, caller, timeit.default_timer() - start, [item], {}, describe(value))
+        return value
+
+    class TracedSelectionList(object):
+        def __init__(self, *args):
+            self._real = real_class(*args)
+            self._items = []
+
+        def __getattr__(self, name):
+            return getattr(self._real, name)
+
+        def add(self, item, *args):
+            item = encode(item)
+            traced_api('om.MSelectionList.add', item,
+                       lambda: self._real.add(item, *args), lambda value: None)
+            self._items.append(item)
+            return self
+
+        def length(self):
+            return self._real.length()
+
+        def getDependNode(self, i):
+            return traced_api('om.MSelectionList.getDependNode', self._items[i],
+                              lambda: self._real.getDependNode(i),
+                              lambda obj: dict((fn, obj.hasFn(getattr(om.MFn, fn)))
+                                               for fn in TRACKED_FN if hasattr(om.MFn, fn)))
+
+        def getDagPath(self, i):
+            return traced_api('om.MSelectionList.getDagPath', self._items[i],
+                              lambda: self._real.getDagPath(i),
+                              lambda path: {'fullPathName': path.fullPathName(),
+                                            'partialPathName': path.partialPathName()})
+
+        def getPlug(self, i):
+            return traced_api('om.MSelectionList.getPlug', self._items[i],
+                              lambda: self._real.getPlug(i), _describe_plug)
+
+    return TracedSelectionList
+
+
+def _describe_plug(plug):
+    described = {'name': plug.name()}
+    for method in ('asString', 'asBool'):
+        try:
+            described[method] = encode(getattr(plug, method)())
+        except RuntimeError as e:
+            described[method] = {ERROR_KEY: 'RuntimeError', 'message': str(e)}
+    return described
+
+
+def trace(path, op='', target=''):
+    """with trace('x.trace.gz', target='modulo.funcion'): ..."""
+    return Tracer(path, op=op, target=target)
+
+
+# ====== LECTURA ======
+
+def load_trace(path):
+    """
+    Returns:
+        tuple: (header, [(comando, caller, segundos, args, kwargs, resultado), ...])
+    """
+    header = None
+    names = {}
+    events = []
+    with gzip.open(path, 'rb') as f:
+        for raw in f:
+            data = json.loads(raw.decode('utf-8'))
+            if header is None:
+                if not isinstance(data, dict) or data.get('format') != TRACE_FORMAT:
+                    raise ValueError('Not a cmds trace: {}'.format(path))
+                header = data
+            elif data[0] == '=':
+                names[data[1]] = data[2]
+            else:
+                command_id, caller_id, micros, args, kwargs, result = data
+                events.append((names[command_id], names[caller_id], micros / 1000000.0,
+                               args, kwargs, result))
+    return header or {}, events
+
+
+def summarize(events):
+    """{comando: {'calls', 'seconds', 'callers': {caller: calls}}}"""
+    summary = {}
+    for command, caller, seconds, args, kwargs, result in events:
+        entry = summary.setdefault(command, {'calls': 0, 'seconds': 0.0, 'callers': {}})
+        entry['calls'] += 1
+        entry['seconds'] += seconds
+        entry['callers'][caller] = entry['callers'].get(caller, 0) + 1
+    return summary
+
+
+def print_summary(summary, limit=30):
+    rows = sorted(summary.items(), key=lambda item: item[1]['seconds'], reverse=True)
+    print("{:<36} {:>9} {:>10}  {}".format('Command', 'Calls', 'Seconds', 'Top caller'))
+    for command, entry in rows[:limit]:
+        caller, calls = max(entry['callers'].items(), key=lambda item: item[1])
+        print("{:<36} {:>9,} {:>10.3f}  {} ({:,})".format(
+            command, entry['calls'], entry['seconds'], caller, calls))
+    print("\nTotal: {:,} calls, {:.3f}s inside commands".format(
+        sum(entry['calls'] for entry in summary.values()),
+        sum(entry['seconds'] for entry in summary.values())))
+
+
+# ====== REPLAY ======
+
+def _raise_recorded(result):
+    """Relanza la excepcion grabada (RuntimeError si el tipo no es builtin)"""
+    try:
+        import builtins
+    except ImportError:
+        import __builtin__ as builtins
+    error_class = getattr(builtins, result[ERROR_KEY], RuntimeError)
+    if not (isinstance(error_class, type) and issubclass(error_class, Exception)):
+        error_class = RuntimeError
+    raise error_class(result.get('message', ''))
+
+
+def _is_error(result):
+    return isinstance(result, dict) and ERROR_KEY in result
+
+
+class ReplayBackend(object):
+    """
+    Responde cada comando con la respuesta grabada para los mismos args y
+    flags (en orden; cuando se acaban repite la ultima). Los comandos que
+    no estaban en el trace devuelven None y se cuentan en unmatched.
+    """
+
+    def __init__(self, events):
+        self._answers = {}
+        for command, caller, seconds, args, kwargs, result in events:
+            self._answers.setdefault(call_key(command, args, kwargs), deque()).append(result)
+        self.counts = {}
+        self.callers = {}
+        self.unmatched = {}
+
+    def call(self, command, args, kwargs, caller=''):
+        self.counts[command] = self.counts.get(command, 0) + 1
+        key = (command, caller)
+        self.callers[key] = self.callers.get(key, 0) + 1
+
+        answers = self._answers.get(call_key(command, encode(list(args)), encode(kwargs)))
+        if not answers:
+            self.unmatched[command] = self.unmatched.get(command, 0) + 1
+            return None
+
+        result = answers.popleft() if len(answers) > 1 else answers[0]
+        if _is_error(result):
+            _raise_recorded(result)
+        return result
+
+    def command(self, command):
+        backend = self
+
+        def replayed(*args, **kwargs):
+            return backend.call(command, args, kwargs, _caller(sys._getframe(1)))
+
+        replayed.__name__ = command.split('.')[-1]
+        return replayed
+
+
+class _ReplayModule(types.ModuleType):
+    """Modulo cuyos atributos son comandos del backend (maya.cmds / maya.mel)"""
+
+    def __init__(self, name, backend, prefix=''):
+        types.ModuleType.__init__(self, name)
+        self._backend = backend
+        self._prefix = prefix
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        func = self._backend.command(self._prefix + name)
+        setattr(self, name, func)
+        return func
+
+
+class _ReplayValue(object):
+    """MObject / MDagPath / MPlug del replay: responde con lo grabado"""
+
+    def __init__(self, answer):
+        self._answer = answer or {}
+
+    def _get(self, name):
+        value = self._answer.get(name)
+        if _is_error(value):
+            _raise_recorded(value)
+        return value
+
+    def hasFn(self, fn):
+        return bool(self._get(fn))
+
+    def fullPathName(self):
+        return self._get('fullPathName')
+
+    def partialPathName(self):
+        return self._get('partialPathName')
+
+    def name(self):
+        return self._get('name')
+
+    def asString(self):
+        return self._get('asString')
+
+    def asBool(self):
+        return bool(self._get('asBool'))
+
+
+class _FnNames(object):
+    """om.MFn del replay: om.MFn.kTransform == 'kTransform'"""
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        return name
+
+
+def _replay_open_maya(backend):
+    om = types.ModuleType('maya.api.OpenMaya')
+
+    class MSelectionList(object):
+        def __init__(self):
+            self._items = []
+
+        def _call(self, method, i):
+            return backend.call('om.MSelectionList.' + method, [self._items[i]], {},
+                                _caller(sys._getframe(2)))
+
+        def add(self, item):
+            backend.call('om.MSelectionList.add', [encode(item)], {}, _caller(sys._getframe(1)))
+            self._items.append(encode(item))
+            return self
+
+        def length(self):
+            return len(self._items)
+
+        def getDependNode(self, i):
+            return _ReplayValue(self._call('getDependNode', i))
+
+        def getDagPath(self, i):
+            return _ReplayValue(self._call('getDagPath', i))
+
+        def getPlug(self, i):
+            return _ReplayValue(self._call('getPlug', i))
+
+    class MSceneMessage(object):
+        """Los callbacks se aceptan pero nunca se llaman (la escena no cambia)"""
+
+        def __getattr__(self, name):
+            if name.startswith('__'):
+                raise AttributeError(name)
+            return name
+
+        def addCallback(self, message, func, *args):
+            return 0
+
+    class MMessage(object):
+        @staticmethod
+        def removeCallbacks(callback_ids):
+            pass
+
+    om.MSelectionList = MSelectionList
+    om.MFn = _FnNames()
+    om.MSceneMessage = MSceneMessage()
+    om.MMessage = MMessage
+    return om
+
+
+def install_replay(backend):
+    """Registra maya, maya.cmds, maya.mel y maya.api.OpenMaya del replay"""
+    maya = types.ModuleType('maya')
+    maya_api = types.ModuleType('maya.api')
+    maya.cmds = _ReplayModule('maya.cmds', backend)
+    maya.mel = _ReplayModule('maya.mel', backend, prefix='mel.')
+    maya.api = maya_api
+    maya_api.OpenMaya = _replay_open_maya(backend)
+
+    sys.modules['maya'] = maya
+    sys.modules['maya.cmds'] = maya.cmds
+    sys.modules['maya.mel'] = maya.mel
+    sys.modules['maya.api'] = maya_api
+    sys.modules['maya.api.OpenMaya'] = maya_api.OpenMaya
+
+
+def replay(path, target=None):
+    """
+    Corre target ('modulo.funcion', por defecto el del header) contra el trace
+
+    Returns:
+        dict: {'header', 'recorded': {comando: llamadas},
+               'replayed': {comando: llamadas}, 'unmatched': {comando: llamadas}}
+    """
+    header, events = load_trace(path)
+    target = target or header.get('target')
+    if not target or '.' not in target:
+        raise ValueError('No replay target in the trace header - use --run module.function')
+
+    backend = ReplayBackend(events)
+    install_replay(backend)
+
+    pipeline_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    for sub_dir in ('utils', 'config', 'core'):
+        sub_path = os.path.join(pipeline_dir, sub_dir)
+        if sub_path not in sys.path:
+            sys.path.insert(0, sub_path)
+
+    for traced_module, traced_func in TRACED_FUNCTIONS:
+        setattr(__import__(traced_module), traced_func,
+                backend.command('{}.{}'.format(traced_module, traced_func)))
+
+    module_name, func_name = target.rsplit('.', 1)
+    func = getattr(__import__(module_name), func_name)
+    error = None
+    try:
+        func()
+    except Exception as e:
+        error = '{}: {}'.format(type(e).__name__, e)
+
+    recorded = dict((command, entry['calls']) for command, entry in summarize(events).items())
+    return {
+        'header': header,
+        'target': target,
+        'recorded': recorded,
+        'replayed': backend.counts,
+        'unmatched': backend.unmatched,
+        'error': error,
+    }
+
+
+def print_replay(result):
+    recorded = result['recorded']
+    replayed = result['replayed']
+    print("Replay of {} ({})\n".format(result['target'], result['header'].get('scene') or 'unsaved'))
+    print("{:<36} {:>10} {:>10} {:>8}".format('Command', 'Recorded', 'Replayed', 'Delta'))
+    commands = sorted(set(recorded) | set(replayed),
+                      key=lambda command: abs(replayed.get(command, 0) - recorded.get(command, 0)),
+                      reverse=True)
+    for command in commands:
+        delta = replayed.get(command, 0) - recorded.get(command, 0)
+        print("{:<36} {:>10,} {:>10,} {:>+8,}".format(
+            command, recorded.get(command, 0), replayed.get(command, 0), delta))
+    print("\nTotal: {:,} -> {:,} calls".format(sum(recorded.values()), sum(replayed.values())))
+    if result['unmatched']:
+        print("Not in the trace (answered None): {}".format(', '.join(
+            '{} x{}'.format(command, calls) for command, calls in sorted(result['unmatched'].items()))))
+    if result['error']:
+        print("Replay stopped with {}".format(result['error']))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='PKL Pipeline cmds trace')
+    sub = parser.add_subparsers(dest='command')
+    summary_parser = sub.add_parser('summary', help='Calls and time per command')
+    summary_parser.add_argument('trace')
+    summary_parser.add_argument('--limit', type=int, default=30)
+    replay_parser = sub.add_parser('replay', help='Run the code again against the trace')
+    replay_parser.add_argument('trace')
+    replay_parser.add_argument('--run', help='module.function (default: target in the trace)')
+    replay_parser.add_argument('--max-increase', type=float,
+                               help='Fail if total calls grow more than this percent')
+    args = parser.parse_args(argv)
+
+    if args.command == 'summary':
+        header, events = load_trace(args.trace)
+        print("{} - {}\n".format(header.get('op') or header.get('target'), header.get('scene')))
+        print_summary(summarize(events), args.limit)
+        return 0
+
+    if args.command == 'replay':
+        result = replay(args.trace, args.run)
+        print_replay(result)
+        if args.max_increase is not None:
+            before = sum(result['recorded'].values())
+            after = sum(result['replayed'].values())
+            if after > before * (1 + args.max_increase / 100.0):
+                print("\n[REGRESSION] Calls grew more than {}%".format(args.max_increase))
+                return 1
+        return 1 if result['error'] else 0
+
+    parser.print_help()
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,370 @@
+# -*- coding: utf-8 -*-
+"""
+PKL Pipeline - Export Manifest
+Manifest sidecar de los FBX exportados (exportacion incremental)
+
+Cada carpeta de exportacion tiene un .pkl_export.json con el fingerprint
+de cada FBX que se exporto ahi. Si el fingerprint actual es igual al
+guardado y el FBX sigue existiendo, no hace falta exportarlo otra vez.
+No depende de Maya.
+
+Ejemplo:
+    parts = {'curves': digest(curve_data), 'frame_range': [1001, 1100], ...}
+    up_to_date, changed = check(fbx_path, parts)
+    if not up_to_date:
+        ...exportar...
+        record(fbx_path, parts, scene=scene_path)
+
+Ademas cada shot tiene un export_manifest.json legible por el importer de
+Unreal (ver MANIFEST DEL SHOT).
+"""
+import errno
+import hashlib
+import json
+import os
+import threading
+import time
+from multiprocessing.pool import ThreadPool
+
+import fs_probe
+
+MANIFEST_NAME = '.pkl_export.json'
+MANIFEST_VERSION = 1
+
+# Mensaje de los exporters cuando el archivo no cambio desde el ultimo export
+UP_TO_DATE = 'Up to date'
+
+# Bloques de lectura al calcular hashes (bytes)
+HASH_CHUNK_SIZE = 4 * 1024 * 1024
+
+# record() se puede llamar desde los threads de export_publisher
+_record_lock = threading.Lock()
+
+
+# ====== FINGERPRINT ======
+
+def digest(values):
+    """sha1 de una secuencia de valores (listas, floats, strings...)"""
+    sha = hashlib.sha1()
+    for value in values:
+        sha.update(repr(value).encode('utf-8'))
+        sha.update(b'\0')
+    return sha.hexdigest()
+
+
+def fingerprint(parts):
+    """
+    Fingerprint de una exportacion a partir de sus partes
+
+    Args:
+        parts (dict): {nombre: valor serializable a JSON}
+    """
+    data = json.dumps(parts, sort_keys=True)
+    return hashlib.sha1(data.encode('utf-8')).hexdigest()
+
+
+# ====== MANIFEST ======
+
+def manifest_path(export_dir):
+    return os.path.join(export_dir, MANIFEST_NAME)
+
+
+def load(export_dir):
+    """
+    Lee el manifest de una carpeta
+
+    Returns:
+        dict: {nombre del fbx: entrada} (vacio si no existe o esta corrupto)
+    """
+    path = manifest_path(export_dir)
+
+    # Sin fs_probe: otro proceso pudo escribirlo hace menos de PROBE_TTL
+    try:
+        with open(path, 'r') as f:
+            data = json.load(f)
+    except (IOError, OSError, ValueError) as e:
+        if getattr(e, 'errno', None) != errno.ENOENT:
+            print("Warning: Could not read export manifest {} - {}".format(path, e))
+        return {}
+
+    if data.get('version') != MANIFEST_VERSION:
+        return {}
+    return data.get('exports', {})
+
+
+def replace_file(src, dst):
+    """
+    Reemplaza dst por src en un solo paso: quien lee dst ve el archivo
+    viejo o el nuevo, nunca ninguno
+    """
+    if hasattr(os, 'replace'):
+        os.replace(src, dst)
+    elif os.name != 'nt':
+        # Python 2 en POSIX: rename pisa el destino de forma atomica
+        os.rename(src, dst)
+    else:
+        # Python 2 en Windows: rename no pisa archivos
+        if os.path.exists(dst):
+            os.remove(dst)
+        os.rename(src, dst)
+
+
+def _save_json(path, data):
+    """Escribe un JSON de forma atomica (tmp + replace)"""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+    replace_file(tmp_path, path)
+    fs_probe.invalidate(path)
+
+
+def save(export_dir, exports):
+    """Escribe el manifest de forma atomica (tmp + replace)"""
+    _save_json(manifest_path(export_dir), {'version': MANIFEST_VERSION, 'exports': exports})
+
+
+def check(fbx_path, parts):
+    """
+    Compara el fingerprint actual con el del ultimo export
+
+    Returns:
+        tuple: (up_to_date, changed) - changed es la lista de partes que
+               cambiaron (['fbx'] si el archivo no existe, ['new'] si
+               nunca se exporto)
+    """
+    if not fs_probe.exists(fbx_path):
+        return False, ['fbx']
+
+    export_dir, fbx_name = os.path.split(fbx_path)
+    entry = load(export_dir).get(fbx_name)
+    if not entry:
+        return False, ['new']
+
+    if entry.get('fingerprint') == fingerprint(parts):
+        return True, []
+
+    # Normalizar (tuplas -> listas) para comparar con lo que se leyo del JSON
+    parts = json.loads(json.dumps(parts))
+    old_parts = entry.get('parts', {})
+    changed = sorted(key for key in set(parts) | set(old_parts)
+                     if parts.get(key) != old_parts.get(key))
+    return False, changed
+
+
+def record(fbx_path, parts, **info):
+    """
+    Guarda el fingerprint de un FBX recien exportado
+
+    Args:
+        fbx_path (str): Path del FBX
+        parts (dict): Partes del fingerprint
+        **info: Datos extra para la entrada (scene, skeleton...)
+    """
+    export_dir, fbx_name = os.path.split(fbx_path)
+
+    entry = dict(info)
+    entry['fingerprint'] = fingerprint(parts)
+    entry['parts'] = parts
+    entry['exported'] = time.strftime('%Y-%m-%d %H:%M:%S')
+
+    with _record_lock:
+        exports = load(export_dir)
+        exports[fbx_name] = entry
+        try:
+            save(export_dir, exports)
+        except (IOError, OSError) as e:
+            print("Warning: Could not write export manifest in {} - {}".format(export_dir, e))
+
+
+# ====== MANIFEST DEL SHOT (UNREAL) ======
+#
+# <carpeta del shot>/export_manifest.json: una entrada por FBX del shot
+# (skeletons y camara) con su hash de contenido. El importer de Unreal
+# guarda el hash que importo de cada entrada y solo reimporta las que
+# cambiaron:
+#
+#     import export_manifest
+#     for entry in export_manifest.entries_to_reimport(manifest_file):
+#         ...importar entry['fbx_path']...
+#     export_manifest.mark_imported(manifest_file, entries)
+
+SHOT_MANIFEST_NAME = 'export_manifest.json'
+SHOT_MANIFEST_VERSION = 1
+
+# Estado del lado de Unreal: {target: hash importado}
+IMPORTED_SUFFIX = '.imported.json'
+
+# Threads para calcular hashes de FBX
+HASH_WORKERS = 4
+
+
+def shot_manifest_path(shot_dir):
+    return os.path.join(shot_dir, SHOT_MANIFEST_NAME).replace('\\', '/')
+
+
+def file_hash(path):
+    """sha1 del contenido de un archivo (None si no se puede leer)"""
+    sha = hashlib.sha1()
+    try:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+                sha.update(chunk)
+    except (IOError, OSError):
+        return None
+    return sha.hexdigest()
+
+
+def hash_files(paths, workers=HASH_WORKERS):
+    """
+    Hashes de varios archivos en un pool de threads
+
+    Returns:
+        dict: {path: sha1 o None}
+    """
+    paths = list(set(paths))
+    if not paths:
+        return {}
+
+    pool = ThreadPool(min(workers, len(paths)))
+    try:
+        hashes = pool.map(file_hash, paths)
+    finally:
+        pool.close()
+        pool.join()
+    return dict(zip(paths, hashes))
+
+
+def shot_entry(target, fbx_path, frame_range, preset_hash, scene, kind='skeleton',
+               status='exported', content_hash=None, size=None):
+    """
+    Entrada del manifest del shot
+
+    Args:
+        target: Nombre del target en Unreal (ExportedName)
+        fbx_path: Path del FBX publicado
+        frame_range: (start, end)
+        preset_hash: fbx_presets.preset_hash() del preset usado
+        scene: Escena de origen
+        kind: 'skeleton' o 'camera'
+        status: 'exported' o 'unchanged' (no se volvio a exportar)
+        content_hash: sha1 del FBX si ya se conoce (si no, se calcula al
+                      escribir el manifest)
+        size: Bytes del FBX si ya se conoce
+    """
+    return {
+        'target': target,
+        'kind': kind,
+        'fbx_path': fbx_path,
+        'size': size,
+        'hash': content_hash,
+        'frame_range': list(frame_range),
+        'preset_hash': preset_hash,
+        'scene': scene,
+        'status': status,
+    }
+
+
+def load_shot_manifest(path):
+    """
+    {target: entrada} del manifest del shot (vacio si no existe)
+
+    Lo lee el importer de Unreal (un proceso que dura mucho): se abre
+    directo, sin el cache de fs_probe.
+    """
+    try:
+        with open(path, 'r') as f:
+            data = json.load(f)
+    except (IOError, OSError, ValueError) as e:
+        if getattr(e, 'errno', None) != errno.ENOENT:
+            print("Warning: Could not read shot manifest {} - {}".format(path, e))
+        return {}
+
+    if data.get('version') != SHOT_MANIFEST_VERSION:
+        return {}
+    return data.get('entries', {})
+
+
+def write_shot_manifest(shot_dir, entries):
+    """
+    Agrega las entradas de este export al manifest del shot
+
+    Las entradas 'unchanged' sin hash reusan el del manifest anterior (el
+    archivo no se volvio a escribir); solo los hashes que siguen faltando
+    se calculan, en paralelo, leyendo el archivo. Marca 'changed' en las
+    entradas cuyo hash es distinto al del manifest anterior. Las entradas
+    de targets que no se exportaron en esta corrida se conservan.
+
+    Returns:
+        str: Path del manifest escrito (None si no se pudo escribir)
+    """
+    path = shot_manifest_path(shot_dir)
+    previous = load_shot_manifest(path)
+
+    entries = [dict(entry) for entry in entries]
+    for entry in entries:
+        old = previous.get(entry['target'], {})
+        if (not entry['hash'] and entry['status'] == 'unchanged'
+                and old.get('fbx_path') == entry['fbx_path']):
+            entry['hash'] = old.get('hash')
+            if entry['size'] is None:
+                entry['size'] = old.get('size')
+
+    hashes = hash_files([entry['fbx_path'] for entry in entries if not entry['hash']])
+    now = time.strftime('%Y-%m-%d %H:%M:%S')
+
+    merged = dict(previous)
+    for entry in entries:
+        if not entry['hash']:
+            entry['hash'] = hashes.get(entry['fbx_path'])
+        if entry['size'] is None:
+            entry['size'] = fs_probe.size(entry['fbx_path'])
+
+        old = previous.get(entry['target'], {})
+        entry['previous_hash'] = old.get('hash')
+        entry['changed'] = entry['hash'] != old.get('hash')
+        # Sin cambios se conserva la fecha del export que genero el archivo
+        entry['timestamp'] = now if entry['changed'] else old.get('timestamp', now)
+        merged[entry['target']] = entry
+
+    try:
+        fs_probe.makedirs(shot_dir)
+        _save_json(path, {'version': SHOT_MANIFEST_VERSION, 'updated': now, 'entries': merged})
+    except (IOError, OSError) as e:
+        print("Warning: Could not write shot manifest {} - {}".format(path, e))
+        return None
+    return path
+
+
+def _imported_path(manifest_file):
+    return os.path.splitext(manifest_file)[0] + IMPORTED_SUFFIX
+
+
+def _load_imported(manifest_file):
+    """{target: hash} que importo Unreal (vacio si no existe)"""
+    imported_file = _imported_path(manifest_file)
+    if not os.path.exists(imported_file):
+        return {}
+    try:
+        with open(imported_file, 'r') as f:
+            return json.load(f)
+    except (IOError, OSError, ValueError):
+        return {}
+
+
+def entries_to_reimport(manifest_file):
+    """
+    Entradas del manifest cuyo hash no es el que Unreal importo la ultima vez
+
+    No depende de Maya: se puede usar desde el Python de Unreal.
+    """
+    imported = _load_imported(manifest_file)
+    return [entry for target, entry in sorted(load_shot_manifest(manifest_file).items())
+            if entry.get('hash') and imported.get(target) != entry['hash']]
+
+
+def mark_imported(manifest_file, entries):
+    """Guarda el hash de las entradas que Unreal termino de importar"""
+    imported = _load_imported(manifest_file)
+    for entry in entries:
+        imported[entry['target']] = entry['hash']
+    _save_json(_imported_path(manifest_file), imported)
@@ -0,0 +1,252 @@
+# -*- coding: utf-8 -*-
+"""
+PKL Pipeline - Export Publisher
+Exportacion en etapas: escribir en scratch local y publicar al share en
+segundo plano
+
+Maya escribe el FBX en un disco local rapido (scratch). Un pool de threads
+copia el archivo al destino (share de red) verificando el checksum, asi
+Maya puede seguir con el siguiente export mientras se sube el anterior.
+
+Los threads no tocan maya.cmds: solo hacen IO de archivos.
+
+Uso:
+    local_path = scratch_path(fbx_path)
+    mel.eval('FBXExport -f "{}" -s;'.format(local_path))
+    job = get_publisher().publish(local_path, fbx_path)
+    ...siguiente export...
+    result = job.wait()      # PublishResult(success, dest_path, checksum, ...)
+
+Scratch: $PKL_EXPORT_SCRATCH o <temp>/pkl_export_scratch
+"""
+import hashlib
+import itertools
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import namedtuple
+from multiprocessing.pool import ThreadPool
+
+import export_manifest
+import fs_probe
+
+# Threads que suben archivos al share
+PUBLISH_WORKERS = 4
+
+# Reintentos por archivo si falla la copia o el checksum
+PUBLISH_RETRIES = 2
+
+# Bloques de lectura/escritura (bytes)
+CHUNK_SIZE = 4 * 1024 * 1024
+
+PublishResult = namedtuple('PublishResult', [
+    'success', 'local_path', 'dest_path', 'checksum', 'size', 'error', 'duration'
+])
+
+_scratch_counter = itertools.count()
+_publisher = None
+_publisher_lock = threading.Lock()
+
+
+# ====== SCRATCH LOCAL ======
+
+def scratch_root():
+    """Carpeta local donde Maya escribe los FBX antes de publicarlos"""
+    root = os.environ.get('PKL_EXPORT_SCRATCH') or os.path.join(
+        tempfile.gettempdir(), 'pkl_export_scratch')
+    return root.replace('\\', '/')
+
+
+def scratch_path(dest_path):
+    """
+    Path local unico para un archivo de destino (mismo nombre de archivo)
+
+    <scratch>/<pid>_<n>/<nombre>.fbx
+    """
+    job_dir = os.path.join(scratch_root(), '{}_{}'.format(os.getpid(), next(_scratch_counter)))
+    if not os.path.exists(job_dir):
+        os.makedirs(job_dir)
+    return os.path.join(job_dir, os.path.basename(dest_path)).replace('\\', '/')
+
+
+def verify_local(local_path):
+    """True si el archivo local existe y no esta vacio"""
+    return os.path.isfile(local_path) and os.path.getsize(local_path) > 0
+
+
+def check_writable(dest_dir):
+    """
+    Verifica (sin crear nada) que se pueda publicar en dest_dir
+
+    Si la carpeta no existe se revisa el primer directorio existente hacia
+    arriba: el publisher crea las carpetas que faltan.
+
+    Returns:
+        tuple: (ok, motivo si no se puede)
+    """
+    path = os.path.abspath(dest_dir)
+    while not os.path.exists(path):
+        parent = os.path.dirname(path)
+        if parent == path:
+            return False, "No existing parent directory"
+        path = parent
+
+    if not os.path.isdir(path):
+        return False, "{} is a file".format(path)
+    if not os.access(path, os.W_OK):
+        return False, "No write permission on {}".format(path)
+    return True, None
+
+
+def file_checksum(path):
+    """sha1 de un archivo"""
+    sha = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def _copy_with_checksum(src, dst):
+    """Copia src -> dst y devuelve (sha1, bytes) de lo que se leyo"""
+    sha = hashlib.sha1()
+    size = 0
+    with open(src, 'rb') as f_in:
+        with open(dst, 'wb') as f_out:
+            for chunk in iter(lambda: f_in.read(CHUNK_SIZE), b''):
+                sha.update(chunk)
+                f_out.write(chunk)
+                size += len(chunk)
+    return sha.hexdigest(), size
+
+
+def _remove_scratch(local_path):
+    """Borra el archivo local y su carpeta de job"""
+    job_dir = os.path.dirname(local_path)
+    if os.path.dirname(job_dir).replace('\\', '/') == scratch_root():
+        shutil.rmtree(job_dir, ignore_errors=True)
+    elif os.path.exists(local_path):
+        os.remove(local_path)
+
+
+# ====== PUBLICACION ======
+
+def publish_file(local_path, dest_path, retries=PUBLISH_RETRIES, on_success=None):
+    """
+    Copia un archivo local al destino verificando el checksum
+
+    Se copia a <dest>.part, se vuelve a leer para comparar el sha1 y
+    recien ahi se renombra al nombre final. Si todo sale bien se borra el
+    archivo local; si falla se deja para revisarlo.
+
+    Args:
+        local_path: Archivo en scratch
+        dest_path: Path final (share)
+        retries: Reintentos si falla la copia o el checksum
+        on_success: Funcion(result) a llamar despues de publicar (en el
+                    thread del pool: no usar maya.cmds)
+
+    Returns:
+        PublishResult
+    """
+    start = time.time()
+    error = None
+    part_path = dest_path + '.part'
+
+    for attempt in range(retries + 1):
+        try:
+            dest_dir = os.path.dirname(dest_path)
+            if dest_dir:
+                fs_probe.makedirs(dest_dir)
+
+            checksum, size = _copy_with_checksum(local_path, part_path)
+            if file_checksum(part_path) != checksum:
+                raise IOError("Checksum mismatch after copy")
+
+            # Un solo paso: quien lee el share ve el archivo viejo o el nuevo
+            export_manifest.replace_file(part_path, dest_path)
+            fs_probe.invalidate(dest_path)
+
+        except Exception as e:
+            error = "{} (attempt {})".format(e, attempt + 1)
+            # El reintento vuelve a mirar el share, no el cache
+            fs_probe.invalidate(dest_path)
+            fs_probe.invalidate(os.path.dirname(dest_path))
+            if os.path.exists(part_path):
+                try:
+                    os.remove(part_path)
+                except OSError:
+                    pass
+            time.sleep(0.5 * (attempt + 1))
+            continue
+
+        result = PublishResult(True, local_path, dest_path, checksum, size,
+                               None, time.time() - start)
+        if on_success:
+            try:
+                on_success(result)
+            except Exception as e:
+                # El archivo ya esta publicado: solo se reporta
+                result = result._replace(error="on_success failed: {}".format(e))
+        _remove_scratch(local_path)
+        return result
+
+    return PublishResult(False, local_path, dest_path, None, None, error, time.time() - start)
+
+
+class PublishJob(object):
+    """Publicacion en curso (resultado de Publisher.publish)"""
+
+    def __init__(self, local_path, dest_path, async_result):
+        self.local_path = local_path
+        self.dest_path = dest_path
+        self._async_result = async_result
+
+    def ready(self):
+        return self._async_result.ready()
+
+    def wait(self, timeout=None):
+        """Espera a que termine y devuelve el PublishResult"""
+        try:
+            return self._async_result.get(timeout)
+        except Exception as e:
+            return PublishResult(False, self.local_path, self.dest_path, None, None,
+                                 str(e), None)
+
+
+class Publisher(object):
+    """Pool de threads que publica archivos del scratch al share"""
+
+    def __init__(self, workers=PUBLISH_WORKERS):
+        self.workers = workers
+        self._pool = ThreadPool(workers)
+        self._jobs = []
+
+    def publish(self, local_path, dest_path, on_success=None):
+        """Encola la publicacion y vuelve inmediatamente"""
+        async_result = self._pool.apply_async(
+            publish_file, (local_path, dest_path), {'on_success': on_success})
+        job = PublishJob(local_path, dest_path, async_result)
+        self._jobs.append(job)
+        return job
+
+    def pending(self):
+        """Publicaciones que todavia no terminaron"""
+        self._jobs = [job for job in self._jobs if not job.ready()]
+        return list(self._jobs)
+
+    def wait_all(self, timeout=None):
+        """Espera todas las publicaciones encoladas y devuelve sus resultados"""
+        jobs, self._jobs = self._jobs, []
+        return [job.wait(timeout) for job in jobs]
+
+
+def get_publisher():
+    """Publisher compartido de la sesion"""
+    global _publisher
+    with _publisher_lock:
+        if _publisher is None:
+            _publisher = Publisher()
+        return _publisher
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""
+PKL Pipeline - FBX Presets
+Presets de exportacion FBX declarados como datos
+
+Cada preset se aplica con un solo mel.eval (FBXResetExport + todas las
+opciones) y solo si el preset o el rango de frames cambiaron desde la
+ultima vez. preset_hash() identifica las opciones de un preset para los
+manifests de exportacion.
+
+Presets:
+    skeleton  Grupos de Export All y Export Selected (export_engine):
+              skins, shapes, constraints...
+    camera    Camara UE (camera_exporter): sin skins ni luces, resample
+"""
+import hashlib
+
+try:
+    import maya.mel as mel
+except ImportError:
+    # Sin Maya: solo se pueden consultar presets y hashes
+    mel = None
+
+
+# (comando, valor) en el orden en que se aplican despues de FBXResetExport.
+# El rango de frames (FBXExportBakeComplexStart/End) se agrega al aplicar.
+PRESETS = {
+    'skeleton': (
+        ('FBXExportSmoothingGroups', 'true'),
+        ('FBXExportSmoothMesh', 'true'),
+        ('FBXExportTangents', 'true'),
+        ('FBXExportReferencedAssetsContent', 'true'),
+        ('FBXExportTriangulate', 'false'),
+        ('FBXExportAnimationOnly', 'false'),
+        ('FBXExportBakeComplexAnimation', 'true'),
+        ('FBXExportBakeComplexStep', '1'),
+        ('FBXExportQuaternion', '"resample"'),
+        ('FBXExportUseSceneName', 'false'),
+        ('FBXExportConstraints', 'true'),
+        ('FBXExportCameras', 'true'),
+        ('FBXExportLights', 'true'),
+        ('FBXExportSkins', 'true'),
+        ('FBXExportShapes', 'true'),
+        ('FBXExportInputConnections', 'true'),
+    ),
+    'camera': (
+        ('FBXExportCameras', 'true'),
+        ('FBXExportLights', 'false'),
+        ('FBXExportSkins', 'false'),
+        ('FBXExportShapes', 'true'),
+        ('FBXExportBakeComplexAnimation', 'true'),
+        ('FBXExportBakeComplexStep', '1'),
+        ('FBXExportBakeResampleAnimation', 'true'),
+        ('FBXExportQuaternion', '"resample"'),
+    ),
+}
+
+# (preset, start, end, prebaked) aplicado por ultima vez en esta sesion
+_applied_state = None
+
+
+def get_preset(name):
+    """Opciones de un preset (ValueError si no existe)"""
+    if name not in PRESETS:
+        raise ValueError("Unknown FBX preset '{}' (available: {})".format(
+            name, ', '.join(sorted(PRESETS))))
+    return PRESETS[name]
+
+
+def build_script(name, start_frame=None, end_frame=None, prebaked=False):
+    """
+    Script MEL completo del preset (un solo mel.eval)
+
+    Con prebaked=True se desactiva el bake complejo: las curvas ya las
+    horneo bake_stage y el FBX solo escribe las keys.
+    """
+    lines = ['FBXResetExport;']
+    lines += ['{} -v {};'.format(command, value) for command, value in get_preset(name)]
+    if start_frame is not None:
+        lines.append('FBXExportBakeComplexStart -v {};'.format(start_frame))
+    if end_frame is not None:
+        lines.append('FBXExportBakeComplexEnd -v {};'.format(end_frame))
+    if prebaked:
+        lines.append('FBXExportBakeComplexAnimation -v false;')
+    return '\n'.join(lines)
+
+
+def preset_hash(name, prebaked=False):
+    """
+    sha1 de las opciones del preset (sin rango de frames)
+
+    prebaked tiene que ser el mismo con el que se aplica el preset: la
+    variante prebaked escribe otras opciones y su hash es distinto.
+    """
+    script = build_script(name, prebaked=prebaked)
+    return hashlib.sha1(script.encode('utf-8')).hexdigest()
+
+
+def apply_preset(name, start_frame, end_frame, force=False, prebaked=False):
+    """
+    Aplica un preset si el estado actual es distinto
+
+    Args:
+        name: 'skeleton' o 'camera'
+        start_frame: Frame inicial del bake
+        end_frame: Frame final del bake
+        force: Aplicar aunque sea el mismo estado
+        prebaked: Curvas ya horneadas (ver build_script)
+
+    Returns:
+        bool: True si se ejecuto el MEL, False si ya estaba aplicado
+    """
+    global _applied_state
+
+    state = (name, start_frame, end_frame, prebaked)
+    if state == _applied_state and not force:
+        return False
+
+    script = build_script(name, start_frame, end_frame, prebaked)
+    _applied_state = None
+    mel.eval(script)
+    _applied_state = state
+    return True
+
+
+def invalidate():
+    """
+    Olvida el ultimo preset aplicado
+
+    Llamarlo si algo fuera de este modulo toca las opciones FBX (por
+    ejemplo el dialogo de exportacion de Maya).
+    """
+    global _applied_state
+    _applied_state = None
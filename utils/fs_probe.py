@@ -0,0 +1,273 @@
+# -*- coding: utf-8 -*-
+"""
+PKL Pipeline - Filesystem Probe
+Existencia, mtime y tamano de archivos del share sin un probe por archivo
+
+En el NAS cada os.path.exists/getmtime cuesta 5-50 ms. FsProbe lista cada
+carpeta una sola vez (os.scandir) y responde exists/isdir/mtime/size desde
+memoria durante PROBE_TTL segundos. prefetch() lista muchas carpetas en
+paralelo con un pool de threads antes de consultarlas una por una.
+
+Los threads solo hacen IO de archivos; el modulo no depende de Maya.
+
+Uso:
+    fs_probe.prefetch(master_dirs)          # una lista por carpeta, en paralelo
+    if fs_probe.exists(master_path): ...
+    fs_probe.makedirs(dest_dir)             # no toca el share si ya existe
+
+Quien escribe, renombra o borra archivos tiene que llamar
+invalidate(path) para que la proxima consulta vuelva a listar la carpeta.
+"""
+import errno
+import os
+import threading
+import time
+from multiprocessing.pool import ThreadPool
+
+try:
+    from os import scandir
+except ImportError:
+    # Python 2: paquete scandir si esta instalado, si no os.listdir
+    try:
+        from scandir import scandir
+    except ImportError:
+        scandir = None
+
+# Segundos que una carpeta listada se considera al dia
+PROBE_TTL = 30.0
+
+# Threads que listan carpetas en prefetch()
+PROBE_WORKERS = 8
+
+# Carpeta que existe pero no se puede listar: se consulta archivo por archivo
+UNLISTABLE = 'unlistable'
+
+_probe = None
+_probe_lock = threading.Lock()
+
+
+def _key(path):
+    """Clave de un path (normcase: en Windows sin distinguir mayusculas)"""
+    return os.path.normcase(os.path.normpath(path))
+
+
+def list_directory(path):
+    """
+    Entradas de una carpeta en una sola lectura
+
+    Returns:
+        dict: {nombre normcase: DirEntry (o path completo sin scandir)},
+              None si la carpeta no existe, UNLISTABLE si no se puede listar
+    """
+    try:
+        if scandir is not None:
+            return dict((os.path.normcase(entry.name), entry) for entry in scandir(path))
+        return dict((os.path.normcase(name), os.path.join(path, name))
+                    for name in os.listdir(path))
+    except OSError as e:
+        if e.errno in (errno.ENOENT, errno.ENOTDIR):
+            return None
+        return UNLISTABLE
+
+
+def _stat(entry):
+    return entry.stat() if hasattr(entry, 'stat') else os.stat(entry)
+
+
+class FsProbe(object):
+    """
+    Cache de listados de carpetas con TTL (thread-safe)
+
+    Attributes:
+        listings (int): Carpetas listadas (probes reales al share)
+        hits (int): Consultas respondidas desde memoria
+    """
+
+    def __init__(self, ttl=PROBE_TTL, workers=PROBE_WORKERS):
+        self.ttl = ttl
+        self.workers = workers
+        self.listings = 0
+        self.hits = 0
+        self._dirs = {}       # clave de carpeta -> (listada en, entradas)
+        self._lock = threading.Lock()
+        self._pool = None
+
+    # --- Listados ---
+
+    def _fresh(self, key):
+        cached = self._dirs.get(key)
+        if cached is not None and time.time() - cached[0] < self.ttl:
+            return cached
+        return None
+
+    def _listing(self, directory, refresh=False):
+        """Entradas de la carpeta (de memoria si el listado sigue al dia)"""
+        key = _key(directory)
+        with self._lock:
+            cached = None if refresh else self._fresh(key)
+            if cached is not None:
+                self.hits += 1
+                return cached[1]
+
+        entries = list_directory(directory)
+        with self._lock:
+            self._dirs[key] = (time.time(), entries)
+            self.listings += 1
+        return entries
+
+    def prefetch(self, directories, refresh=False):
+        """
+        Lista en paralelo las carpetas que no estan al dia
+
+        Args:
+            directories: Carpetas a listar (repetidas o None se ignoran)
+            refresh: Volver a listar aunque el listado siga al dia
+        """
+        pending = []
+        seen = set()
+        with self._lock:
+            for directory in directories:
+                if not directory or _key(directory) in seen:
+                    continue
+                seen.add(_key(directory))
+                if refresh or self._fresh(_key(directory)) is None:
+                    pending.append(directory)
+
+        if len(pending) == 1:
+            self._listing(pending[0], refresh)
+        elif pending:
+            self._get_pool().map(lambda directory: self._listing(directory, refresh), pending)
+        return len(pending)
+
+    def _get_pool(self):
+        """ThreadPool de prefetch (uno solo aunque dos threads lo pidan a la vez)"""
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPool(self.workers)
+            return self._pool
+
+    def invalidate(self, path=None):
+        """
+        Olvida el listado de la carpeta de path y el de path mismo (si es
+        una carpeta). Sin path se olvida todo
+        """
+        with self._lock:
+            if path is None:
+                self._dirs.clear()
+                return
+            self._dirs.pop(_key(path), None)
+            self._dirs.pop(_key(os.path.dirname(os.path.normpath(path))), None)
+
+    # --- Consultas ---
+
+    def _entry(self, path):
+        """DirEntry/path del archivo, None si no existe, UNLISTABLE si no se sabe"""
+        directory, name = os.path.split(os.path.normpath(path))
+        if not name:
+            return path if os.path.exists(path) else None
+
+        entries = self._listing(directory)
+        if entries is None or entries == UNLISTABLE:
+            return entries
+        return entries.get(os.path.normcase(name))
+
+    def exists(self, path):
+        entry = self._entry(path)
+        if entry == UNLISTABLE:
+            return os.path.exists(path)
+        return entry is not None
+
+    def isdir(self, path):
+        entry = self._entry(path)
+        if entry == UNLISTABLE:
+            return os.path.isdir(path)
+        if entry is None:
+            return False
+        return entry.is_dir() if hasattr(entry, 'is_dir') else os.path.isdir(entry)
+
+    def mtime(self, path):
+        """mtime del archivo, o None si no existe"""
+        entry = self._entry(path)
+        try:
+            if entry == UNLISTABLE:
+                return os.path.getmtime(path)
+            return _stat(entry).st_mtime if entry is not None else None
+        except OSError:
+            return None
+
+    def size(self, path):
+        """Tamano del archivo en bytes, o None si no existe"""
+        entry = self._entry(path)
+        try:
+            if entry == UNLISTABLE:
+                return os.path.getsize(path)
+            return _stat(entry).st_size if entry is not None else None
+        except OSError:
+            return None
+
+    # --- Escritura ---
+
+    def makedirs(self, path):
+        """
+        Crea la carpeta (y las que falten) si no existe
+
+        Returns:
+            bool: True si se creo algo
+        """
+        if self.isdir(path):
+            return False
+
+        try:
+            os.makedirs(path)
+        except OSError:
+            # Otro proceso/thread la creo mientras tanto
+            if not os.path.isdir(path):
+                raise
+
+        # Cada nivel creado cambio el listado de su padre
+        path = os.path.normpath(path)
+        with self._lock:
+            while path and _key(path) != _key(os.path.dirname(path)):
+                self._dirs.pop(_key(path), None)
+                path = os.path.dirname(path)
+                self._dirs.pop(_key(path), None)
+        return True
+
+
+def get_probe():
+    """FsProbe compartido de la sesion"""
+    global _probe
+    with _probe_lock:
+        if _probe is None:
+            _probe = FsProbe()
+        return _probe
+
+
+# Atajos sobre el probe compartido
+
+def exists(path):
+    return get_probe().exists(path)
+
+
+def isdir(path):
+    return get_probe().isdir(path)
+
+
+def mtime(path):
+    return get_probe().mtime(path)
+
+
+def size(path):
+    return get_probe().size(path)
+
+
+def makedirs(path):
+    return get_probe().makedirs(path)
+
+
+def prefetch(directories, refresh=False):
+    return get_probe().prefetch(directories, refresh)
+
+
+def invalidate(path=None):
+    get_probe().invalidate(path)
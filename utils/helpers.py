@@ -4,17 +4,285 @@ PKL Pipeline - Helper Functions
 Funciones compartidas que se usan en multiples modulos
 """
 import maya.cmds as cmds
-import re
+import hashlib
 import sys
+import time
+from collections import namedtuple
+
+import naming
 
 # ====== CONFIGURACION ======
 PROJECT_PREFIX = 'PKL'
 
+# ====== SCENE CONTEXT ======
+
+# Eventos que invalidan el SceneContext cacheado
+SCENE_CONTEXT_EVENTS = (
+    'SceneOpened',
+    'NewSceneOpened',
+    'SceneSaved',
+    'workspaceChanged',
+    'playbackRangeChanged',
+)
+
+_scene_context = None
+_scene_context_jobs = []
+
+
+class SceneContext(object):
+    """
+    Datos de la escena actual calculados una sola vez
+
+    Attributes:
+        scene_name (str): Nombre corto del archivo ('' si no esta guardada)
+        scene_path (str): Path completo del archivo
+        sq (str): Secuencia (S01)
+        sh (str): Shot (SH010)
+        export_path (str): Path de exportacion con <workspace_root>
+        workspace_root (str): Root del proyecto de Maya
+        start_frame (float): Inicio del timeline
+        end_frame (float): Fin del timeline
+    """
+    __slots__ = ('scene_name', 'scene_path', 'sq', 'sh', 'export_path',
+                 'workspace_root', 'start_frame', 'end_frame')
+
+    @classmethod
+    def from_scene(cls):
+        """Consulta la escena actual"""
+        context = cls()
+        context.scene_path = cmds.file(query=True, sceneName=True) or ''
+        context.scene_name = cmds.file(query=True, sceneName=True, shortName=True) or ''
+
+        parsed = naming.parse(context.scene_name)
+        context.sq = 'S{}'.format(parsed.sq) if parsed.sq is not None else 'S01'
+        context.sh = 'SH{}'.format(parsed.sh) if parsed.sh is not None else 'SH010'
+        context.export_path = '<workspace_root>/Unreal/animation/{}_{}/{}'.format(
+            PROJECT_PREFIX, context.sq, context.sh
+        )
+
+        context.workspace_root = cmds.workspace(q=True, rootDirectory=True)
+        context.start_frame = cmds.playbackOptions(query=True, minTime=True)
+        context.end_frame = cmds.playbackOptions(query=True, maxTime=True)
+        return context
+
+    @property
+    def frame_range(self):
+        """(start, end) como enteros, igual que usan los exporters"""
+        return int(self.start_frame), int(self.end_frame)
+
+    def resolve_path(self, path_template):
+        """Reemplaza <workspace_root> y normaliza separadores"""
+        resolved_path = path_template.replace('<workspace_root>', self.workspace_root)
+        return resolved_path.replace('\\', '/')
+
+    @property
+    def shot_export_dir(self):
+        """Carpeta de exportacion del shot (export_path resuelto)"""
+        return self.resolve_path(self.export_path)
+
+
+def get_scene_context():
+    """
+    Devuelve el SceneContext cacheado (lo calcula si hace falta)
+
+    El cache se invalida solo con scriptJobs (abrir/guardar escena, cambio
+    de workspace o de rango del timeline). Si los scriptJobs no se pueden
+    registrar, no se cachea y se consulta la escena en cada llamada.
+    """
+    global _scene_context
+
+    if _scene_context is not None:
+        return _scene_context
+
+    context = SceneContext.from_scene()
+    if _register_scene_context_jobs():
+        _scene_context = context
+    return context
+
+
+def invalidate_scene_context(*args):
+    """Descarta el SceneContext cacheado (callback de los scriptJobs)"""
+    global _scene_context
+    _scene_context = None
+
+
+def _register_scene_context_jobs():
+    """Registra los scriptJobs de invalidacion (una sola vez por sesion)"""
+    global _scene_context_jobs
+
+    if _scene_context_jobs:
+        return True
+
+    try:
+        # Matar jobs de una carga anterior de este modulo (reload)
+        for job in cmds.scriptJob(listJobs=True) or []:
+            if 'invalidate_scene_context' in job:
+                cmds.scriptJob(kill=int(job.split(':')[0]), force=True)
+
+        _scene_context_jobs = [
+            cmds.scriptJob(event=[event, invalidate_scene_context])
+            for event in SCENE_CONTEXT_EVENTS
+        ]
+    except Exception as e:
+        print("Warning: Could not register scene context jobs - {}".format(e))
+        _scene_context_jobs = []
+        return False
+
+    return True
+
+# ====== REFERENCIAS ======
+
+# Mensajes de MSceneMessage que invalidan el inventario de referencias
+# (cargar otro archivo en una referencia tambien es kAfterLoadReference)
+REFERENCE_EVENTS = (
+    'kAfterCreateReference',
+    'kAfterRemoveReference',
+    'kAfterLoadReference',
+    'kAfterUnloadReference',
+    'kAfterImportReference',
+    'kAfterOpen',
+    'kAfterNew',
+)
+
+_reference_inventory = None
+
+# Ids de una carga anterior de este modulo: reload() vuelve a ejecutar el
+# modulo sobre el mismo dict, asi que la lista vieja sigue en globals()
+_stale_reference_callbacks = (globals().get('_stale_reference_callbacks', []) +
+                              globals().get('_reference_callbacks', []))
+_reference_callbacks = []
+
+ReferenceEntry = namedtuple('ReferenceEntry',
+                            'node resolved_path unresolved_path loaded namespace')
+
+
+def read_reference_nodes():
+    """
+    Lee todos los reference nodes en una sola pasada con el API (MFnReference)
+
+    Returns:
+        list: [(node, resolved_path, unresolved_path, loaded, namespace), ...]
+              Los paths con copy number ({1}); None si el nodo no tiene
+              archivo (sharedReferenceNode...)
+    """
+    import maya.api.OpenMaya as om
+
+    rows = []
+    iterator = om.MItDependencyNodes(om.MFn.kReference)
+    while not iterator.isDone():
+        fn_reference = om.MFnReference(iterator.thisNode())
+        try:
+            resolved_path = fn_reference.fileName(True, True, True)
+            unresolved_path = fn_reference.fileName(False, True, True)
+            loaded = fn_reference.isLoaded()
+            namespace = fn_reference.associatedNamespace(False)
+        except RuntimeError:
+            resolved_path = unresolved_path = namespace = None
+            loaded = False
+        rows.append((fn_reference.name(), resolved_path, unresolved_path, loaded, namespace))
+        iterator.next()
+    return rows
+
+
+class ReferenceInventory(object):
+    """
+    Todos los reference nodes de la escena (ReferenceEntry por nodo)
+
+    Attributes:
+        digest (str): Hash del contenido; cambia si cambia cualquier path,
+                      estado de carga o namespace
+    """
+
+    def __init__(self, entries):
+        self.entries = tuple(entries)
+        self._by_node = dict((entry.node, entry) for entry in self.entries)
+        self.digest = hashlib.sha1(repr(self.entries).encode('utf-8')).hexdigest()
+
+    @classmethod
+    def build(cls):
+        """Inventario de la escena actual (una sola lectura del API)"""
+        return cls(ReferenceEntry(*row) for row in read_reference_nodes())
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def get(self, node):
+        """ReferenceEntry del reference node (o None)"""
+        return self._by_node.get(node)
+
+    def nodes(self):
+        return [entry.node for entry in self.entries]
+
+
+def get_reference_inventory():
+    """
+    Devuelve el ReferenceInventory cacheado (lo construye si hace falta)
+
+    El cache se invalida con callbacks de MSceneMessage (crear, quitar,
+    cargar, descargar o reemplazar referencias; abrir o crear escena). Si
+    los callbacks no se pueden registrar se construye en cada llamada.
+    """
+    global _reference_inventory
+
+    if _reference_inventory is not None:
+        return _reference_inventory
+
+    inventory = ReferenceInventory.build()
+    if _register_reference_callbacks():
+        _reference_inventory = inventory
+    return inventory
+
+
+def invalidate_reference_inventory(*args):
+    """Descarta el inventario cacheado (callback de MSceneMessage)"""
+    global _reference_inventory
+    _reference_inventory = None
+
+
+def _register_reference_callbacks():
+    """Registra los callbacks de invalidacion (una sola vez por sesion)"""
+    global _reference_callbacks, _stale_reference_callbacks
+
+    if _reference_callbacks:
+        return True
+
+    try:
+        import maya.api.OpenMaya as om
+
+        # Quitar los callbacks de una carga anterior de este modulo (reload)
+        if _stale_reference_callbacks:
+            om.MMessage.removeCallbacks(_stale_reference_callbacks)
+            _stale_reference_callbacks = []
+
+        _reference_callbacks = [
+            om.MSceneMessage.addCallback(getattr(om.MSceneMessage, event),
+                                         invalidate_reference_inventory)
+            for event in REFERENCE_EVENTS
+        ]
+    except Exception as e:
+        print("Warning: Could not register reference callbacks - {}".format(e))
+        _reference_callbacks = []
+        return False
+
+    return True
+
 # ====== SCENE INFO ======
 
+# Tipo de escena (naming.scene_type) -> (label, color de la UI)
+SCENE_TYPE_LABELS = {
+    'anim': ("Animation Scene", [0.4, 1.0, 0.4]),       # Verde
+    'model': ("Modeling Scene", [0.4, 0.7, 1.0]),       # Azul
+    'rig': ("Rig Scene", [1.0, 0.8, 0.4]),              # Amarillo
+    'texture': ("Texturing Scene", [1.0, 0.5, 0.8]),    # Rosa
+    'layout': ("Layout Scene", [0.7, 0.5, 1.0]),        # Purpura
+}
+
 def get_scene_name():
     """Obtiene el nombre de la escena actual"""
-    return cmds.file(query=True, sceneName=True, shortName=True)
+    return get_scene_context().scene_name
 
 def get_scene_type():
     """
@@ -37,23 +305,10 @@ def get_scene_type():
     if not scene_name:
         return ("UNSAVED SCENE", [1.0, 0.6, 0.4])  # Naranja
     
-    # Convertir a lowercase para busqueda
-    scene_lower = scene_name.lower()
-    
-    # Patrones en orden de prioridad
-    patterns = [
-        ('_anim_', "Animation Scene", [0.4, 1.0, 0.4]),      # Verde
-        ('_model_', "Modeling Scene", [0.4, 0.7, 1.0]),      # Azul
-        ('_rig_', "Rig Scene", [1.0, 0.8, 0.4]),             # Amarillo
-        ('_texture_', "Texturing Scene", [1.0, 0.5, 0.8]),   # Rosa
-        ('_textures_', "Texturing Scene", [1.0, 0.5, 0.8]),  # Rosa
-        ('_layout_', "Layout Scene", [0.7, 0.5, 1.0]),       # Purpura
-    ]
-    
-    # Buscar patrones en el nombre
-    for pattern, scene_type, color in patterns:
-        if pattern in scene_lower:
-            return (scene_type, color)
+    # Tipo por prioridad segun la gramatica de nombres (naming.SCENE_TYPES)
+    scene_type = naming.scene_type(naming.parse(scene_name))
+    if scene_type:
+        return SCENE_TYPE_LABELS[scene_type]
     
     # Verificacion adicional: si existe grupo ANIMATION -> Animation Scene
     if cmds.objExists('ANIMATION'):
@@ -64,50 +319,31 @@ def get_scene_type():
 
 def get_sq_from_scene():
     """Extrae SQ del nombre de la escena (_S01_ -> S01)"""
-    scene_name = get_scene_name()
-    if not scene_name:
-        return 'S01'
-    
-    pattern = re.compile(r'_S(\d+)_')
-    match = pattern.search(scene_name)
-    
-    if match:
-        sq_number = match.group(1)
-        return 'S{}'.format(sq_number)
-    else:
-        return 'S01'
+    return get_scene_context().sq
 
 def get_sh_from_scene():
     """Extrae SH del nombre de la escena (_SH010_ -> SH010)"""
-    scene_name = get_scene_name()
-    if not scene_name:
-        return 'SH010'
-    
-    pattern = re.compile(r'_SH(\d+)_')
-    match = pattern.search(scene_name)
-    
-    if match:
-        sh_number = match.group(1)
-        return 'SH{}'.format(sh_number)
-    else:
-        return 'SH010'
+    return get_scene_context().sh
 
 def get_export_path():
     """Construye el path de exportacion basado en SQ y SH"""
-    sq = get_sq_from_scene()
-    sh = get_sh_from_scene()
-    return '<workspace_root>/Unreal/animation/{}_{}/{}'.format(PROJECT_PREFIX, sq, sh)
+    return get_scene_context().export_path
 
 def get_scene_data():
     """
     Obtiene toda la info de la escena en un dict
-    Returns: dict con 'sq', 'sh', 'export_path', 'scene_name'
+    Returns: dict con 'sq', 'sh', 'export_path', 'scene_name',
+             'workspace_root', 'start_frame', 'end_frame'
     """
+    context = get_scene_context()
     return {
-        'sq': get_sq_from_scene(),
-        'sh': get_sh_from_scene(),
-        'export_path': get_export_path(),
-        'scene_name': get_scene_name()
+        'sq': context.sq,
+        'sh': context.sh,
+        'export_path': context.export_path,
+        'scene_name': context.scene_name,
+        'workspace_root': context.workspace_root,
+        'start_frame': context.start_frame,
+        'end_frame': context.end_frame
     }
 
 # ====== ATTRIBUTE MANAGEMENT ======
@@ -173,6 +409,546 @@ def has_attribute(obj, attr_name):
     """Verifica si un objeto tiene un atributo"""
     return cmds.objExists(obj) and cmds.attributeQuery(attr_name, node=obj, exists=True)
 
+# ====== SCENE INDEX ======
+
+# Atributos del pipeline que se indexan y su tipo
+PIPELINE_ATTRIBUTES = (
+    ('Hierarchy', 'string'),
+    ('Category', 'string'),
+    ('Name', 'string'),
+    ('ExportedName', 'string'),
+    ('Path', 'string'),
+    ('Exportable', 'bool'),
+    ('FBX_exportable', 'bool'),
+    ('UnrealCamera', 'bool'),
+    ('IsInGroup', 'bool'),
+)
+
+
+class PipelineNode(object):
+    """
+    Un transform que tiene al menos un atributo del pipeline
+
+    Attributes:
+        long_name (str): Path DAG completo (|ANIMATION|CH|KASSY_1)
+        name (str): Nombre unico mas corto, igual al que devuelve cmds.ls
+        values (dict): {attr_name: valor} solo con los atributos que existen
+    """
+    __slots__ = ('long_name', 'name', 'values')
+
+    def __init__(self, long_name, name, values=None):
+        self.long_name = long_name
+        self.name = name
+        self.values = values if values is not None else {}
+
+    def has(self, attr_name):
+        return attr_name in self.values
+
+    def get(self, attr_name, default=None):
+        return self.values.get(attr_name, default)
+
+    def is_descendant_of(self, other):
+        """True si el nodo esta debajo de other en la jerarquia"""
+        return self.long_name.startswith(other.long_name + '|')
+
+    @property
+    def hierarchy(self):
+        return self.values.get('Hierarchy')
+
+    @property
+    def exported_name(self):
+        return self.values.get('ExportedName')
+
+    @property
+    def path(self):
+        return self.values.get('Path')
+
+    @property
+    def exportable(self):
+        return bool(self.values.get('Exportable', False))
+
+    def __repr__(self):
+        return 'PipelineNode({!r})'.format(self.name)
+
+
+class SceneIndex(object):
+    """
+    Mapa en memoria de todos los transforms con atributos del pipeline
+
+    Se construye con una sola query cmds.ls por atributo y los valores se
+    leen en bloque con la API (sin pasar por attributeQuery/getAttr por nodo).
+    Los modulos de core lo usan en vez de recorrer cmds.ls(type='transform').
+
+    Si una operacion modifica atributos o crea grupos, debe mantener el
+    indice al dia con set_value() / add_node().
+    """
+
+    def __init__(self, attributes=PIPELINE_ATTRIBUTES):
+        self.attributes = tuple(attributes)
+        self._nodes = {}      # long_name -> PipelineNode
+        self._by_name = {}    # name corto -> PipelineNode
+        self._joints = None   # long_name de un ancestro -> joint exportable (lazy)
+
+    @classmethod
+    def build(cls, attributes=PIPELINE_ATTRIBUTES):
+        """Construye el indice de la escena actual"""
+        index = cls(attributes)
+        for attr_name, attr_type in index.attributes:
+            index._collect_attribute(attr_name, attr_type)
+        return index
+
+    def _collect_attribute(self, attr_name, attr_type):
+        """Una query por atributo + lectura de valores en bloque"""
+        carriers = cmds.ls('*.' + attr_name, recursive=True, objectsOnly=True, long=True) or []
+        if not carriers:
+            return
+
+        import maya.api.OpenMaya as om
+
+        selection = om.MSelectionList()
+        for long_name in carriers:
+            selection.add('{}.{}'.format(long_name, attr_name))
+
+        for i in range(selection.length()):
+            if not selection.getDependNode(i).hasFn(om.MFn.kTransform):
+                continue
+
+            dag_path = selection.getDagPath(i)
+            plug = selection.getPlug(i)
+            try:
+                value = plug.asBool() if attr_type == 'bool' else plug.asString()
+            except RuntimeError:
+                value = cmds.getAttr(plug.name())
+
+            node = self._nodes.get(dag_path.fullPathName())
+            if node is None:
+                node = self.add_node(dag_path.fullPathName(), dag_path.partialPathName())
+            node.values[attr_name] = value
+
+    # --- Acceso ---
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def __iter__(self):
+        return iter(list(self._nodes.values()))
+
+    def __contains__(self, node_name):
+        return self.get(node_name) is not None
+
+    def get(self, node_name):
+        """Devuelve el PipelineNode por nombre largo o corto (o None)"""
+        node = self._nodes.get(node_name)
+        if node is None:
+            node = self._by_name.get(node_name)
+        return node
+
+    def resolve(self, node_name):
+        """
+        Como get(), pero si el nodo no esta indexado (no tiene atributos del
+        pipeline) devuelve un PipelineNode sin valores, o None si no existe
+        """
+        node = self.get(node_name)
+        if node is None:
+            long_names = cmds.ls(node_name, long=True) or []
+            if long_names:
+                node = PipelineNode(long_names[0], node_name)
+        return node
+
+    def value(self, node_name, attr_name, default=None):
+        """Equivalente en memoria de get_attribute_value"""
+        node = self.get(node_name)
+        if node is None:
+            return default
+        return node.get(attr_name, default)
+
+    def carriers(self, attr_name):
+        """Todos los nodos que tienen el atributo"""
+        return [node for node in self if node.has(attr_name)]
+
+    def find(self, attr_name, value):
+        """Todos los nodos donde attr_name == value"""
+        return [node for node in self if node.get(attr_name) == value]
+
+    # --- Actualizacion ---
+
+    def add_node(self, long_name, name=None, values=None):
+        """Registra un nodo nuevo (p.ej. un grupo creado en esta operacion)"""
+        node = PipelineNode(long_name, name or long_name.split('|')[-1], values)
+        self._nodes[long_name] = node
+        self._by_name[node.name] = node
+        self._joints = None
+        return node
+
+    def set_value(self, node_name, attr_name, value):
+        """Refleja en el indice un setAttr hecho sobre la escena"""
+        node = self.get(node_name)
+        if node is not None:
+            node.values[attr_name] = value
+            self._joints = None
+
+    def reparent(self, node_names, parent_name):
+        """
+        Refleja en el indice un cmds.parent: actualiza el path DAG de los
+        nodos movidos y de todos sus descendientes (una sola pasada)
+        """
+        parent = self.resolve(parent_name)
+        if parent is None:
+            return
+
+        moves = {}
+        for node_name in node_names:
+            node = self.get(node_name)
+            if node is not None:
+                leaf = node.long_name.rsplit('|', 1)[-1]
+                moves[node.long_name] = parent.long_name + '|' + leaf
+        if not moves:
+            return
+
+        self._joints = None
+        for other in self:
+            parts = other.long_name.split('|')
+            for depth in range(2, len(parts) + 1):
+                old_prefix = '|'.join(parts[:depth])
+                if old_prefix in moves:
+                    del self._nodes[other.long_name]
+                    other.long_name = moves[old_prefix] + other.long_name[len(old_prefix):]
+                    self._nodes[other.long_name] = other
+                    break
+
+    # --- Consultas del pipeline ---
+
+    def exportable_groups(self):
+        """
+        Grupos con ExportedName, Path y Exportable=True
+
+        Returns:
+            list: [{group, exported_name, path, exportable}, ...]
+        """
+        groups = []
+        for node in self:
+            if not (node.has('ExportedName') and node.has('Path') and node.has('Exportable')):
+                continue
+            if node.exportable and node.exported_name and node.path:
+                groups.append({
+                    'group': node.name,
+                    'exported_name': node.exported_name,
+                    'path': node.path,
+                    'exportable': node.exportable
+                })
+        return groups
+
+    def _exportable_joints(self):
+        """
+        {long_name de cada ancestro: joint FBX_exportable mas cercano a la
+        raiz debajo de ese ancestro}, en una pasada por los joints
+        (joints x profundidad). Se rehace si el indice cambia
+        """
+        if self._joints is None:
+            joints = {}
+            for node in self._nodes.values():
+                if not node.get('FBX_exportable'):
+                    continue
+                depth = node.long_name.count('|')
+                parts = node.long_name.split('|')
+                for i in range(2, len(parts)):
+                    ancestor = '|'.join(parts[:i])
+                    found = joints.get(ancestor)
+                    # A igual profundidad gana el primero indexado
+                    if found is None or depth < found.long_name.count('|'):
+                        joints[ancestor] = node
+            self._joints = joints
+        return self._joints
+
+    def find_exportable_joint(self, group):
+        """
+        Joint con FBX_exportable=True debajo de group (el mas cercano a la raiz)
+
+        Returns:
+            str: Path completo del joint, o None
+        """
+        group_node = self.resolve(group)
+        if group_node is None:
+            return None
+
+        joint = self._exportable_joints().get(group_node.long_name)
+        return joint.long_name if joint is not None else None
+
+# ====== SUSPENSION DE ESCENA ======
+
+# Modos de undo de SceneSuspend
+UNDO_CHUNK = 'chunk'
+UNDO_OFF = 'off'
+
+
+class SceneSuspend(object):
+    """
+    Context manager para operaciones pesadas (bakes, exports, muchos
+    cmds.parent o cmds.select)
+
+    Suspende el refresh del viewport y el autosave, agrupa el undo en un
+    solo chunk (o lo pausa) y opcionalmente pasa el evaluation manager a
+    parallel. Al salir restaura cada setting, aunque haya un error.
+
+    Uso:
+        with SceneSuspend('pkl_organize_animation'):
+            ...muchos cmds.parent...      # un solo Ctrl+Z
+
+    Args:
+        name: Nombre del undo chunk
+        undo: UNDO_CHUNK (un solo paso de undo), UNDO_OFF (no registrar
+              undo) o None (no tocar el undo)
+        refresh: Suspender el refresh del viewport
+        autosave: Pausar el autosave
+        parallel: Evaluation manager en modo parallel
+    """
+
+    def __init__(self, name='pkl_operation', undo=UNDO_CHUNK, refresh=True,
+                 autosave=True, parallel=False):
+        self.name = name
+        self.undo = undo
+        self.refresh = refresh
+        self.autosave = autosave
+        self.parallel = parallel
+        self._restore = []
+
+    def __enter__(self):
+        try:
+            self._suspend()
+        except Exception:
+            self._restore_all()
+            raise
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self._restore_all()
+        return False
+
+    def _suspend(self):
+        # Sin UI no hay viewport ni autosave
+        interactive = not is_batch_mode()
+
+        if self.refresh and interactive and not cmds.refresh(query=True, suspend=True):
+            cmds.refresh(suspend=True)
+            self._restore.append(lambda: cmds.refresh(suspend=False))
+
+        if self.autosave and interactive and cmds.autoSave(query=True, enable=True):
+            cmds.autoSave(enable=False)
+            self._restore.append(lambda: cmds.autoSave(enable=True))
+
+        if self.parallel:
+            mode = (cmds.evaluationManager(query=True, mode=True) or ['off'])[0]
+            if mode != 'parallel':
+                cmds.evaluationManager(mode='parallel')
+                self._restore.append(lambda: cmds.evaluationManager(mode=mode))
+
+        if self.undo == UNDO_CHUNK:
+            cmds.undoInfo(openChunk=True, chunkName=self.name)
+            self._restore.append(lambda: cmds.undoInfo(closeChunk=True))
+        elif self.undo == UNDO_OFF and cmds.undoInfo(query=True, state=True):
+            # stateWithoutFlush: no borra la cola de undo existente
+            cmds.undoInfo(stateWithoutFlush=False)
+            self._restore.append(lambda: cmds.undoInfo(stateWithoutFlush=True))
+
+    def _restore_all(self):
+        """Restaura en orden inverso; un error no impide restaurar el resto"""
+        while self._restore:
+            restore = self._restore.pop()
+            try:
+                restore()
+            except Exception as e:
+                print("Warning: Could not restore scene setting - {}".format(e))
+
+# ====== DIALOGOS / BATCH ======
+
+# Respuestas de confirm_dialog en modo batch: {title: boton}
+_batch_answers = {}
+# Dialogos que se hubieran mostrado (los recoge batch.py para el reporte)
+_batch_dialogs = []
+
+
+def is_batch_mode():
+    """True si Maya corre sin UI (mayapy / maya -batch)"""
+    try:
+        return bool(cmds.about(batch=True))
+    except Exception:
+        return False
+
+
+def set_batch_answers(answers=None):
+    """
+    Define las respuestas automaticas de los dialogos en modo batch
+
+    Args:
+        answers (dict): {title del dialogo: boton}. Los dialogos sin
+                        respuesta usan su defaultButton o el primer boton.
+    """
+    _batch_answers.clear()
+    _batch_answers.update(answers or {})
+
+
+def pop_batch_dialogs():
+    """Devuelve y limpia los dialogos registrados en modo batch"""
+    dialogs = list(_batch_dialogs)
+    del _batch_dialogs[:]
+    return dialogs
+
+
+def confirm_dialog(**kwargs):
+    """
+    cmds.confirmDialog que no bloquea en modo batch
+
+    Con UI es exactamente cmds.confirmDialog. Sin UI imprime el mensaje,
+    lo registra para el reporte y devuelve la respuesta configurada.
+    """
+    if not is_batch_mode():
+        return cmds.confirmDialog(**kwargs)
+
+    buttons = kwargs.get('button') or ['OK']
+    if not isinstance(buttons, (list, tuple)):
+        buttons = [buttons]
+
+    title = kwargs.get('title', '')
+    message = kwargs.get('message', '')
+    answer = _batch_answers.get(title, kwargs.get('defaultButton', buttons[0]))
+
+    _batch_dialogs.append({
+        'title': title,
+        'message': message,
+        'icon': kwargs.get('icon', ''),
+        'answer': answer
+    })
+    print("[batch] {}: {} -> {}".format(title, message.replace('\n', ' '), answer))
+    return answer
+
+# ====== PROGRESO ======
+
+def format_seconds(seconds):
+    """mm:ss (o h:mm:ss) para mostrar tiempos en la UI"""
+    seconds = int(round(max(seconds, 0)))
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return '{}:{:02d}:{:02d}'.format(hours, minutes, seconds)
+    return '{:02d}:{:02d}'.format(minutes, seconds)
+
+
+class ProgressWindow(object):
+    """
+    progressWindow con boton de cancelar, tiempo transcurrido y restante
+
+    Los pasos se cuentan con step()/finish(); el tiempo restante sale del
+    promedio de los pasos terminados. cancelled se consulta entre pasos
+    (Maya solo procesa el boton cuando se edita la ventana), nunca a
+    mitad de un comando. Sin UI no se abre ventana: los pasos se imprimen
+    y nunca se cancela.
+
+    on_result(line) recibe cada resultado en cuanto termina un paso
+    (p.ej. para mostrarlo en la UI del pipeline).
+
+    Uso:
+        with ProgressWindow('Export', total=3) as progress:
+            for group in groups:
+                if progress.cancelled:
+                    break
+                progress.step(group)
+                ...
+                progress.finish('[OK] ' + group)
+    """
+
+    def __init__(self, title='PKL Pipeline', total=0, on_result=None):
+        self.title = title
+        self.total = total
+        self.done = 0
+        self.on_result = on_result
+        self.interactive = not is_batch_mode()
+        self._cancelled = False
+        self._start = None
+        self._open = False
+        self._label = ''
+
+    def __enter__(self):
+        self._start = time.time()
+        if self.interactive:
+            try:
+                cmds.progressWindow(
+                    title=self.title,
+                    progress=0,
+                    maxValue=max(self.total, 1),
+                    status='Starting...',
+                    isInterruptable=True
+                )
+                self._open = True
+            except RuntimeError:
+                # Ya hay un progressWindow abierto: solo se imprime
+                self._open = False
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.close()
+        return False
+
+    @property
+    def elapsed(self):
+        return time.time() - self._start if self._start else 0.0
+
+    @property
+    def remaining(self):
+        """Segundos estimados para los pasos que faltan (None sin datos)"""
+        if not self.done:
+            return None
+        return self.elapsed / self.done * max(self.total - self.done, 0)
+
+    @property
+    def cancelled(self):
+        """True si el usuario cancelo (queda en True hasta cerrar)"""
+        if self._open and not self._cancelled:
+            self._cancelled = bool(cmds.progressWindow(query=True, isCancelled=True))
+        return self._cancelled
+
+    def add_steps(self, count):
+        """Suma pasos que se conocen recien a mitad del proceso"""
+        self.total += count
+        self._update()
+
+    def step(self, label):
+        """Empieza un paso (actualiza el texto de la ventana)"""
+        self._label = label
+        print("  [{}/{}] {}".format(min(self.done + 1, self.total), self.total, label))
+        self._update()
+
+    def finish(self, result=None):
+        """Termina el paso actual; result se manda a on_result"""
+        self.done += 1
+        self._update()
+        if result:
+            self.report(result)
+
+    def report(self, line):
+        """Manda una linea de resultado a on_result"""
+        if self.on_result is None:
+            return
+        try:
+            self.on_result(line)
+        except Exception as e:
+            print("  Warning: progress callback failed - {}".format(e))
+
+    def _update(self):
+        if not self._open:
+            return
+        status = '{} ({}/{})  {} elapsed'.format(
+            self._label, min(self.done + 1, self.total), self.total,
+            format_seconds(self.elapsed))
+        if self.remaining is not None:
+            status += ', ~{} left'.format(format_seconds(self.remaining))
+        cmds.progressWindow(edit=True, progress=self.done,
+                            maxValue=max(self.total, 1), status=status)
+
+    def close(self):
+        if self._open:
+            cmds.progressWindow(endProgress=True)
+            self._open = False
+
 # ====== MODULE RELOAD ======
 
 def reload_module(module_name):
@@ -194,6 +970,7 @@ def reload_all_modules():
         'animation_organizer',
         'settings',
         'update_checker',
+        'naming',
         'helpers'
     ]
     
@@ -0,0 +1,338 @@
+# -*- coding: utf-8 -*-
+"""
+PKL Pipeline - Auditoria de referencias de archivos .ma (sin Maya)
+Lista las referencias de muchas escenas Maya ASCII sin abrirlas
+
+Cada escena se lee linea por linea solo hasta el primer createNode: las
+referencias (file -r ... "path";) estan en el header. Sobre cada referencia
+se aplican las mismas reglas que check_anm_scn (CH_/PRP_ tienen que ser
+_MASTER, naming.classify_reference) y se calcula su _MASTER
+(naming.master_path, igual que construct_master_path).
+
+Las escenas se parsean en paralelo con un pool de procesos; la existencia
+de los masters se consulta despues en el proceso principal con fs_probe
+(una lista por carpeta de master).
+
+Uso:
+    python utils/ma_reference_audit.py P:/PKL/scenes/S01 [mas carpetas o .ma]
+        [--pattern "*_anim_*.ma"] [--workers 8] [--output audit.json] [--all]
+
+Sale con 1 si alguna escena tiene referencias invalidas o no se pudo leer.
+"""
+import argparse
+import fnmatch
+import io
+import json
+import multiprocessing
+import os
+import re
+import sys
+import time
+
+UTILS_DIR = os.path.dirname(os.path.abspath(__file__))
+if UTILS_DIR not in sys.path:
+    sys.path.insert(0, UTILS_DIR)
+
+import naming
+import fs_probe
+
+# Reference nodes que no son archivos de assets (igual que check_anm_scn)
+IGNORED_REFERENCE_NODES = ('sharedReferenceNode', '_UNKNOWN_REF_NODE_')
+
+# Los comandos de file -r terminan antes del primer nodo de la escena
+HEADER_END = 'createNode'
+
+# Escenas por tarea del pool
+CHUNK_SIZE = 8
+
+# Con menos escenas no vale la pena levantar procesos
+MIN_PARALLEL_SCENES = 16
+
+# Token de un comando MEL: string entre comillas (con escapes) o palabra
+_TOKEN = re.compile(r'"((?:[^"\\]|\\.)*)"|(\S+)')
+_ESCAPE = re.compile(r'\\(.)')
+
+
+# ====== PARSER ======
+
+def _tokens(statement):
+    """Tokens de un comando MEL (los strings sin comillas ni escapes)"""
+    tokens = []
+    for match in _TOKEN.finditer(statement.rstrip().rstrip(';')):
+        quoted, word = match.groups()
+        tokens.append(_ESCAPE.sub(r'\1', quoted) if quoted is not None else word)
+    return tokens
+
+
+def parse_file_command(statement):
+    """
+    Referencia de un comando 'file -r'
+
+    Returns:
+        dict: {node, namespace, file_path, deferred}, o None si el comando
+              no es una referencia de primer nivel (file -rdi, -r sin path)
+    """
+    tokens = _tokens(statement)
+    if len(tokens) < 3 or tokens[0] != 'file' or '-r' not in tokens[1:-1]:
+        return None
+
+    # El path es el ultimo argumento; cada flag toma el valor que le sigue
+    # si no es otro flag
+    flags = {}
+    args = tokens[1:-1]
+    i = 0
+    while i < len(args):
+        flag = args[i]
+        if i + 1 < len(args) and not args[i + 1].startswith('-'):
+            flags[flag] = args[i + 1]
+            i += 2
+        else:
+            flags[flag] = None
+            i += 1
+
+    return {
+        'node': flags.get('-rfn'),
+        'namespace': flags.get('-ns') or flags.get('-rpr'),
+        'file_path': tokens[-1],
+        'deferred': flags.get('-dr') == '1',
+    }
+
+
+def iter_file_commands(lines):
+    """Comandos 'file' del header (uniendo los que siguen en otra linea)"""
+    statement = None
+    for line in lines:
+        stripped = line.strip()
+        if statement is None:
+            if stripped.startswith(HEADER_END):
+                return
+            if not stripped.startswith('file '):
+                continue
+            statement = stripped
+        else:
+            statement += ' ' + stripped
+
+        if statement.endswith(';'):
+            yield statement
+            statement = None
+
+
+def read_references(scene_path):
+    """
+    Referencias de primer nivel de un .ma sin cargar la escena
+
+    Returns:
+        list: [{node, namespace, file_path, deferred}, ...] en orden de archivo
+    """
+    references = []
+    with io.open(scene_path, 'r', encoding='utf-8', errors='replace') as f:
+        for statement in iter_file_commands(f):
+            reference = parse_file_command(statement)
+            if reference is not None and reference['node'] not in IGNORED_REFERENCE_NODES:
+                references.append(reference)
+    return references
+
+
+def audit_scene(scene_path):
+    """
+    Referencias de la escena con las reglas de check_reference_is_master
+    (corre en los procesos del pool)
+
+    Returns:
+        dict: {scene, references: [dict de check_reference_is_master +
+               namespace, deferred, master_path], error}
+    """
+    result = {'scene': scene_path, 'references': [], 'error': ''}
+    try:
+        references = read_references(scene_path)
+    except (IOError, OSError) as e:
+        result['error'] = str(e)
+        return result
+
+    for reference in references:
+        entry = {'node': reference['node']}
+        entry.update(naming.classify_reference(reference['file_path']))
+        entry['namespace'] = reference['namespace']
+        entry['deferred'] = reference['deferred']
+        entry['master_path'] = None if entry['is_valid'] else naming.master_path(
+            reference['file_path'])
+        result['references'].append(entry)
+    return result
+
+
+# ====== MASTERS ======
+
+def find_workspace(scene_path):
+    """Carpeta con workspace.mel arriba de la escena (para paths relativos)"""
+    dir_path = os.path.dirname(os.path.abspath(scene_path))
+    while True:
+        if fs_probe.exists(os.path.join(dir_path, 'workspace.mel')):
+            return dir_path
+        parent = os.path.dirname(dir_path)
+        if parent == dir_path:
+            return None
+        dir_path = parent
+
+
+def resolve_path(path, scene_path):
+    """Path del disco: variables de entorno y relativos al proyecto"""
+    path = os.path.expandvars(path)
+    if not os.path.isabs(path):
+        workspace = find_workspace(scene_path)
+        if workspace:
+            path = os.path.join(workspace, path)
+    return path
+
+
+def check_masters(results):
+    """
+    Agrega master_exists a las referencias invalidas (una lista en
+    paralelo por carpeta de master)
+    """
+    pending = []
+    for result in results:
+        for entry in result['references']:
+            if entry['master_path']:
+                pending.append((entry, resolve_path(entry['master_path'], result['scene'])))
+
+    fs_probe.prefetch([os.path.dirname(path) for entry, path in pending])
+    for entry, path in pending:
+        entry['master_exists'] = fs_probe.exists(path)
+
+
+# ====== AUDITORIA ======
+
+def find_scenes(paths, pattern='*.ma'):
+    """Archivos .ma de las carpetas (recursivo) y archivos pedidos"""
+    scenes = []
+    for path in paths:
+        if os.path.isfile(path):
+            scenes.append(os.path.abspath(path).replace('\\', '/'))
+            continue
+
+        for dir_path, dir_names, file_names in os.walk(path):
+            dir_names.sort()
+            for file_name in sorted(file_names):
+                if file_name.lower().endswith('.ma') and fnmatch.fnmatch(file_name, pattern):
+                    scenes.append(os.path.abspath(os.path.join(dir_path, file_name)).replace('\\', '/'))
+
+    # Sin repetidos, en el orden en que se encontraron
+    seen = set()
+    return [scene for scene in scenes if not (scene in seen or seen.add(scene))]
+
+
+def audit_scenes(scenes, workers=None):
+    """
+    audit_scene de todas las escenas (pool de procesos) + master_exists
+
+    Returns:
+        list: Un dict de audit_scene por escena, en el orden de scenes
+    """
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+
+    if workers <= 1 or len(scenes) < MIN_PARALLEL_SCENES:
+        results = [audit_scene(scene) for scene in scenes]
+    else:
+        pool = multiprocessing.Pool(min(workers, len(scenes)))
+        try:
+            results = pool.map(audit_scene, scenes, CHUNK_SIZE)
+        finally:
+            pool.close()
+            pool.join()
+
+    check_masters(results)
+    return results
+
+
+def summarize(results):
+    """Totales del reporte"""
+    invalid = [entry for result in results for entry in result['references']
+               if not entry['is_valid']]
+    return {
+        'scenes': len(results),
+        'scenes_with_invalid': len([result for result in results
+                                    if any(not entry['is_valid'] for entry in result['references'])]),
+        'unreadable': len([result for result in results if result['error']]),
+        'references': sum(len(result['references']) for result in results),
+        'invalid_references': len(invalid),
+        'fixable': len([entry for entry in invalid if entry.get('master_exists')]),
+    }
+
+
+def print_report(results, summary, show_all=False):
+    print("\n" + "=" * 60)
+    print("PKL PIPELINE - REFERENCE AUDIT")
+    print("=" * 60)
+
+    for result in results:
+        invalid = [entry for entry in result['references'] if not entry['is_valid']]
+        if not (invalid or result['error'] or show_all):
+            continue
+
+        print("\n{}".format(result['scene']))
+        if result['error']:
+            print("  [ERROR] {}".format(result['error']))
+        for entry in result['references']:
+            if entry['is_valid']:
+                if show_all:
+                    print("  [OK]      {} ({})".format(entry['file_name'], entry['node']))
+                continue
+            if entry.get('master_exists'):
+                fix = '-> {}'.format(os.path.basename(entry['master_path']))
+            elif entry['master_path']:
+                fix = '(no MASTER on disk)'
+            else:
+                fix = ''
+            print("  [INVALID] {} ({}) - {} {}".format(
+                entry['file_name'], entry['node'], entry['reason'], fix).rstrip())
+
+    print("\n" + "-" * 60)
+    print("  Scenes: {} ({} with invalid references, {} unreadable)".format(
+        summary['scenes'], summary['scenes_with_invalid'], summary['unreadable']))
+    print("  References: {} ({} invalid, {} with a MASTER on disk)".format(
+        summary['references'], summary['invalid_references'], summary['fixable']))
+    print("-" * 60)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description='Audit the references of Maya ASCII scenes without opening Maya'
+    )
+    parser.add_argument('paths', nargs='+',
+                        help='Sequence folders (searched recursively) or .ma files')
+    parser.add_argument('--pattern', default='*.ma',
+                        help='Scene file name pattern inside folders (default: *.ma)')
+    parser.add_argument('--workers', type=int, default=multiprocessing.cpu_count(),
+                        help='Parser processes (default: CPU count)')
+    parser.add_argument('--output', default=None,
+                        help='Write the full report as JSON')
+    parser.add_argument('--all', action='store_true',
+                        help='Also list scenes and references that pass the check')
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    scenes = find_scenes(args.paths, args.pattern)
+    if not scenes:
+        print("No .ma scenes found in: {}".format(' '.join(args.paths)))
+        return 1
+
+    start = time.time()
+    results = audit_scenes(scenes, args.workers)
+    summary = summarize(results)
+    print_report(results, summary, args.all)
+    print("Audited {} scene(s) in {:.2f}s".format(len(scenes), time.time() - start))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'summary': summary, 'scenes': results}, f, indent=2, sort_keys=True)
+        print("Report written to {}".format(args.output))
+
+    return 1 if summary['invalid_references'] or summary['unreadable'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+"""
+PKL Pipeline - Naming Convention
+Gramatica de tokens de los nombres de archivo del pipeline (escenas y assets)
+
+La gramatica se declara como datos (TOKENS) y se compila una sola vez en
+una regex; parse() extrae todos los campos de un nombre en una pasada.
+No depende de Maya: se puede usar en auditorias de proyecto fuera de Maya.
+
+Ejemplos:
+    PKL_S01_SH010_anim_v003.ma   -> sq='01', sh='010', scene_type='anim'
+    CH_KASSY_03_rig_v007.ma      -> category='CH', asset_name='KASSY', version='007'
+    CH_KASSY_03_rig_MASTER.ma    -> master=True
+    shotCam_FR_1001_1100         -> frame_range=(1001, 1100)
+"""
+import re
+from collections import namedtuple
+
+
+def _ci(word):
+    """Patron case-insensitive para una palabra (compatible con Python 2)"""
+    return ''.join(
+        '[{}{}]'.format(c.lower(), c.upper()) if c.isalpha() else re.escape(c)
+        for c in word
+    )
+
+
+# ====== GRAMATICA ======
+
+# (patron, anclado)
+# - anclado=True: el token tiene que estar al inicio del nombre
+# - anclado=False: se busca la primera aparicion en cualquier posicion
+# Cada token es opcional; si no aparece sus campos quedan en None.
+TOKENS = (
+    # CH_KASSY_03_rig_v007 -> category=CH
+    (r'(?P<category>[A-Za-z]+)_', True),
+    # CH_KASSY_03_ -> asset_name=KASSY, asset_number=03
+    (r'[A-Za-z]+_(?P<asset_name>[A-Za-z]+)_(?P<asset_number>\d+)_', True),
+    # _S01_ / _SH010_
+    (r'_S(?P<sq>\d+)_', False),
+    (r'_SH(?P<sh>\d+)_', False),
+    # Departamento del asset (rig|textures|model, sin importar mayusculas)
+    (r'(?P<department>{}|{}|{})'.format(_ci('rig'), _ci('textures'), _ci('model')), False),
+    # Tipo de escena (sin importar mayusculas)
+    (r'(?P<type_anim>{})'.format(_ci('_anim_')), False),
+    (r'(?P<type_model>{})'.format(_ci('_model_')), False),
+    (r'(?P<type_rig>{})'.format(_ci('_rig_')), False),
+    (r'(?P<type_texture>{}|{})'.format(_ci('_texture_'), _ci('_textures_')), False),
+    (r'(?P<type_layout>{})'.format(_ci('_layout_')), False),
+    # Version al final del nombre: _v007
+    (r'_v(?P<version>\d+)$', False),
+    # Archivo master
+    (r'(?P<master>_MASTER)', False),
+    # Rango de frames de CamTools: _FR_1001_1100
+    (r'_FR_(?P<fr_start>\d+)_(?P<fr_end>\d+)', False),
+)
+
+# Tipos de escena en orden de prioridad
+SCENE_TYPES = ('anim', 'model', 'rig', 'texture', 'layout')
+
+# Prefijos de assets que tienen que referenciarse como _MASTER
+MASTER_PREFIXES = ('CH', 'PRP')
+
+
+def compile_grammar(tokens=TOKENS):
+    """
+    Compila los tokens en una sola regex
+
+    Cada token es un lookahead opcional desde el inicio del nombre, asi un
+    solo match() llena todos los campos sin importar el orden en que
+    aparezcan (equivale a un re.search por token).
+    """
+    parts = []
+    for pattern, anchored in tokens:
+        prefix = '' if anchored else '.*?'
+        parts.append('(?=(?:{}{})?)'.format(prefix, pattern))
+    return re.compile('^' + ''.join(parts), re.DOTALL)
+
+
+GRAMMAR = compile_grammar()
+
+ParsedName = namedtuple('ParsedName', ['stem', 'ext'] + sorted(
+    GRAMMAR.groupindex, key=GRAMMAR.groupindex.get
+))
+
+
+# ====== PARSING ======
+
+def _split(file_name):
+    """basename + splitext sin pasar por os.path (mas rapido en bulk)"""
+    base = file_name.replace('\\', '/').rsplit('/', 1)[-1]
+    dot = base.rfind('.')
+    if dot > 0 and base[:dot].strip('.'):
+        return base[:dot], base[dot:]
+    return base, ''
+
+
+def parse_stem(stem, ext=''):
+    """Parsea un nombre sin extension (o un nombre de nodo)"""
+    return ParsedName(stem, ext, *GRAMMAR.match(stem).groups())
+
+
+def parse(file_name):
+    """
+    Parsea un nombre o path de archivo
+
+    Returns:
+        ParsedName: namedtuple con stem, ext y todos los campos de TOKENS
+                    (None si el token no aparece)
+    """
+    stem, ext = _split(file_name)
+    return ParsedName(stem, ext, *GRAMMAR.match(stem).groups())
+
+
+def parse_many(file_names):
+    """
+    Parsea muchos nombres de una vez (auditorias de proyecto)
+
+    Los nombres repetidos (el mismo rig referenciado en cientos de escenas)
+    se parsean una sola vez.
+
+    Returns:
+        list: ParsedName en el mismo orden que file_names
+    """
+    match = GRAMMAR.match
+    split = _split
+    make = ParsedName._make
+    cache = {}
+    results = []
+    append = results.append
+    for file_name in file_names:
+        parsed = cache.get(file_name)
+        if parsed is None:
+            stem, ext = split(file_name)
+            parsed = cache[file_name] = make((stem, ext) + match(stem).groups())
+        append(parsed)
+    return results
+
+
+# ====== CAMPOS DERIVADOS ======
+
+def scene_type(parsed):
+    """Tipo de escena por prioridad ('anim', 'model', ...) o None"""
+    for key in SCENE_TYPES:
+        if getattr(parsed, 'type_' + key):
+            return key
+    return None
+
+
+def frame_range(parsed):
+    """(start, end) del patron _FR_##_## o None"""
+    if parsed.fr_start is None:
+        return None
+    return int(parsed.fr_start), int(parsed.fr_end)
+
+
+def master_prefix(parsed):
+    """'CH' o 'PRP' si el asset tiene que ser _MASTER, si no None"""
+    if parsed.category in MASTER_PREFIXES:
+        return parsed.category
+    return None
+
+
+def is_master(parsed):
+    return parsed.master is not None
+
+
+def master_file_name(parsed):
+    """
+    Nombre del archivo _MASTER que corresponde a un archivo versionado
+
+    CH_KASSY_03_rig_v007.ma -> CH_KASSY_03_rig_MASTER.ma
+    """
+    master_name = parsed.stem
+    if parsed.version is not None:
+        master_name = master_name[:-len('_v' + parsed.version)]
+    if not master_name.endswith('_MASTER'):
+        master_name += '_MASTER'
+    return master_name + parsed.ext
+
+
+def master_path(current_path):
+    """
+    Path del archivo _MASTER de un asset CH_/PRP_
+
+    FROM: <workspace>/assets/CH/KASSY/03_rig/versions/CH_KASSY_03_rig_v007.ma
+    TO:   <workspace>/assets/CH/KASSY/03_rig/CH_KASSY_03_rig_MASTER.ma
+
+    Returns:
+        str: Path del master (con '/'), o None si no es un asset CH_/PRP_
+    """
+    if not current_path:
+        return None
+
+    parsed = parse(current_path)
+    if master_prefix(parsed) is None:
+        return None
+
+    normalized = current_path.replace('\\', '/')
+    dir_path = normalized.rsplit('/', 1)[0] if '/' in normalized else ''
+
+    # Si esta en /versions/, el master vive un nivel arriba
+    if '/versions/' in normalized:
+        dir_path = dir_path.rsplit('/', 1)[0] if '/' in dir_path else ''
+
+    master_file = master_file_name(parsed)
+    return '{}/{}'.format(dir_path, master_file) if dir_path else master_file
+
+
+def classify_reference(file_path):
+    """
+    Reglas de validacion de referencias (CH_/PRP_ tienen que ser _MASTER)
+
+    Returns:
+        dict: {file_path, file_name, is_valid, reason, prefix, has_master_suffix}
+    """
+    result = {
+        'file_path': file_path,
+        'file_name': None,
+        'is_valid': True,
+        'reason': '',
+        'prefix': None,
+        'has_master_suffix': False
+    }
+
+    if not file_path:
+        result['is_valid'] = False
+        result['reason'] = 'Could not get file path'
+        return result
+
+    parsed = parse(file_path)
+    result['file_name'] = parsed.stem + parsed.ext
+    result['prefix'] = master_prefix(parsed)
+
+    if result['prefix'] is None:
+        result['reason'] = 'Not a CH or PRP asset (validation skipped)'
+        return result
+
+    result['has_master_suffix'] = is_master(parsed)
+    if not result['has_master_suffix']:
+        result['is_valid'] = False
+        result['reason'] = 'Missing _MASTER suffix'
+
+    return result
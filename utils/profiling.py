@@ -0,0 +1,371 @@
+# -*- coding: utf-8 -*-
+"""
+PKL Pipeline - Profiling
+Tiempos por operacion y por etapa, en un log JSONL local
+
+Cada accion de la UI (y cada etapa interna: discovery, bake, write FBX...)
+se mide con span(). Los spans anidados guardan el nombre de su padre y de
+la operacion raiz; cuando termina la operacion raiz se agrega una linea
+por span al log, junto con el tamano de la escena (cantidad de transforms).
+No se escribe nada a mitad de una operacion.
+
+Captura cProfile (opt-in): con PKL_PROFILE=1 (o set_capture(True)) cada
+operacion raiz corre bajo cProfile y deja junto al log un .prof (pstats,
+snakeviz) y un .folded (stacks colapsados para flamegraph.pl/speedscope).
+
+Trace de maya.cmds (opt-in): con PKL_TRACE=1 cada operacion raiz deja un
+.trace.gz con todas las llamadas (ver cmds_tracer).
+
+Uso:
+    @timed('ui.export_all')
+    def export_all(*args): ...
+
+    with span('bake', joints=120):
+        ...
+
+Reporte de las operaciones mas lentas por tamano de escena:
+    python utils/profiling.py report [--log PATH] [--limit 20]
+
+Log: $PKL_PROFILE_DIR o <temp>/pkl_profile (timings.jsonl)
+"""
+import argparse
+import cProfile
+import functools
+import json
+import os
+import pstats
+import sys
+import tempfile
+import threading
+import time
+
+try:
+    import maya.cmds as cmds
+except ImportError:
+    # Sin Maya: solo report() y las utilidades de archivos
+    cmds = None
+
+try:
+    import cmds_tracer
+except ImportError:
+    cmds_tracer = None
+
+LOG_NAME = 'timings.jsonl'
+
+# Limites de los buckets de tamano de escena (transforms) en el reporte
+SCENE_SIZE_BUCKETS = (1000, 5000, 20000, 50000)
+
+# Profundidad maxima de los stacks del .folded
+FOLDED_MAX_DEPTH = 40
+
+_state = threading.local()
+_capture = os.environ.get('PKL_PROFILE', '').lower() in ('1', 'true', 'yes')
+_write_lock = threading.Lock()
+
+
+def profile_dir():
+    """Carpeta del log y de las capturas"""
+    path = os.environ.get('PKL_PROFILE_DIR') or os.path.join(tempfile.gettempdir(), 'pkl_profile')
+    if not os.path.isdir(path):
+        os.makedirs(path)
+    return path
+
+
+def log_path():
+    return os.path.join(profile_dir(), LOG_NAME)
+
+
+def set_capture(enabled=True):
+    """Activa/desactiva la captura cProfile de las operaciones raiz"""
+    global _capture
+    _capture = bool(enabled)
+
+
+def scene_info():
+    """(escena, cantidad de transforms) de la escena actual"""
+    if cmds is None:
+        return '', None
+    try:
+        return (cmds.file(query=True, sceneName=True) or '',
+                len(cmds.ls(type='transform') or []))
+    except Exception:
+        return '', None
+
+
+# ====== SPANS ======
+
+class Span(object):
+    """
+    Mide un bloque. Si no hay un span abierto es una operacion raiz: al
+    terminar escribe todos sus spans al log (y la captura cProfile)
+    """
+
+    def __init__(self, name, **meta):
+        self.name = name
+        self.meta = meta
+        self.record = None
+        self.target = ''
+        self._profile = None
+        self._tracer = None
+
+    def __enter__(self):
+        stack = getattr(_state, 'stack', None)
+        if stack is None:
+            stack = _state.stack = []
+            _state.records = []
+
+        self.record = {
+            'name': self.name,
+            'parent': stack[-1].name if stack else None,
+            'op': stack[0].name if stack else self.name,
+            'depth': len(stack),
+            'start': time.time(),
+        }
+        if self.meta:
+            self.record['meta'] = self.meta
+        stack.append(self)
+
+        if len(stack) == 1 and cmds_tracer is not None and cmds_tracer.is_enabled():
+            self._start_trace()
+
+        if len(stack) == 1 and _capture:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+
+        self._clock = time.time()
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        seconds = time.time() - self._clock
+        if self._profile is not None:
+            self._profile.disable()
+        if self._tracer is not None:
+            self.record['trace'] = self._tracer.path
+            self.record['cmds_calls'] = self._tracer.total_calls
+
+        self.record['seconds'] = round(seconds, 4)
+        if exc_type is not None:
+            self.record['error'] = exc_type.__name__
+
+        stack = _state.stack
+        stack.pop()
+        _state.records.append(self.record)
+
+        if not stack:
+            records = _state.records
+            _state.records = []
+            self._flush(records)
+        if self._tracer is not None:
+            # Despues del flush: sus queries tambien se repiten en el replay
+            self._tracer.stop()
+        return False
+
+    def _flush(self, records):
+        """Fin de la operacion raiz: log + captura (errores solo avisan)"""
+        scene, transforms = scene_info()
+        try:
+            capture = self._dump_profile() if self._profile is not None else None
+            lines = []
+            for record in records:
+                record['scene'] = scene
+                record['transforms'] = transforms
+                if capture and record['depth'] == 0:
+                    record['capture'] = capture
+                lines.append(json.dumps(record, sort_keys=True))
+            with _write_lock:
+                with open(log_path(), 'a') as f:
+                    f.write('\n'.join(lines) + '\n')
+        except (IOError, OSError) as e:
+            print("Warning: Could not write profiling log - {}".format(e))
+
+    def _start_trace(self):
+        """Trace de cmds de la operacion raiz (<op>_<timestamp>.trace.gz)"""
+        path = os.path.join(profile_dir(), '{}_{}{}'.format(
+            self.name.replace('.', '_'), time.strftime('%Y%m%d_%H%M%S'),
+            cmds_tracer.TRACE_EXTENSION))
+        tracer = cmds_tracer.Tracer(path, op=self.name, target=self.target)
+        try:
+            tracer.start()
+        except (ImportError, IOError, OSError) as e:
+            tracer.stop()
+            print("Warning: Could not start cmds trace - {}".format(e))
+            return
+        self._tracer = tracer
+
+    def _dump_profile(self):
+        """Escribe <op>_<timestamp>.prof y .folded; devuelve el path base"""
+        base = os.path.join(profile_dir(), '{}_{}'.format(
+            self.name.replace('.', '_'), time.strftime('%Y%m%d_%H%M%S')))
+        self._profile.dump_stats(base + '.prof')
+        write_folded(pstats.Stats(self._profile), base + '.folded')
+        print("  Profile: {}.prof / .folded".format(base))
+        return base
+
+
+def span(name, **meta):
+    """with span('bake'): ... (ver Span)"""
+    return Span(name, **meta)
+
+
+def timed(name, **meta):
+    """Decorador: la funcion entera es un span (las acciones de la UI)"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            operation = span(name, **meta)
+            # Para el replay del trace de cmds (cmds_tracer)
+            operation.target = '{}.{}'.format(func.__module__, func.__name__)
+            with operation:
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# ====== FLAMEGRAPH ======
+
+def _label(func):
+    file_name, line, func_name = func
+    return '{}:{}:{}'.format(os.path.basename(file_name), line, func_name).replace(';', ',')
+
+
+def write_folded(stats, path):
+    """
+    Stacks colapsados ("a;b;c microsegundos") a partir del grafo de
+    llamadas de pstats. El tiempo de cada funcion se reparte entre sus
+    callers segun el tiempo de cada arista (igual que flameprof).
+    """
+    callees = {}
+    roots = []
+    for func, (cc, nc, tt, ct, callers) in stats.stats.items():
+        if not callers:
+            roots.append(func)
+        for caller, edge in callers.items():
+            callees.setdefault(caller, []).append((func, edge))
+
+    folded = {}
+
+    def walk(func, path, scale):
+        cc, nc, tt, ct, callers = stats.stats[func]
+        self_time = tt * scale
+        if self_time > 0:
+            key = ';'.join(_label(f) for f in path)
+            folded[key] = folded.get(key, 0.0) + self_time
+        if len(path) >= FOLDED_MAX_DEPTH:
+            return
+        for callee, edge in callees.get(func, []):
+            if callee in path:
+                continue
+            callee_ct = stats.stats[callee][3]
+            # edge = (cc, nc, tt, ct) de callee llamado desde func
+            edge_scale = (edge[3] / callee_ct) if callee_ct else 0.0
+            if edge_scale * scale > 0:
+                walk(callee, path + [callee], edge_scale * scale)
+
+    for root in roots:
+        walk(root, [root], 1.0)
+
+    with open(path, 'w') as f:
+        for key, seconds in sorted(folded.items()):
+            micro = int(seconds * 1000000)
+            if micro:
+                f.write('{} {}\n'.format(key, micro))
+
+
+# ====== REPORTE ======
+
+def load_records(path=None):
+    """Spans del log (las lineas corruptas se ignoran)"""
+    path = path or log_path()
+    records = []
+    if not os.path.exists(path):
+        return records
+    with open(path) as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+    return records
+
+
+def size_bucket(transforms):
+    """'<1000', '1000-5000'... para agrupar por tamano de escena"""
+    if transforms is None:
+        return 'unknown'
+    low = 0
+    for limit in SCENE_SIZE_BUCKETS:
+        if transforms < limit:
+            return '{}-{}'.format(low, limit) if low else '<{}'.format(limit)
+        low = limit
+    return '{}+'.format(low)
+
+
+def report(path=None, limit=20):
+    """
+    Operaciones mas lentas por tamano de escena
+
+    Returns:
+        list: [{name, bucket, count, mean, max, slowest_stage}, ...]
+              ordenado por tiempo medio
+    """
+    records = load_records(path)
+
+    groups = {}
+    stages = {}
+    parents = {}
+    for record in records:
+        key = (record['op'], size_bucket(record.get('transforms')))
+        if record.get('depth') == 0:
+            groups.setdefault(key, []).append(record['seconds'])
+        else:
+            totals = stages.setdefault(key, {})
+            totals[record['name']] = totals.get(record['name'], 0.0) + record['seconds']
+            parents.setdefault(key, set()).add(record['parent'])
+
+    rows = []
+    for (name, bucket), times in groups.items():
+        # Etapa mas lenta entre las que no contienen otras (p.ej. fbx_write
+        # y no 'export' dentro de 'ui.export_all')
+        stage_totals = dict((stage, seconds) for stage, seconds in
+                            stages.get((name, bucket), {}).items()
+                            if stage not in parents.get((name, bucket), ()))
+        slowest = max(stage_totals, key=stage_totals.get) if stage_totals else ''
+        rows.append({
+            'name': name,
+            'bucket': bucket,
+            'count': len(times),
+            'mean': sum(times) / len(times),
+            'max': max(times),
+            'slowest_stage': slowest,
+        })
+    rows.sort(key=lambda row: row['mean'], reverse=True)
+    return rows[:limit]
+
+
+def print_report(rows):
+    print("{:<28} {:>12} {:>6} {:>9} {:>9}  {}".format(
+        'Operation', 'Transforms', 'Runs', 'Mean s', 'Max s', 'Slowest stage'))
+    for row in rows:
+        print("{:<28} {:>12} {:>6} {:>9.2f} {:>9.2f}  {}".format(
+            row['name'], row['bucket'], row['count'], row['mean'], row['max'],
+            row['slowest_stage']))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='PKL Pipeline profiling log')
+    sub = parser.add_subparsers(dest='command')
+    report_parser = sub.add_parser('report', help='Slowest operations by scene size')
+    report_parser.add_argument('--log', help='timings.jsonl (default: {})'.format(LOG_NAME))
+    report_parser.add_argument('--limit', type=int, default=20)
+    args = parser.parse_args(argv)
+
+    if args.command != 'report':
+        parser.print_help()
+        return 1
+
+    print_report(report(args.log, args.limit))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())